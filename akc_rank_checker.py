@@ -1,28 +1,61 @@
 import undetected_chromedriver as uc
 from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.common.exceptions import TimeoutException, WebDriverException
-import pandas as pd
-from urllib.parse import urlparse, urlencode, parse_qs, urljoin
+from urllib.parse import urlencode, urljoin
 from datetime import datetime
-import time
-import random
 import os
 import re
-import requests, json
+import argparse
+
+from completion_index import CompletionIndex, STATUS_DONE, normalize_term, parse_since
+from domains import DomainMatcher, base_domain
+from serp_parser import parse_serp
+from serp_cache import SerpCache
+from term_source import read_terms
+from sheet_uploader import SheetUploader
+from page_waits import PacingPolicy, WAIT_STATS, wait_until
+import lean_browser
+from phase_timings import TIMINGS, phase, profiled, write_report, format_summary
 
 # ========== CONFIGURATION ==========
-INPUT_EXCEL = 'Book1.xlsx'  # first column contains search terms
+INPUT_EXCEL = 'Book1.xlsx'  # first column contains search terms (.xlsx, .csv or .parquet)
 OUTPUT_SHEET_NAME = 'AKC Rankings'  # results sheet inside INPUT_EXCEL
 PAGE_READY_TIMEOUT_SECONDS = 10
+RESULTS_TIMEOUT_SECONDS = 5  # bounded wait for result containers after the page is ready
+RESULTS_SELECTOR = 'div.g, div.yuRUbf, cite'
+NETWORK_IDLE_MS = 500  # page counts as settled once no request has finished for this long
+LEAN_BROWSER = True  # block fonts/media/trackers and use eager page loads (see lean_browser.py); images stay on for CAPTCHAs
+HEADLESS = False  # Google challenges headless Chrome far more often, so keep a window here
+SEARCH_BASE_URL = os.environ.get('SEARCH_BASE_URL', 'https://www.google.com/search')  # point at a local fixture server to benchmark
 GOOGLE_RESULTS_PAGES = 3  # 1 page = top 10, 2 pages = top 20, etc.
 RESULTS_PER_PAGE = 10
 VERBOSE = False  # Toggle detailed [DEBUG] logs
+SEARCH_LANGUAGE = 'en'  # Google interface language (hl)
+SERP_CACHE_PATH = 'serp_cache.sqlite'  # parsed result pages, reused for reruns
+TIMINGS_REPORT = 'akc_timings.json'  # per-phase p50/p95/p99 written at the end of each run
+SERP_CACHE_MAX_AGE = '24h'  # cached pages older than this are fetched again; override with --max-age
 GOOGLE_SHEET_WEBHOOK_URL = "https://script.google.com/macros/s/AKfycbyL_9WQaby13L-iuTRXKHn5ZWtZyQ1RPFDyplqhvJ0gJ4iOsTNsQehrZVCxN-U5FQGh4Q/exec"  # Replace with your URL
 
+INDEX_JOB = 'akc_rank'  # key for this script's rows in the completion index
+STATUS_CHECKED = 'checked'  # rank found, not yet confirmed by Google Sheets
+SHEET_JOURNAL_PATH = 'sheet_journal.sqlite'  # rows not yet accepted by the webhook, replayed on start
+SHEET_BATCH_SIZE = 25  # rows per webhook POST
+SHEET_FLUSH_INTERVAL = 60  # seconds before a partial batch is sent anyway
+SHEET_WEBHOOK_GZIP = False  # gzip request bodies; the Apps Script must then Utilities.ungzip() e.postData
+
 # Domain(s) to detect as the AKC site
 TARGET_DOMAINS = ['sg-akc.com']
+TARGET_MATCHER = DomainMatcher(TARGET_DOMAINS)  # matches the domains and their subdomains
+
+# Deliberate human-like pauses on Google, in seconds; page readiness is waited for separately
+PACING = PacingPolicy({
+    'warm_up': (2.0, 4.0),
+    'serp_dwell': (1.5, 3.0),
+    'between_pages': (0.8, 1.6),
+    'between_searches': (3.0, 6.0),
+    'captcha_backoff': (60, 120),
+    'captcha_manual': (30, 30),
+})
 
 
 def setup_driver():
@@ -39,9 +72,14 @@ def setup_driver():
         options.add_argument('--lang=en-US,en;q=0.9')
         options.add_experimental_option("excludeSwitches", ["enable-automation"])
         options.add_experimental_option('useAutomationExtension', False)
+        if LEAN_BROWSER:
+            lean_browser.apply_lean_options(options, headless=HEADLESS, images=True)
         uc.Chrome.__del__ = lambda self: None
         driver = uc.Chrome(options=options, version_main=None)
-        driver.maximize_window()
+        if LEAN_BROWSER:
+            lean_browser.block_requests(driver, images=True)
+        else:
+            driver.maximize_window()
         
         # Execute stealth scripts to avoid detection
         driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
@@ -60,19 +98,18 @@ def setup_driver():
         options = webdriver.ChromeOptions()
         options.add_argument('--no-sandbox')
         options.add_argument('--disable-dev-shm-usage')
+        if LEAN_BROWSER:
+            lean_browser.apply_lean_options(options, headless=HEADLESS, images=True)
         driver = webdriver.Chrome(options=options)
-        driver.maximize_window()
+        if LEAN_BROWSER:
+            lean_browser.block_requests(driver, images=True)
+        else:
+            driver.maximize_window()
         return driver
 
 
 def wait_until_ready(driver, timeout_seconds=PAGE_READY_TIMEOUT_SECONDS):
-    try:
-        WebDriverWait(driver, timeout_seconds).until(
-            lambda d: d.execute_script('return document.readyState') == 'complete'
-        )
-    except TimeoutException:
-        pass
-    time.sleep(random.uniform(0.5, 1.2))
+    return wait_until(driver, timeout_seconds, idle_ms=NETWORK_IDLE_MS, interactive=LEAN_BROWSER, kind='page_ready')
 
 
 def is_unusual_traffic(driver) -> bool:
@@ -83,69 +120,50 @@ def is_unusual_traffic(driver) -> bool:
 
 
 def get_base_domain(url: str) -> str:
-    try:
-        netloc = urlparse(url).netloc.lower()
-        result = netloc[4:] if netloc.startswith('www.') else netloc
-        if url and not result:
-            if VERBOSE: print(f"[DEBUG] get_base_domain: url='{url[:100]}', netloc='{netloc}', result='{result}'")
-        return result
-    except Exception as e:
-        if VERBOSE: print(f"[DEBUG] get_base_domain error: url='{url[:100] if url else None}', error={str(e)[:50]}")
-        return ''
+    return base_domain(url)
 
 
 def is_target_domain(url: str) -> bool:
     base = get_base_domain(url)
     if not base:
         return False
-    # Check if domain matches or contains target domain
-    for td in TARGET_DOMAINS:
-        match_exact = (base == td)
-        match_endswith = base.endswith('.' + td)
-        match_contains = (td in base)
-        if match_exact or match_endswith or match_contains:
-            print(f"[INFO] Domain match: base='{base}', target='{td}', exact={match_exact}, endswith={match_endswith}, contains={match_contains}")
-            return True
+    td = TARGET_MATCHER.match(base)
+    if td:
+        print(f"[INFO] Domain match: base='{base}', target='{td}'")
+        return True
     return False
 
 
-def _normalize_google_result_href(href: str) -> str:
-    # Convert Google redirect links like /url?q=https://target... to the target URL
-    try:
-        if not href:
-            return href
-        # Handle relative URLs
-        if href.startswith('/url?'):
-            absolute = urljoin('https://www.google.com', href)
-            parsed = urlparse(absolute)
-            q = parse_qs(parsed.query).get('q', [])
-            if q:
-                return q[0]
-        # Handle absolute Google URLs with /url?q=
-        elif 'google.' in href and '/url?' in href:
-            parsed = urlparse(href)
-            q = parse_qs(parsed.query).get('q', [])
-            if q:
-                return q[0]
-        return href
-    except Exception:
-        return href
-
-
 def warm_up_browser(driver):
     """Visit Google homepage first to establish a normal browsing session"""
     try:
         print("[INFO] Warming up browser - visiting Google homepage...")
-        driver.get("https://www.google.com")
+        driver.get(urljoin(SEARCH_BASE_URL, '/'))
         wait_until_ready(driver)
-        # Small delay to appear human
-        time.sleep(random.uniform(2.0, 4.0))
+        PACING.pause('warm_up')
         print("[INFO] Browser warmed up successfully")
     except Exception as e:
         if VERBOSE: print(f"[DEBUG] Error warming up browser: {e}")
 
 
-def google_search_collect_results(driver, query: str, pages: int) -> list[str]:
+def cached_search_results(cache, query: str, pages: int, fresh_after=None):
+    """URLs for all result pages from the SERP cache, or None if any page is missing or stale.
+
+    The pages after one marked last (Google had no more results) are not needed.
+    """
+    collected_urls: list[str] = []
+    for page_index in range(pages):
+        cached = cache.get(query, page_index * RESULTS_PER_PAGE, SEARCH_LANGUAGE, fresh_after)
+        if cached is None:
+            return None
+        page_urls, last = cached
+        collected_urls.extend(page_urls)
+        if last:
+            break
+    return collected_urls
+
+
+def google_search_collect_results(driver, query: str, pages: int, cache=None, fresh_after=None) -> list[str]:
     if VERBOSE: print(f"[DEBUG] google_search_collect_results called: query='{query}', pages={pages}")
     collected_urls: list[str] = []
     
@@ -153,13 +171,23 @@ def google_search_collect_results(driver, query: str, pages: int) -> list[str]:
         for page_index in range(pages):
             if VERBOSE: print(f"[DEBUG] Processing page {page_index + 1} of {pages}")
             start = page_index * RESULTS_PER_PAGE
-            params = {'q': query, 'start': start, 'num': RESULTS_PER_PAGE, 'hl': 'en'}
-            google_url = f"https://www.google.com/search?{urlencode(params)}"
+            if cache is not None:
+                cached = cache.get(query, start, SEARCH_LANGUAGE, fresh_after)
+                if cached is not None:
+                    cached_urls, last = cached
+                    if VERBOSE: print(f"[DEBUG] Page {page_index + 1}: {len(cached_urls)} URLs from SERP cache")
+                    collected_urls.extend(cached_urls)
+                    if last:
+                        break
+                    continue
+            params = {'q': query, 'start': start, 'num': RESULTS_PER_PAGE, 'hl': SEARCH_LANGUAGE}
+            google_url = f"{SEARCH_BASE_URL}?{urlencode(params)}"
             if VERBOSE: print(f"[DEBUG] Loading Google URL: {google_url}")
 
             try:
                 driver.set_page_load_timeout(20)
-                driver.get(google_url)
+                with phase('serp_load'):
+                    driver.get(google_url)
                 if VERBOSE: print(f"[DEBUG] Page loaded successfully")
             except TimeoutException as e:
                 if VERBOSE: print(f"[DEBUG] Page load timeout: {e}")
@@ -175,30 +203,27 @@ def google_search_collect_results(driver, query: str, pages: int) -> list[str]:
             wait_until_ready(driver)
             if VERBOSE: print(f"[DEBUG] Page ready, waiting for results...")
             
-            # Add a small random delay to appear more human-like
-            time.sleep(random.uniform(1.5, 3.0))
+            # Linger on the page like a person would
+            PACING.pause('serp_dwell')
 
             if is_unusual_traffic(driver):
                 # Back off instead of hammering
-                wait_time = random.randint(60, 120)
-                if VERBOSE: print(f"[DEBUG] Unusual traffic detected, waiting {wait_time} seconds...")
+                if VERBOSE: print(f"[DEBUG] Unusual traffic detected, backing off...")
                 if VERBOSE: print(f"[DEBUG] This may be a CAPTCHA. Please check the browser window.")
-                time.sleep(wait_time)
+                PACING.pause('captcha_backoff')
                 
                 # Try to refresh the page after waiting
                 try:
                     driver.refresh()
                     wait_until_ready(driver)
-                    time.sleep(3)
                     
                     # Check again if still blocked
                     if is_unusual_traffic(driver):
                         if VERBOSE: print(f"[DEBUG] Still blocked after refresh. You may need to solve CAPTCHA manually.")
-                        if VERBOSE: print(f"[DEBUG] Waiting additional 30 seconds for manual intervention...")
-                        time.sleep(30)
+                        if VERBOSE: print(f"[DEBUG] Waiting for manual intervention...")
+                        PACING.pause('captcha_manual')
                         driver.refresh()
                         wait_until_ready(driver)
-                        time.sleep(3)
                 except Exception as e:
                     if VERBOSE: print(f"[DEBUG] Error refreshing page: {e}")
                 
@@ -207,257 +232,57 @@ def google_search_collect_results(driver, query: str, pages: int) -> list[str]:
                     if VERBOSE: print(f"[DEBUG] Page still shows unusual traffic. Skipping this page.")
                     continue
 
-            # Wait for results to load - try waiting for specific elements
-            try:
-                WebDriverWait(driver, 5).until(
-                    lambda d: len(d.find_elements(By.CSS_SELECTOR, 'div.g, div.yuRUbf, cite')) > 0
-                )
+            # Wait until result containers exist and the page has stopped loading
+            if wait_until(driver, RESULTS_TIMEOUT_SECONDS, selector=RESULTS_SELECTOR,
+                          idle_ms=NETWORK_IDLE_MS, interactive=LEAN_BROWSER, kind='serp_results'):
                 if VERBOSE: print(f"[DEBUG] Results loaded successfully")
-            except TimeoutException:
+            else:
                 if VERBOSE: print(f"[DEBUG] Timeout waiting for results to load")
-            
-            # Wait a bit more for results to render
-            time.sleep(2)
 
             # Debug: Check page structure
             if VERBOSE: print(f"\n[DEBUG] Page title: {driver.title}")
             if VERBOSE: print(f"[DEBUG] Page URL: {driver.current_url}")
             
-            # Try to find ANY cite elements on the page
-            all_cites = driver.find_elements(By.CSS_SELECTOR, 'cite')
-            if VERBOSE: print(f"[DEBUG] Found {len(all_cites)} cite elements on page")
-            if all_cites:
-                for i, cite in enumerate(all_cites[:5], 1):  # Show first 5
-                    try:
-                        cite_text = cite.text.strip()
-                        print(f"  Cite {i}: {cite_text[:100]}")
-                    except:
-                        pass
-            
-            # Try to find ANY links in search results
-            all_links = driver.find_elements(By.CSS_SELECTOR, '#search a, #rso a')
-            if VERBOSE: print(f"[DEBUG] Found {len(all_links)} links in search area")
-            
-            # Try multiple selectors to find result blocks
-            result_blocks = []
-            selectors_to_try = [
-                'div.yuRUbf',  # Standard organic results
-                'div[class*="yuRUbf"]',  # With class variations
-                'div.g',  # Generic result container
-                'div[data-sokoban-container]',  # Another container type
-                'div[class*="g"]',  # Any div with g class
-                'div#search div[class*="g"]',  # Results in search div
-            ]
-            
-            for selector in selectors_to_try:
-                blocks = driver.find_elements(By.CSS_SELECTOR, selector)
-                if blocks:
-                    result_blocks = blocks
-                    if VERBOSE: print(f"[DEBUG] Found {len(blocks)} result blocks using selector: {selector}")
-                    break
-            
-            if not result_blocks:
-                if VERBOSE: print(f"[DEBUG] No result blocks found with any selector")
-                # Try to find div.byrV5b which contains the cite
-                byrV5b_blocks = driver.find_elements(By.CSS_SELECTOR, 'div.byrV5b')
-                if VERBOSE: print(f"[DEBUG] Found {len(byrV5b_blocks)} div.byrV5b blocks")
-                if byrV5b_blocks:
-                    result_blocks = byrV5b_blocks
-                    if VERBOSE: print(f"[DEBUG] Using div.byrV5b blocks as result containers")
-            
+            # Fetch the page once and parse it offline
+            with phase('serp_parse'):
+                try:
+                    html = driver.page_source
+                except Exception as e:
+                    if VERBOSE: print(f"[DEBUG] Could not read page source: {e}")
+                    html = ''
+                results = parse_serp(html)
+            if VERBOSE: print(f"[DEBUG] Parsed {len(results)} result blocks")
+
             page_urls = []
             seen = set()
-            
-            if VERBOSE: print(f"[DEBUG] Processing {len(result_blocks)} result blocks...")
-            
-            for block_idx, block in enumerate(result_blocks, 1):
-                try:
-                    if not block.is_displayed():
-                        print(f"[DEBUG] Block {block_idx}: Not displayed, skipping")
-                        continue
-                
-                    print(f"[DEBUG] ===== Block {block_idx} ======")
-                    
-                    # Extract from cite element first (most reliable for domain matching)
-                    # The cite element contains the URL like "https://www.sg-akc.com › category › food-safety-courses"
-                    href = None
-                    cite = None
-                    try:
-                        # Try multiple cite selectors
-                        cite_selectors = [
-                            'cite', 
-                            'cite.qLRx3b', 
-                            'cite[class*="qLRx3b"]', 
-                            'cite[class*="tjvcx"]',
-                            'cite[class*="GvPZzd"]',
-                            'div.byrV5b cite',
-                            '.byrV5b cite'
-                        ]
-                        for cite_sel in cite_selectors:
-                            try:
-                                cite = block.find_element(By.CSS_SELECTOR, cite_sel)
-                                if cite:
-                                    cite_text_check = cite.text.strip()
-                                    print(f"[DEBUG] Block {block_idx}: Found cite with selector '{cite_sel}', text: '{cite_text_check[:100]}'")
-                                    if cite_text_check:
-                                        break
-                            except Exception as e:
-                                print(f"[DEBUG] Block {block_idx}: Selector '{cite_sel}' failed: {str(e)[:50]}")
-                                continue
-                        
-                        if not cite:
-                            print(f"[DEBUG] Block {block_idx}: No cite element found with any selector")
-                        
-                        if cite:
-                            # Extract URL from cite element
-                            # The cite structure: <cite>https://www.sg-akc.com<span> › category › food-safety-courses</span></cite>
-                            
-                            print(f"[DEBUG] Block {block_idx}: Starting cite extraction...")
-                            
-                            # Method 1: Try textContent which includes all text nodes
-                            cite_text = None
-                            try:
-                                cite_text = cite.get_attribute('textContent') or cite.get_attribute('innerText')
-                                if cite_text:
-                                    cite_text = cite_text.strip()
-                                    print(f"[DEBUG] Block {block_idx}: Method 1 (textContent/innerText): '{cite_text[:150]}'")
-                            except Exception as e:
-                                print(f"[DEBUG] Block {block_idx}: Method 1 failed: {str(e)[:50]}")
-                            
-                            # Method 2: Fallback to .text property
-                            if not cite_text:
-                                try:
-                                    cite_text = cite.text.strip()
-                                    print(f"[DEBUG] Block {block_idx}: Method 2 (.text property): '{cite_text[:150]}'")
-                                except Exception as e:
-                                    print(f"[DEBUG] Block {block_idx}: Method 2 failed: {str(e)[:50]}")
-                            
-                            # Method 3: Extract directly from outerHTML using regex
-                            if not cite_text or not cite_text.startswith('http'):
-                                try:
-                                    outer_html = cite.get_attribute('outerHTML') or ''
-                                    print(f"[DEBUG] Block {block_idx}: Method 3 (outerHTML): '{outer_html[:200]}'")
-                                    # Extract URL pattern: https://www.sg-akc.com
-                                    url_pattern = r'https?://[^\s<>&"]+'
-                                    url_match = re.search(url_pattern, outer_html)
-                                    if url_match:
-                                        cite_text = url_match.group(0)
-                                        print(f"[DEBUG] Block {block_idx}: Method 3 extracted: '{cite_text}'")
-                                except Exception as e:
-                                    print(f"[DEBUG] Block {block_idx}: Method 3 failed: {str(e)[:50]}")
-                            
-                            if cite_text:
-                                print(f"[DEBUG] Block {block_idx}: Processing cite_text: '{cite_text[:150]}'")
-                                
-                                # Extract the base URL (everything before the first ›, space, or <)
-                                # Format: "https://www.sg-akc.com › category › food-safety-courses"
-                                # Or: "https://www.sg-akc.com" (without path)
-                                
-                                # Remove any HTML entities
-                                cite_text = cite_text.replace('&nbsp;', ' ').replace('&amp;', '&').strip()
-                                
-                                # Extract base URL - everything before first ›, <, or space (if not part of URL)
-                                if '›' in cite_text:
-                                    base_url = cite_text.split('›')[0].strip()
-                                    print(f"[DEBUG] Block {block_idx}: Split by ›, base_url: '{base_url}'")
-                                elif '<' in cite_text:
-                                    base_url = cite_text.split('<')[0].strip()
-                                    print(f"[DEBUG] Block {block_idx}: Split by <, base_url: '{base_url}'")
-                                elif ' ' in cite_text:
-                                    # If it starts with http, take first word (the URL)
-                                    if cite_text.startswith('http'):
-                                        base_url = cite_text.split()[0]
-                                        print(f"[DEBUG] Block {block_idx}: Split by space (http detected), base_url: '{base_url}'")
-                                    else:
-                                        base_url = cite_text
-                                        print(f"[DEBUG] Block {block_idx}: Split by space (no http), base_url: '{base_url}'")
-                                else:
-                                    base_url = cite_text.strip()
-                                    print(f"[DEBUG] Block {block_idx}: No split needed, base_url: '{base_url}'")
-                                
-                                # Normalize to full URL - just need domain for ranking
-                                if base_url.startswith('http'):
-                                    href = base_url
-                                    print(f"[DEBUG] Block {block_idx}: href normalized (http): '{href[:100]}'")
-                                elif '.' in base_url:
-                                    href = f"https://{base_url}"
-                                    print(f"[DEBUG] Block {block_idx}: href normalized (added https): '{href[:100]}'")
-                                else:
-                                    href = None
-                                    print(f"[DEBUG] Block {block_idx}: Could not normalize href from: '{base_url}'")
-                                
-                                if href:
-                                    domain = get_base_domain(href)
-                                    is_akc = is_target_domain(href)
-                                    print(f"[DEBUG] Block {block_idx}: Final href: '{href[:100]}', domain: '{domain}', is_akc: {is_akc}")
-                            else:
-                                print(f"[DEBUG] Block {block_idx}: No cite_text extracted")
-                    except Exception as e:
-                        print(f"[DEBUG] Error extracting cite: {e}")
-                        pass
-                    
-                    # Fallback: try to get href from anchor if cite didn't work
-                    if not href or not href.startswith('http'):
-                        print(f"[DEBUG] Block {block_idx}: Trying anchor fallback...")
-                        try:
-                            # Try multiple anchor selectors
-                            a = None
-                            anchor_selectors = ['a', 'a[href]', 'h3 a']
-                            for anchor_sel in anchor_selectors:
-                                try:
-                                    a = block.find_element(By.CSS_SELECTOR, anchor_sel)
-                                    if a:
-                                        href_attr_raw = a.get_attribute('href') or ''
-                                        print(f"[DEBUG] Block {block_idx}: Found anchor with selector '{anchor_sel}', raw href: '{href_attr_raw[:100]}'")
-                                        break
-                                except Exception as e:
-                                    print(f"[DEBUG] Block {block_idx}: Anchor selector '{anchor_sel}' failed: {str(e)[:50]}")
-                                    continue
-                            
-                            if a:
-                                href_attr = a.get_attribute('href') or ''
-                                if href_attr:
-                                    href = _normalize_google_result_href(href_attr)
-                                    print(f"[DEBUG] Block {block_idx}: Normalized anchor href: '{href[:100]}'")
-                            else:
-                                print(f"[DEBUG] Block {block_idx}: No anchor found")
-                        except Exception as e:
-                            print(f"[DEBUG] Block {block_idx}: Error extracting anchor: {e}")
-                            pass
-                    
-                    if not href or not href.startswith('http'):
-                        if href:
-                            if VERBOSE: print(f"[DEBUG] Block {block_idx}: Skipping invalid href: '{href[:80]}'")
-                        else:
-                            if VERBOSE: print(f"[DEBUG] Block {block_idx}: No href extracted")
-                        continue
-                    
-                    domain = get_base_domain(href)
-                    if VERBOSE: print(f"[DEBUG] Block {block_idx}: Extracted domain: '{domain}'")
-                    
-                    # Check if it's AKC
-                    is_akc = is_target_domain(href)
-                    if VERBOSE: print(f"[DEBUG] Block {block_idx}: Is AKC domain? {is_akc}")
-                    
-                    # Filter out Google-owned or non-organic domains
-                    if any(x in domain for x in ['google.', 'gstatic.', 'youtube.', 'webcache.googleusercontent']):
-                        if VERBOSE: print(f"[DEBUG] Block {block_idx}: Skipping Google domain: {domain}")
-                        continue
-                    if '/maps' in href or '/search?' in href:
-                        if VERBOSE: print(f"[DEBUG] Block {block_idx}: Skipping maps/search link: {href[:80]}")
-                        continue
-                    
-                    # Deduplicate by domain for organic results
-                    if domain and domain not in seen:
-                        seen.add(domain)
-                        page_urls.append(href)
-                        if VERBOSE: print(f"[DEBUG] Block {block_idx}: ✓ Added URL #{len(page_urls)}: domain='{domain}', href='{href[:100]}', is_akc={is_akc}")
-                    else:
-                        if VERBOSE: print(f"[DEBUG] Block {block_idx}: ✗ Skipping duplicate domain: '{domain}'")
-                except Exception:
+
+            for result in results:
+                href = result.url
+                domain = get_base_domain(href)
+                if VERBOSE: print(f"[DEBUG] Block {result.position}: href='{href[:100]}', domain='{domain}'")
+
+                # Filter out Google-owned or non-organic domains
+                if any(x in domain for x in ['google.', 'gstatic.', 'youtube.', 'webcache.googleusercontent']):
+                    if VERBOSE: print(f"[DEBUG] Block {result.position}: Skipping Google domain: {domain}")
+                    continue
+                if '/maps' in href or '/search?' in href:
+                    if VERBOSE: print(f"[DEBUG] Block {result.position}: Skipping maps/search link: {href[:80]}")
                     continue
 
+                # Deduplicate by domain for organic results
+                if domain and domain not in seen:
+                    seen.add(domain)
+                    page_urls.append(href)
+                    if VERBOSE: print(f"[DEBUG] Block {result.position}: ✓ Added URL #{len(page_urls)}: domain='{domain}', href='{href[:100]}'")
+                else:
+                    if VERBOSE: print(f"[DEBUG] Block {result.position}: ✗ Skipping duplicate domain: '{domain}'")
+
             collected_urls.extend(page_urls)
+            # Blocked pages never get here, so a page without result blocks means
+            # Google has run out of results for this query
+            last = not results
+            if cache is not None:
+                cache.put(query, start, SEARCH_LANGUAGE, page_urls, last=last)
             if VERBOSE: print(f"[DEBUG] Page {page_index + 1}: Collected {len(page_urls)} URLs (total: {len(collected_urls)})")
             
             # Save screenshot for debugging if no URLs found
@@ -468,8 +293,11 @@ def google_search_collect_results(driver, query: str, pages: int) -> list[str]:
                     if VERBOSE: print(f"[DEBUG] Saved screenshot to {screenshot_path}")
                 except Exception as e:
                     if VERBOSE: print(f"[DEBUG] Could not save screenshot: {e}")
-            
-            time.sleep(random.uniform(0.8, 1.6))
+
+            if last:
+                if VERBOSE: print(f"[DEBUG] No more results after page {page_index + 1}")
+                break
+            PACING.pause('between_pages')
     
     except Exception as e:
         if VERBOSE: print(f"[DEBUG] ERROR in google_search_collect_results: {e}")
@@ -480,9 +308,12 @@ def google_search_collect_results(driver, query: str, pages: int) -> list[str]:
     return collected_urls
 
 
-def find_rank_for_query(driver, query: str, pages: int):
-    urls = google_search_collect_results(driver, query, pages)
-    
+def find_rank_for_query(driver, query: str, pages: int, cache=None, fresh_after=None):
+    urls = google_search_collect_results(driver, query, pages, cache, fresh_after)
+    return rank_from_urls(urls, pages)
+
+
+def rank_from_urls(urls: list[str], pages: int):
     # Extract top 3 company domains
     top3_domains = []
     for url in urls[:3]:
@@ -503,68 +334,145 @@ def find_rank_for_query(driver, query: str, pages: int):
     return None, None, top3_str
 
 
-def read_search_terms_from_excel(path: str) -> list[str]:
-    df = pd.read_excel(path)
-    if df.empty:
-        return []
-    return df.iloc[:, 0].dropna().astype(str).tolist()
+def read_search_terms(path: str) -> list[str]:
+    # Streams the first column (xlsx/csv/parquet) without loading the workbook into pandas
+    return read_terms(path)
 
 
-def write_results_to_google_sheets(rows):
-    if not rows:
-        print("[WARN] No data to send to Google Sheets.")
-        return
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Check Google rankings of TARGET_DOMAINS for the terms in INPUT_EXCEL')
+    parser.add_argument('--resume', action='store_true', help='skip terms already checked and uploaded in a previous run')
+    parser.add_argument('--since', help="skip only terms completed within this window, e.g. 7d, 12h or 2025-01-31 (implies --resume)")
+    parser.add_argument('--max-age', default=SERP_CACHE_MAX_AGE, help=f'reuse cached result pages younger than this, e.g. 6h or 2d (default {SERP_CACHE_MAX_AGE})')
+    parser.add_argument('--no-cache', action='store_true', help='always load result pages from Google (fresh pages are still cached)')
+    parser.add_argument('--no-pacing', action='store_true', help='skip the deliberate pauses between Google requests (local testing only)')
+    parser.add_argument('--profile-term', help='write cProfile and tracemalloc dumps (to profiles/) while checking this term')
+    parser.add_argument('--from-cache', action='store_true', help='recompute ranks from cached result pages of any age without opening a browser')
+    return parser.parse_args(argv)
 
-    try:
-        response = requests.post(
-            GOOGLE_SHEET_WEBHOOK_URL,
-            data=json.dumps(rows),
-            headers={'Content-Type': 'application/json'}
-        )
-        if response.status_code == 200:
-            print("[INFO] Successfully wrote data to Google Sheets.")
-        else:
-            print(f"[ERROR] Google Sheets returned {response.status_code}: {response.text}")
-    except Exception as e:
-        print(f"[ERROR] Failed to write to Google Sheets: {e}")
 
-
-def main():
-    terms = read_search_terms_from_excel(INPUT_EXCEL)
+def main(argv=None):
+    args = parse_args(argv)
+    terms = read_search_terms(INPUT_EXCEL)
     if not terms:
         print('No search terms found in the first column of the Excel file.')
         return
 
-    driver = setup_driver()
-    
-    # Warm up the browser by visiting Google homepage first
-    warm_up_browser(driver)
+    index = CompletionIndex(job=INDEX_JOB)
+
+    if args.resume or args.since:
+        fresh_after = parse_since(args.since) if args.since else None
+        pending = list(index.filter_pending(terms, fresh_after, finished=(STATUS_DONE, STATUS_CHECKED)))
+        print(f"[INFO] Resume: {len(terms) - len(pending)} of {len(terms)} terms already done, {len(pending)} to check")
+        terms = pending
+
+    # Rows are uploaded in batches while the run goes on; unsent ones from earlier runs are replayed first
+    uploader = SheetUploader(GOOGLE_SHEET_WEBHOOK_URL, SHEET_JOURNAL_PATH, SHEET_BATCH_SIZE,
+                             SHEET_FLUSH_INTERVAL, compress=SHEET_WEBHOOK_GZIP)
+
+    def mark_uploaded():
+        for uploaded in uploader.confirmed():
+            index.mark_done(uploaded['Search term'], result=uploaded)
+
+    # Rows checked by an earlier run that never reached the journal are sent with this run
+    rerun = {normalize_term(t) for t in terms}
+    journaled = {normalize_term(r.get('Search term', '')) for r in uploader.pending_rows()}
+    carried = [
+        rec['result'] for rec in index.records(status=STATUS_CHECKED)
+        if rec['result'] and normalize_term(rec['term']) not in rerun | journaled
+    ]
+    if carried:
+        print(f"[INFO] Carrying over {len(carried)} checked but unsent rows from a previous run")
+        for row in carried:
+            uploader.add(row)
+    if not terms and not carried and not journaled:
+        print('[INFO] Nothing to do.')
+        uploader.close()
+        index.close()
+        return
+
+    PACING.enabled = not args.no_pacing
+    cache = SerpCache(SERP_CACHE_PATH)
+    if args.from_cache:
+        cache_fresh_after = None
+    elif args.no_cache:
+        cache_fresh_after = datetime.now()  # only pages loaded during this run
+    else:
+        cache_fresh_after = parse_since(args.max_age)
+    cached_terms = 0
+    driver = None  # started on the first term the cache cannot answer
     
-    results_rows: list[dict] = []
     today = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
     try:
         for term in terms:
-            rank, page, top3 = find_rank_for_query(driver, term, GOOGLE_RESULTS_PAGES)
-            results_rows.append({
+            urls = cached_search_results(cache, term, GOOGLE_RESULTS_PAGES, cache_fresh_after)
+            if urls is None and args.from_cache:
+                print(f"[WARN] No complete cached results for '{term}', skipping")
+                continue
+            index.mark_started(term)
+            try:
+                if urls is not None:
+                    if VERBOSE: print(f"[DEBUG] '{term}' answered from SERP cache")
+                    cached_terms += 1
+                    rank, page, top3 = rank_from_urls(urls, GOOGLE_RESULTS_PAGES)
+                else:
+                    if driver is None:
+                        with phase('driver_startup'):
+                            driver = setup_driver()
+                        # Warm up the browser by visiting Google homepage first
+                        warm_up_browser(driver)
+                    if args.profile_term and normalize_term(term) == normalize_term(args.profile_term):
+                        with profiled(term):
+                            rank, page, top3 = find_rank_for_query(
+                                driver, term, GOOGLE_RESULTS_PAGES,
+                                cache=cache, fresh_after=cache_fresh_after,
+                            )
+                    else:
+                        rank, page, top3 = find_rank_for_query(
+                            driver, term, GOOGLE_RESULTS_PAGES,
+                            cache=cache, fresh_after=cache_fresh_after,
+                        )
+            except Exception as e:
+                index.mark_failed(term, e)
+                raise
+            row = {
                 'Search term': term,
                 'Results Ranking': rank if rank is not None else 'Not Found',
                 'Page No.': page if page is not None else 'N/A',
                 'Top 3 Companies': top3,
                 'Date': today,
-            })
+            }
+            index.mark(term, STATUS_CHECKED, result=row)
+            uploader.add(row)
+            mark_uploaded()
+            if urls is not None:
+                continue  # nothing was loaded from Google, no need to pause
             # longer human-like pause between searches to avoid detection
-            delay = random.uniform(3.0, 6.0)
-            if VERBOSE: print(f"[DEBUG] Waiting {delay:.1f} seconds before next search...")
-            time.sleep(delay)
+            delay = PACING.pause('between_searches')
+            if VERBOSE: print(f"[DEBUG] Waited {delay:.1f} seconds before next search")
     finally:
         try:
-            driver.quit()
+            if driver is not None:
+                driver.quit()
         except Exception:
             pass
+        print(f"[INFO] {cached_terms} terms answered from the SERP cache")
+        print(f"[INFO] Wait time: {WAIT_STATS.report()}")
+        cache.close()
+
+        unsent = uploader.close()
+        mark_uploaded()
+        print(f"[INFO] Google Sheets upload: {uploader.summary()}")
+        if unsent:
+            print(f"[WARN] {unsent} rows kept in {SHEET_JOURNAL_PATH}; they will be sent on the next run")
+        else:
+            print(f"Wrote {uploader.stats['rows_sent']} rows to sheet '{OUTPUT_SHEET_NAME}'")
+        index.close()
 
-    write_results_to_google_sheets(results_rows)
-    print(f"Wrote {len(results_rows)} rows to sheet '{OUTPUT_SHEET_NAME}' in {INPUT_EXCEL}")
+    report = write_report(TIMINGS_REPORT, {'akc': TIMINGS.to_dict()})
+    if report['overall']:
+        print(f"[INFO] Phase timings (full report in {TIMINGS_REPORT}):\n{format_summary(report['overall'])}")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,111 @@
+# Compare the default Chrome profile with the lean one (lean_browser.py)
+#
+# Loads each URL with both profiles and reports bytes transferred (sum of CDP
+# Network.loadingFinished encodedDataLength from the performance log), time
+# until page_waits says the page is ready, and Chrome's resident memory when
+# psutil is installed.
+#
+# Usage: python benchmarks/bench_browser_profile.py [--headed] URL [URL ...]
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from selenium import webdriver
+
+import lean_browser
+from page_waits import wait_until
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+DEFAULT_URLS = ['https://www.python.org/', 'https://en.wikipedia.org/wiki/Singapore']
+READY_TIMEOUT = 20
+NETWORK_IDLE_MS = 500
+
+
+def make_driver(lean, headless):
+    options = webdriver.ChromeOptions()
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    if lean:
+        lean_browser.apply_lean_options(options, headless=headless)
+    elif headless:
+        options.add_argument('--headless=new')
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    driver = webdriver.Chrome(options=options)
+    if lean:
+        lean_browser.block_requests(driver)
+    else:
+        driver.execute_cdp_cmd('Network.enable', {})
+    return driver
+
+
+def transferred_bytes(driver) -> int:
+    total = 0
+    for entry in driver.get_log('performance'):
+        message = json.loads(entry['message'])['message']
+        if message.get('method') == 'Network.loadingFinished':
+            total += int(message['params'].get('encodedDataLength', 0))
+    return total
+
+
+def chrome_rss_mb(driver):
+    if psutil is None:
+        return None
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        procs = [root] + root.children(recursive=True)
+        return sum(p.memory_info().rss for p in procs) / 1e6
+    except Exception:
+        return None
+
+
+def run(urls, lean, headless):
+    driver = make_driver(lean, headless)
+    rows = []
+    try:
+        driver.get('about:blank')
+        transferred_bytes(driver)  # drain the log
+        for url in urls:
+            start = time.perf_counter()
+            driver.get(url)
+            wait_until(driver, READY_TIMEOUT, min_text_chars=1, idle_ms=NETWORK_IDLE_MS, interactive=lean)
+            elapsed = time.perf_counter() - start
+            rows.append((url, transferred_bytes(driver), elapsed))
+        rss = chrome_rss_mb(driver)
+    finally:
+        driver.quit()
+    return rows, rss
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the default and lean Chrome profiles')
+    parser.add_argument('urls', nargs='*', default=DEFAULT_URLS)
+    parser.add_argument('--headed', action='store_true', help='run both profiles with a window')
+    args = parser.parse_args()
+
+    results = {}
+    for lean in (False, True):
+        results[lean] = run(args.urls, lean, headless=not args.headed)
+
+    print(f"{'url':<50} {'full KB':>10} {'lean KB':>10} {'full s':>8} {'lean s':>8}")
+    for (url, full_bytes, full_s), (_, lean_bytes, lean_s) in zip(results[False][0], results[True][0]):
+        print(f"{url[:50]:<50} {full_bytes / 1e3:>10.0f} {lean_bytes / 1e3:>10.0f} {full_s:>8.2f} {lean_s:>8.2f}")
+    full_total = sum(r[1] for r in results[False][0])
+    lean_total = sum(r[1] for r in results[True][0])
+    full_time = sum(r[2] for r in results[False][0])
+    lean_time = sum(r[2] for r in results[True][0])
+    print(f"{'total':<50} {full_total / 1e3:>10.0f} {lean_total / 1e3:>10.0f} {full_time:>8.2f} {lean_time:>8.2f}")
+    if results[False][1] is not None and results[True][1] is not None:
+        print(f"Chrome RSS after run: full {results[False][1]:.0f} MB, lean {results[True][1]:.0f} MB")
+
+
+if __name__ == '__main__':
+    main()
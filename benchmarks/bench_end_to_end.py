@@ -0,0 +1,374 @@
+# Offline end-to-end benchmark for scraper_bot2v1 and akc_rank_checker
+#
+# Starts benchmarks/fixture_web.py (a local search engine plus a generated
+# population of company sites), points SEARCH_BASE_URL at it and runs the real
+# scripts in a temporary directory. Reports terms/min, pages/min, leads/min,
+# peak RSS (Chrome included when psutil is installed) and output correctness
+# against the fixture's ground truth: email/phone/address recall and precision
+# for the scraper, rank accuracy for the rank checker.
+#
+# --target check needs no Chrome: it runs the HTTP half of the pipeline
+# (serp_parser, page_fetcher, subpage_crawler, lead_extractor) in-process
+# against the same fixtures, which catches parser regressions quickly.
+#
+# Usage: python benchmarks/bench_end_to_end.py [--target scraper|akc|both|check] [--companies 30] [--workers 2]
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from multiprocessing import Event, Process
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+import openpyxl
+import pandas as pd
+
+import fixture_web
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    import resource  # POSIX only
+except ImportError:
+    resource = None
+
+DEFAULT_PORT = 8765
+RSS_SAMPLE_SECONDS = 0.5
+RUN_TIMEOUT = 3600
+REPORT_PATH = 'bench_end_to_end.json'
+
+# Imported by every child Python process (PYTHONPATH), so requests/aiohttp resolve *.localhost like Chrome
+SITECUSTOMIZE = f"""import sys
+sys.path.insert(0, {BENCH_DIR!r})
+import fixture_web
+fixture_web.resolve_localhost()
+"""
+
+AKC_RUNNER = """import sys
+sys.path.insert(0, {repo!r})
+import akc_rank_checker as akc
+from domains import DomainMatcher
+akc.HEADLESS = True
+akc.TARGET_DOMAINS = [{target!r}]
+akc.TARGET_MATCHER = DomainMatcher(akc.TARGET_DOMAINS)
+akc.GOOGLE_SHEET_WEBHOOK_URL = {webhook!r}
+akc.main(['--no-pacing', '--no-cache'])
+"""
+
+
+def start_fixture(pop, port, webhook_path=None):
+    ready = Event()
+    server = Process(target=fixture_web.serve, args=(len(pop.companies), pop.seed, port, webhook_path, ready), daemon=True)
+    server.start()
+    if not ready.wait(10):
+        server.terminate()
+        raise RuntimeError(f"fixture server did not start on port {port}")
+    return server
+
+
+def write_input(path, header, values):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append([header])
+    for value in values:
+        ws.append([value])
+    wb.save(path)
+
+
+def child_env(workdir, port):
+    with open(os.path.join(workdir, 'sitecustomize.py'), 'w', encoding='utf-8') as f:
+        f.write(SITECUSTOMIZE)
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [workdir, env.get('PYTHONPATH')]))
+    env['SEARCH_BASE_URL'] = f"http://127.0.0.1:{port}/search"
+    env['PYTHONUNBUFFERED'] = '1'
+    return env
+
+
+def _tree_rss(proc) -> int:
+    try:
+        procs = [proc] + proc.children(recursive=True)
+    except psutil.Error:
+        return 0
+    total = 0
+    for p in procs:
+        try:
+            total += p.memory_info().rss
+        except psutil.Error:
+            pass
+    return total
+
+
+def run_measured(cmd, cwd, env, log_name):
+    """Run cmd to completion; return (elapsed seconds, peak RSS MB or None, exit code, log path)."""
+    log_path = os.path.join(cwd, log_name)
+    start = time.perf_counter()
+    peak = 0
+    with open(log_path, 'w', encoding='utf-8') as log:
+        child = subprocess.Popen(cmd, cwd=cwd, env=env, stdout=log, stderr=subprocess.STDOUT)
+        watched = psutil.Process(child.pid) if psutil is not None else None
+        deadline = time.time() + RUN_TIMEOUT
+        while child.poll() is None:
+            if watched is not None:
+                peak = max(peak, _tree_rss(watched))
+            if time.time() > deadline:
+                child.kill()
+                break
+            time.sleep(RSS_SAMPLE_SECONDS)
+        child.wait()
+    elapsed = time.perf_counter() - start
+    if watched is None:
+        if resource is None:
+            return elapsed, None, child.returncode, log_path  # no psutil on Windows: RSS not reported
+        # Without psutil only the largest single descendant is known (KB on Linux)
+        peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * 1024
+    return elapsed, peak / 1e6, child.returncode, log_path
+
+
+def _digits(phone) -> str:
+    return re.sub(r'\D', '', str(phone))[-8:]
+
+
+def score(found, truth) -> dict:
+    found, truth = set(found), set(truth)
+    hits = len(found & truth)
+    return {
+        'expected': len(truth),
+        'found': len(found),
+        'recall': round(hits / len(truth), 4) if truth else None,
+        'precision': round(hits / len(found), 4) if found else None,
+    }
+
+
+def lead_truth(companies) -> dict:
+    return {
+        'emails': {e.lower() for c in companies for e in c.emails},
+        'phones': {_digits(c.phone) for c in companies},
+        'addresses': {c.address for c in companies},
+    }
+
+
+def score_leads(companies, emails, phones, addresses) -> dict:
+    truth = lead_truth(companies)
+    found_addresses = {a for a in truth['addresses'] if any(a in str(f) for f in addresses)}
+    return {
+        'emails': score({str(e).strip().lower() for e in emails if str(e).strip()}, truth['emails']),
+        'phones': score({_digits(p) for p in phones if _digits(p)}, truth['phones']),
+        'addresses': {'expected': len(truth['addresses']), 'found': len(found_addresses),
+                      'recall': round(len(found_addresses) / len(truth['addresses']), 4) if truth['addresses'] else None},
+    }
+
+
+def score_ranks(pop, terms, rows) -> dict:
+    by_term = {fixture_web.normalize_query(r.get('Search term', '')): r for r in rows}
+    correct, missing, wrong = 0, 0, []
+    for term in terms:
+        row = by_term.get(fixture_web.normalize_query(term))
+        if row is None:
+            missing += 1
+            continue
+        expected = fixture_web.target_rank(term, pop.seed)
+        got = row.get('Results Ranking')
+        if (expected is None and got == 'Not Found') or got == expected:
+            correct += 1
+        else:
+            wrong.append({'term': term, 'expected': expected, 'got': got})
+    return {'terms': len(terms), 'correct': correct, 'missing': missing,
+            'accuracy': round(correct / len(terms), 4) if terms else None, 'wrong': wrong[:20]}
+
+
+def per_minute(count, seconds):
+    return round(count / seconds * 60, 2) if seconds > 0 else None
+
+
+def bench_scraper(pop, port, workers, workdir):
+    names = [c.name for c in pop.companies]
+    write_input(os.path.join(workdir, 'Book1.xlsx'), 'Company Name', names)
+    cmd = [sys.executable, os.path.join(REPO_DIR, 'scraper_bot2v1.py'),
+           '--workers', str(workers), '--status-port', '0', '--no-pacing', '--headless']
+    elapsed, rss_mb, code, log_path = run_measured(cmd, workdir, child_env(workdir, port), 'scraper.log')
+
+    status = {}
+    try:
+        with open(os.path.join(workdir, 'run_status.json'), encoding='utf-8') as f:
+            status = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"[WARN] No run status from the scraper: {e}")
+
+    emails, phones, addresses = [], [], []
+    output = os.path.join(workdir, 'rename_Contacts_Emails.xlsx')
+    if os.path.exists(output):
+        contacts = pd.read_excel(output, sheet_name='Contacts').fillna('')
+        emails, phones, addresses = contacts['Emails'].tolist(), contacts['Contacts'].tolist(), contacts['Address'].tolist()
+    else:
+        print(f"[WARN] Scraper wrote no {output}; see {log_path}")
+
+    return {
+        'exit_code': code,
+        'elapsed_seconds': round(elapsed, 2),
+        'peak_rss_mb': round(rss_mb, 1) if rss_mb is not None else None,
+        'terms': len(names),
+        'terms_done': status.get('terms_done'),
+        'pages': status.get('pages'),
+        'leads': status.get('leads'),
+        'errors': status.get('errors'),
+        'terms_per_min': per_minute(status.get('terms_done', 0), elapsed),
+        'pages_per_min': per_minute(status.get('pages', 0), elapsed),
+        'leads_per_min': per_minute(status.get('leads', 0), elapsed),
+        'correctness': score_leads(pop.companies, emails, phones, addresses),
+        'log': log_path,
+    }
+
+
+def bench_akc(pop, port, workdir):
+    webhook_path = os.path.join(workdir, 'webhook_rows.jsonl')
+    server = start_fixture(pop, port + 1, webhook_path)  # its own server so the webhook file lands here
+    try:
+        write_input(os.path.join(workdir, 'Book1.xlsx'), 'Search Term', pop.terms)
+        runner = AKC_RUNNER.format(repo=REPO_DIR, target=f"{fixture_web.TARGET_SLUG}.{fixture_web.SITE_SUFFIX}",
+                                   webhook=f"http://127.0.0.1:{port + 1}/webhook")
+        env = child_env(workdir, port + 1)
+        elapsed, rss_mb, code, log_path = run_measured([sys.executable, '-c', runner], workdir, env, 'akc.log')
+    finally:
+        server.terminate()
+
+    rows = []
+    if os.path.exists(webhook_path):
+        with open(webhook_path, encoding='utf-8') as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+    pages = len(pop.terms) * fixture_web.RESULTS_TOTAL // 10
+    return {
+        'exit_code': code,
+        'elapsed_seconds': round(elapsed, 2),
+        'peak_rss_mb': round(rss_mb, 1) if rss_mb is not None else None,
+        'terms': len(pop.terms),
+        'rows_uploaded': len(rows),
+        'terms_per_min': per_minute(len(rows), elapsed),
+        'pages_per_min': per_minute(pages if rows else 0, elapsed),
+        'correctness': score_ranks(pop, pop.terms, rows),
+        'log': log_path,
+    }
+
+
+def bench_check(pop, port):
+    """HTTP-only pass over the fixtures with the scripts' own parsers; no browser needed."""
+    fixture_web.resolve_localhost()
+    from urllib.parse import urlencode
+
+    from domains import DomainMatcher, base_domain
+    from lead_extractor import extract_leads
+    from page_fetcher import fetch_snapshot, get_session
+    from serp_parser import parse_serp
+    from subpage_crawler import crawl_subpages
+
+    search = f"http://127.0.0.1:{port}/search"
+    session = get_session()
+    start = time.perf_counter()
+    pages = 0
+    serp_errors, browser_needed, fallback_errors = [], 0, []
+    emails, phones, addresses = [], [], []
+
+    def collect(url, snapshot, elapsed):
+        leads = extract_leads(snapshot)
+        emails.extend(leads['emails'])
+        phones.extend(leads['contacts'])
+        addresses.append(leads['address'])
+
+    for company in pop.companies:
+        query = company.name.replace(' Pte Ltd', '')
+        html = session.get(f"{search}?{urlencode({'q': query, 'start': 0})}", timeout=10).text
+        pages += 1
+        results = parse_serp(html)
+        if len(results) < 2 or base_domain(results[1].url) != company.host or results[1].company_name != query:
+            serp_errors.append(query)
+            continue
+
+        home = fetch_snapshot(results[1].url)
+        pages += 1
+        if (home is None) != company.js_rendered:
+            fallback_errors.append(company.host)
+        if home is None:
+            browser_needed += 1
+            sub_urls = [f"http://{company.host}:{port}/{company.subpage}"]  # what Chrome would have found
+        else:
+            collect(results[1].url, home, 0.0)
+            sub_urls = [u for u in home['links'] if 'contact' in u.lower() or 'locate' in u.lower()]
+        pages += len(sub_urls)
+        for url in crawl_subpages(sub_urls, collect):
+            fallback_errors.append(url)
+
+    target = DomainMatcher([f"{fixture_web.TARGET_SLUG}.{fixture_web.SITE_SUFFIX}"])
+    rows = []
+    for term in pop.terms:
+        urls = []
+        for start_at in range(0, fixture_web.RESULTS_TOTAL, 10):
+            urls.extend(r.url for r in parse_serp(session.get(f"{search}?{urlencode({'q': term, 'start': start_at})}", timeout=10).text))
+            pages += 1
+        rank = next((i for i, u in enumerate(urls, start=1) if target.match(base_domain(u))), None)
+        rows.append({'Search term': term, 'Results Ranking': rank if rank is not None else 'Not Found'})
+
+    elapsed = time.perf_counter() - start
+    return {
+        'elapsed_seconds': round(elapsed, 2),
+        'pages': pages,
+        'pages_per_min': per_minute(pages, elapsed),
+        'leads_per_min': per_minute(len(set(emails)) + len(set(phones)), elapsed),
+        'serp_parse_errors': serp_errors[:20],
+        'js_detection_errors': fallback_errors[:20],
+        'browser_fallbacks': browser_needed,
+        'lead_correctness': score_leads(pop.companies, emails, phones, addresses),
+        'rank_correctness': score_ranks(pop, pop.terms, rows),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the scripts end to end against a local fixture web')
+    parser.add_argument('--target', choices=['scraper', 'akc', 'both', 'check'], default='both')
+    parser.add_argument('--companies', type=int, default=30, help='company sites (and scraper input names)')
+    parser.add_argument('--terms', type=int, default=len(fixture_web.GENERIC_TERMS), help='rank checker search terms')
+    parser.add_argument('--workers', type=int, default=2, help='scraper worker processes')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='fixture server port (akc uses port + 1)')
+    parser.add_argument('--report', default=REPORT_PATH, help=f'JSON report path (default {REPORT_PATH})')
+    args = parser.parse_args()
+
+    pop = fixture_web.generate_population(args.companies, args.seed, args.terms)
+    workdir = tempfile.mkdtemp(prefix='bench_e2e_')
+    report = {'companies': args.companies, 'terms': args.terms, 'workers': args.workers, 'seed': args.seed,
+              'psutil': psutil is not None, 'workdir': workdir}
+
+    server = start_fixture(pop, args.port)
+    try:
+        if args.target == 'check':
+            report['check'] = bench_check(pop, args.port)
+        if args.target in ('scraper', 'both'):
+            os.makedirs(os.path.join(workdir, 'scraper'))
+            report['scraper'] = bench_scraper(pop, args.port, args.workers, os.path.join(workdir, 'scraper'))
+        if args.target in ('akc', 'both'):
+            os.makedirs(os.path.join(workdir, 'akc'))
+            report['akc'] = bench_akc(pop, args.port, os.path.join(workdir, 'akc'))
+    finally:
+        server.terminate()
+
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+    if args.target == 'check':
+        os.rmdir(workdir)
+    else:
+        print(f"[INFO] Logs and outputs are in {workdir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+# Microbenchmark for lead_extractor over large synthetic pages
+#
+# Compares the single-pass engine with the previous approach (findall over
+# text + html, then a regex per candidate and separate phone/address scans),
+# including pages that carry multi-MB inline script bundles.
+#
+# Usage: python benchmarks/bench_lead_extractor.py [iterations]
+
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from domains import DomainMatcher
+from lead_extractor import extract_leads
+
+EMAIL_BLACKLIST = [
+    'cloudwaysapps.com', 'sgpbusiness.com', 'directory.sg',
+    'yellowpages.com.sg', 'yellowpages.sg', 'hotfrog.sg',
+    'locanto.sg', 'bizdir.sg'
+]
+EMAIL_MATCHER = DomainMatcher(EMAIL_BLACKLIST)
+
+
+def legacy_extract(snapshot):
+    # The pre-engine extractors, kept here only as a baseline
+    text, html = snapshot['text'], snapshot['html']
+    emails = set()
+    for href in snapshot['mailto']:
+        email = href.split(':', 1)[1].split('?')[0].strip()
+        if re.match(r"^[\w\.-]+@[\w\.-]+\.[a-zA-Z]{2,}$", email):
+            emails.add(email)
+    for e in set(re.findall(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}", text + html)):
+        if re.search(r"\.(jpg|jpeg|png|gif|svg|webp|css|js|woff|ico)(\?|$)", e, re.IGNORECASE):
+            continue
+        if "%" in e or ".." in e:
+            continue
+        if not re.match(r"^[\w\.-]+@[\w\.-]+\.[a-zA-Z]{2,}$", e):
+            continue
+        emails.add(e)
+    emails = sorted(e for e in emails if not any(bad in e.split('@')[-1].lower() for bad in EMAIL_BLACKLIST))
+    contacts = {h.split(':', 1)[1].strip() for h in snapshot['tel']}
+    if not contacts:
+        contacts.update(re.findall(r"(?:\+65\s?)?[689]\d{3}[-\s]?\d{4}", text))
+    address = snapshot['address'].strip()
+    if not address:
+        for line in text.splitlines():
+            if re.search(r"\b\d{6}\b", line):
+                address = line.strip()
+                break
+    if not address:
+        for line in text.splitlines():
+            if 'Singapore' in line:
+                address = line.strip()
+                break
+    return {'emails': emails, 'contacts': sorted(contacts), 'address': address}
+
+
+def make_page(paragraphs: int, script_bytes: int, seed: int = 0):
+    rng = random.Random(seed)
+    words = 'food safety course training hygiene certificate kitchen staff service quality'.split()
+    lines = []
+    for i in range(paragraphs):
+        lines.append(' '.join(rng.choice(words) for _ in range(40)))
+        if i % 50 == 0:
+            lines.append(f"Email us at sales{i}@example{i % 7}.com.sg or call 6{rng.randint(100, 999)} {rng.randint(1000, 9999)}")
+    lines.append("10 Anson Road #22-02 International Plaza Singapore 079903")
+    text = '\n'.join(lines)
+    bundle = ''
+    if script_bytes:
+        chunk = 'function a(b){return b.map(function(c){return c*2})};var cfg={"logo":"logo@2x.png","mail":"n@x.io"};\n'
+        bundle = '<script>' + chunk * (script_bytes // len(chunk)) + '</script>'
+    html = (
+        '<html><head><title>Acme</title>' + bundle + '</head><body>'
+        + ''.join(f'<p>{line}</p>' for line in lines)
+        + '<a href="mailto:info@acme.com.sg">mail</a></body></html>'
+    )
+    return {'text': text, 'html': html, 'mailto': ['mailto:info@acme.com.sg'], 'tel': [], 'address': ''}
+
+
+def bench(name, fn, snapshot, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(snapshot)
+    return (time.perf_counter() - start) / iterations
+
+
+if __name__ == '__main__':
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    pages = {
+        'small (20 paragraphs)': make_page(20, 0),
+        'large (1k paragraphs)': make_page(1000, 0),
+        '2 MB inline script': make_page(200, 2_000_000),
+        '8 MB inline script': make_page(200, 8_000_000),
+    }
+    print(f"{'page':<24} {'size':>9} {'legacy':>10} {'engine':>10} {'speedup':>8}")
+    for name, snapshot in pages.items():
+        engine = extract_leads(snapshot, EMAIL_MATCHER)
+        legacy = legacy_extract(snapshot)
+        if set(engine['emails']) - set(legacy['emails']) or engine['address'] != legacy['address']:
+            print(f"[ERROR] {name}: engine output differs from legacy extractor")
+            sys.exit(1)
+        t_legacy = bench(name, legacy_extract, snapshot, iterations)
+        t_engine = bench(name, lambda s: extract_leads(s, EMAIL_MATCHER), snapshot, iterations)
+        size = (len(snapshot['text']) + len(snapshot['html'])) / 1_000_000
+        print(f"{name:<24} {size:7.2f}MB {t_legacy * 1000:8.1f}ms {t_engine * 1000:8.1f}ms {t_legacy / t_engine:7.1f}x")
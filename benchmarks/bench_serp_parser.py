@@ -0,0 +1,67 @@
+# Microbenchmark for serp_parser against the saved results pages in fixtures/serp
+#
+# Checks every fixture against its .expected.json first, so a Google markup change
+# that breaks parsing shows up here before it shows up as empty rankings.
+#
+# Usage: python benchmarks/bench_serp_parser.py [iterations]
+
+import dataclasses
+import glob
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from serp_parser import parse_serp, parse_company_names
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'serp')
+
+
+def load_fixtures():
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, '*.html'))):
+        with open(path, encoding='utf-8') as f:
+            html = f.read()
+        expected_path = path[:-len('.html')] + '.expected.json'
+        expected = None
+        if os.path.exists(expected_path):
+            with open(expected_path, encoding='utf-8') as f:
+                expected = json.load(f)
+        fixtures.append((os.path.basename(path), html, expected))
+    return fixtures
+
+
+def check_fixtures(fixtures) -> bool:
+    ok = True
+    for name, html, expected in fixtures:
+        if expected is None:
+            print(f"[WARN] {name}: no expected output, skipping check")
+            continue
+        actual = {
+            'results': [dataclasses.asdict(r) for r in parse_serp(html)],
+            'company_names': parse_company_names(html),
+        }
+        if actual != expected:
+            ok = False
+            print(f"[ERROR] {name}: parsed output differs from {name[:-5]}.expected.json")
+            print(json.dumps(actual, indent=2, ensure_ascii=False))
+    return ok
+
+
+def bench(fixtures, iterations: int):
+    for name, html, _ in fixtures:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            parse_serp(html)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<28} {len(html) / 1024:8.1f} KiB  {iterations / elapsed:10.0f} pages/s  {elapsed / iterations * 1e6:8.1f} us/page")
+
+
+if __name__ == '__main__':
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    fixtures = load_fixtures()
+    if not check_fixtures(fixtures):
+        sys.exit(1)
+    bench(fixtures, iterations)
@@ -0,0 +1,291 @@
+# Local fixture "search engine" and company websites for end-to-end benchmarks
+#
+# One HTTP server plays every role:
+#   http://127.0.0.1:<port>/search?q=..&start=..  results pages in Google's markup
+#                                                 (div.MjjYud > div.yuRUbf, cite, span.VuuXrf, div.CA5RN)
+#   http://<slug>.localhost:<port>/...            generated company sites (home, contact/locate pages)
+#   POST http://127.0.0.1:<port>/webhook           stands in for the Google Sheets webhook
+#
+# Chrome resolves *.localhost to loopback by itself (RFC 6761). Python's
+# resolver usually doesn't, so processes that fetch pages over plain HTTP call
+# resolve_localhost() first (the harness does it through sitecustomize).
+# Everything is derived from a seed, so the ground truth (leads per site, AKC
+# rank per term) is known without talking to the server.
+
+import hashlib
+import html
+import json
+import os
+import random
+import re
+import socket
+import threading
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# ========== CONFIGURATION ==========
+SITE_SUFFIX = 'localhost'
+TARGET_SLUG = 'akc-training'  # the site akc_rank_checker looks for
+RESULTS_TOTAL = 30            # organic results per query (3 pages of 10)
+JS_RENDERED_SHARE = 0.2       # share of company homepages that only render with JavaScript
+# Listing and news sites ranked around each company; all are on the scraper's blacklists,
+# so the only site it visits for a company search is the company's own
+DIRECTORY_DOMAINS = ['sgpbusiness.com', 'yellowpages.com.sg', 'hotfrog.sg']
+NEWS_DOMAINS = ['mothership.sg', 'straitstimes.com', 'facebook.com']
+
+ADJECTIVES = ['Golden', 'Harbour', 'Lion', 'Orchid', 'Marina', 'Pioneer', 'Summit', 'Evergreen', 'Crescent',
+              'Straits', 'Jade', 'Sterling', 'Bright', 'Unity', 'Keppel', 'Raffles', 'Coastal', 'Metro']
+NOUNS = ['Engineering', 'Logistics', 'Trading', 'Foods', 'Builders', 'Consulting', 'Marine', 'Electrical',
+         'Printing', 'Interiors', 'Clinic', 'Academy', 'Supplies', 'Motors', 'Design', 'Solutions']
+STREETS = ['Orchard Road', 'Anson Road', 'Ubi Avenue 1', 'Jurong West Street 41', 'Tampines Street 92',
+           'Kallang Way', 'Changi Business Park Crescent', 'Woodlands Loop', 'Ang Mo Kio Avenue 5']
+GENERIC_TERMS = ['food safety course', 'wsq food hygiene', 'basic food hygiene course', 'food handler course',
+                 'halal training', 'workplace safety course', 'first aid course', 'forklift course',
+                 'barista course', 'food safety level 2', 'haccp training', 'culinary course singapore']
+FILLER = ('We have served customers across Singapore for more than twenty years with reliable service, '
+          'transparent pricing and a team that takes pride in getting the details right. ')
+
+
+@dataclass
+class Company:
+    name: str
+    slug: str
+    emails: list
+    phone: str
+    address: str
+    js_rendered: bool
+    subpage: str  # 'contact-us' or 'locate-us'
+    home_email: str = ''
+
+    @property
+    def host(self):
+        return f"{self.slug}.{SITE_SUFFIX}"
+
+
+@dataclass
+class Population:
+    seed: int
+    companies: list
+    terms: list
+    by_slug: dict = field(default_factory=dict)
+    by_query: dict = field(default_factory=dict)
+
+    def __post_init__(self):
+        self.by_slug = {c.slug: c for c in self.companies}
+        self.by_query = {normalize_query(c.name): c for c in self.companies}
+
+
+def normalize_query(query: str) -> str:
+    query = re.sub(r'\b(pte\.?|ltd\.?|limited)\b', ' ', query.lower())
+    return re.sub(r'\s+', ' ', query).strip()
+
+
+def _rng(*parts) -> random.Random:
+    digest = hashlib.sha256('|'.join(str(p) for p in parts).encode()).hexdigest()
+    return random.Random(int(digest[:16], 16))
+
+
+def generate_population(num_companies=50, seed=7, num_terms=len(GENERIC_TERMS)) -> Population:
+    rng = random.Random(seed)
+    companies, seen = [], set()
+    while len(companies) < num_companies:
+        words = [rng.choice(ADJECTIVES), rng.choice(NOUNS)]
+        if len(seen) > len(ADJECTIVES) * len(NOUNS) // 2:
+            words.append(str(rng.randint(2, 99)))
+        slug = '-'.join(w.lower() for w in words)
+        if slug in seen or slug == TARGET_SLUG:
+            continue
+        seen.add(slug)
+        host = f"{slug}.{SITE_SUFFIX}"
+        emails = [f"info@{host}"] + ([f"sales@{host}"] if rng.random() < 0.5 else [])
+        phone = f"+65 6{rng.randint(100, 999)} {rng.randint(1000, 9999)}"
+        address = (f"{rng.randint(1, 200)} {rng.choice(STREETS)} #{rng.randint(1, 15):02d}-{rng.randint(1, 40):02d} "
+                   f"Singapore {rng.randint(100000, 829999)}")
+        companies.append(Company(
+            name=' '.join(words) + ' Pte Ltd', slug=slug, emails=emails, phone=phone, address=address,
+            js_rendered=rng.random() < JS_RENDERED_SHARE, subpage=rng.choice(['contact-us', 'locate-us']),
+            home_email=emails[-1] if rng.random() < 0.3 else '',
+        ))
+    terms = [term if i < len(GENERIC_TERMS) else f"{term} {i // len(GENERIC_TERMS) + 1}"
+             for i, term in ((i, GENERIC_TERMS[i % len(GENERIC_TERMS)]) for i in range(num_terms))]
+    return Population(seed, companies, terms)
+
+
+def target_rank(term: str, seed: int):
+    """1-based rank of the AKC site for a generic term, or None when it isn't listed."""
+    rank = _rng(seed, 'rank', normalize_query(term)).randint(1, RESULTS_TOTAL + 10)
+    return rank if rank <= RESULTS_TOTAL else None
+
+
+def ranked_hosts(pop: Population, query: str) -> list:
+    """Ordered (host, site name, path) of the organic results for query; one per domain."""
+    q = normalize_query(query)
+    rng = _rng(pop.seed, 'serp', q)
+    others = [c for c in pop.companies if normalize_query(c.name) != q]
+    rng.shuffle(others)
+    results = [(c.host, c.name.replace(' Pte Ltd', ''), '/') for c in others]
+    # Off-fixture filler so every query has a full three pages; never fetched by either script
+    results += [(f"www.{rng.choice(ADJECTIVES).lower()}{i}.com.sg", f"Listing {i}", '/') for i in range(RESULTS_TOTAL)]
+    company = pop.by_query.get(q)
+    if company is not None:
+        # Company searches: directory listing, the company itself, a news mention, then the rest
+        directory, news = rng.choice(DIRECTORY_DOMAINS), rng.choice(NEWS_DOMAINS)
+        results[:0] = [
+            (f"www.{directory}", directory.split('.')[0].title(), f"/company/{company.slug}"),
+            (company.host, company.name.replace(' Pte Ltd', ''), '/'),
+            (f"www.{news}", news.split('.')[0].title(), f"/news/{company.slug}"),
+        ]
+    else:
+        rank = target_rank(q, pop.seed)
+        if rank is not None:
+            results.insert(rank - 1, (f"{TARGET_SLUG}.{SITE_SUFFIX}", 'AKC Training', '/courses/'))
+    return results[:RESULTS_TOTAL]
+
+
+def _result_block(url, display, name):
+    name, display_e = html.escape(name), html.escape(display)
+    return (
+        f'<div class="MjjYud"><div class="g tF2Cxc"><div class="yuRUbf"><div><span>'
+        f'<a href="{html.escape(url)}"><br><h3 class="LC20lb">{name}</h3>'
+        f'<div class="CA5RN"><div><span class="VuuXrf">{name}</span>'
+        f'<div class="byrV5b"><cite role="text">{display_e}<span role="text"> › home</span></cite></div>'
+        f'</div></div></a></span></div></div>'
+        f'<div class="VwiC3b"><span>{name} in Singapore. Services, prices and contact details.</span></div>'
+        f'</div></div>'
+    )
+
+
+def render_serp(pop: Population, query: str, start: int, port: int, per_page=10) -> str:
+    blocks = []
+    for host, name, path in ranked_hosts(pop, query)[start:start + per_page]:
+        scheme_host = f"https://{host}" if not host.endswith(SITE_SUFFIX) else f"http://{host}:{port}"
+        blocks.append(_result_block(scheme_host + path, scheme_host, name))
+    q = html.escape(query)
+    return (
+        f'<!DOCTYPE html><html lang="en"><head><meta charset="UTF-8"><title>{q} - Google Search</title></head>'
+        f'<body><div id="main"><div id="center_col"><div id="search"><div id="rso">{"".join(blocks)}</div>'
+        f'</div></div></div></body></html>'
+    )
+
+
+def render_site(company: Company, path: str):
+    """(status, html) for a path on a company site."""
+    title = html.escape(company.name)
+    nav = (f'<nav><a href="/">Home</a> <a href="/about">About</a> '
+           f'<a href="/{company.subpage}">{"Contact Us" if company.subpage == "contact-us" else "Locate Us"}</a></nav>')
+    if path in ('/', '/index.html'):
+        footer = f'<footer><p>Write to {company.home_email}</p></footer>' if company.home_email else '<footer></footer>'
+        body = f'{nav}<main><h1>{title}</h1>' + ''.join(f'<p>{FILLER}</p>' for _ in range(4)) + f'</main>{footer}'
+        if company.js_rendered:
+            # SPA shell: empty root filled in by script, so only a browser sees the content
+            payload = json.dumps(body)
+            return 200, (f'<!DOCTYPE html><html><head><title>{title}</title></head><body><div id="root"></div>'
+                         f'<script>document.getElementById("root").innerHTML = {payload};</script></body></html>')
+        return 200, f'<!DOCTYPE html><html><head><title>{title}</title></head><body>{body}</body></html>'
+    if path == f'/{company.subpage}':
+        mails = ' '.join(f'<a href="mailto:{e}">{e}</a>' for e in company.emails)
+        digits = company.phone.replace(' ', '')
+        body = (f'{nav}<main><h1>Contact {title}</h1><p>{FILLER}</p><p>Email: {mails}</p>'
+                f'<p>Call us: <a href="tel:{digits}">{company.phone}</a></p>'
+                f'<address>{html.escape(company.address)}</address></main>')
+        return 200, f'<!DOCTYPE html><html><head><title>Contact</title></head><body>{body}</body></html>'
+    if path == '/about':
+        return 200, f'<!DOCTYPE html><html><body>{nav}<h1>About {title}</h1><p>{FILLER * 3}</p></body></html>'
+    return 404, '<html><body>Not found</body></html>'
+
+
+def resolve_localhost():
+    """Make this process resolve any *.localhost name to 127.0.0.1, like Chrome does."""
+    original = socket.getaddrinfo
+    if getattr(original, 'resolves_localhost', False):
+        return
+
+    def getaddrinfo(host, *args, **kwargs):
+        name = host.decode() if isinstance(host, bytes) else host
+        if isinstance(name, str) and name.rstrip('.').lower().endswith('.' + SITE_SUFFIX):
+            host = '127.0.0.1'
+        return original(host, *args, **kwargs)
+
+    getaddrinfo.resolves_localhost = True
+    socket.getaddrinfo = getaddrinfo
+
+
+def make_handler(pop: Population, port: int, webhook_path=None):
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _target(self):
+            # Every site shares this server, so route on the Host header
+            parts = urlsplit(f"http://{self.headers.get('Host', '')}{self.path}")
+            return (parts.hostname or '').lower(), parts.path or '/', parts.query
+
+        def _send(self, status, body, content_type='text/html; charset=utf-8'):
+            data = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            if self.command != 'HEAD':
+                self.wfile.write(data)
+
+        def do_HEAD(self):
+            self.do_GET()
+
+        def do_GET(self):
+            host, path, query = self._target()
+            if host.endswith('.' + SITE_SUFFIX):
+                company = pop.by_slug.get(host[:-len(SITE_SUFFIX) - 1].removeprefix('www.'))
+                if company is None and host.startswith(TARGET_SLUG + '.'):
+                    return self._send(200, f'<html><body><h1>AKC Training</h1><p>{FILLER * 3}</p></body></html>')
+                if company is None:
+                    return self._send(404, 'unknown site')
+                return self._send(*render_site(company, path))
+            if path == '/search':
+                params = parse_qs(query)
+                q = params.get('q', [''])[0]
+                start = int(params.get('start', ['0'])[0] or 0)
+                return self._send(200, render_serp(pop, q, start, port))
+            if path == '/':
+                return self._send(200, '<html><body><form action="/search"><input name="q"></form></body></html>')
+            return self._send(404, 'not found')
+
+        def do_POST(self):
+            host, path, _ = self._target()
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length)
+            if path != '/webhook':
+                return self._send(404, 'not found')
+            if webhook_path:
+                with lock, open(webhook_path, 'a', encoding='utf-8') as f:
+                    for row in json.loads(body or b'[]'):
+                        f.write(json.dumps(row) + '\n')
+            return self._send(200, '{"ok": true}', 'application/json')
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(num_companies, seed, port, webhook_path=None, ready_event=None):
+    """Run the fixture server until the process is terminated (multiprocessing target)."""
+    pop = generate_population(num_companies, seed)
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(pop, port, webhook_path))
+    server.daemon_threads = True
+    if ready_event is not None:
+        ready_event.set()
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Serve the benchmark fixture search engine and company sites')
+    parser.add_argument('--companies', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+    print(f"Serving {args.companies} companies on http://127.0.0.1:{args.port}/search (Ctrl-C to stop)")
+    serve(args.companies, args.seed, args.port, os.path.join(os.getcwd(), 'webhook_rows.jsonl'))
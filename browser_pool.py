@@ -0,0 +1,128 @@
+# Per-worker browser pool: keeps one Chrome alive across companies
+#
+# Launching and patching undetected_chromedriver costs seconds, and a fresh
+# profile starts with a cold HTTP cache. The pool hands out the same driver for
+# every company, resets cookies/storage/tabs in between, and replaces the driver
+# only when it has crashed or stopped responding.
+
+import os
+from urllib.parse import urlparse
+
+
+def _origin(url: str) -> str:
+    try:
+        parts = urlparse(url)
+        if parts.scheme in ('http', 'https') and parts.netloc:
+            return f"{parts.scheme}://{parts.netloc}"
+    except Exception:
+        pass
+    return ''
+
+
+class BrowserPool:
+    def __init__(self, factory, user_data_dir=None, name=''):
+        """factory(user_data_dir) must return a new WebDriver."""
+        self.factory = factory
+        self.user_data_dir = user_data_dir
+        self.name = name
+        self.driver = None
+        self.launches = 0
+        self._origins = set()
+
+    def _launch(self):
+        if self.user_data_dir:
+            os.makedirs(self.user_data_dir, exist_ok=True)
+        driver = self.factory(self.user_data_dir)
+        self.launches += 1
+        self._adopt(driver)
+        print(f"[Pool {self.name}] Launched browser #{self.launches}")
+        return driver
+
+    def _adopt(self, driver):
+        # Record every origin the driver visits so reset() can clear its storage
+        if driver is None or getattr(driver, '_pool_tracked', False):
+            self.driver = driver
+            return
+        original_get = driver.get
+
+        def tracked_get(url):
+            origin = _origin(url)
+            if origin:
+                self._origins.add(origin)
+            return original_get(url)
+
+        driver.get = tracked_get
+        driver._pool_tracked = True
+        self.driver = driver
+
+    @staticmethod
+    def is_healthy(driver) -> bool:
+        if driver is None:
+            return False
+        try:
+            return bool(driver.window_handles) and driver.execute_script('return 1') == 1
+        except Exception:
+            return False
+
+    def acquire(self):
+        """Return a live driver, replacing a dead one if needed."""
+        if not self.is_healthy(self.driver):
+            if self.driver is not None:
+                print(f"[Pool {self.name}] Browser unresponsive, replacing it")
+            self.discard()
+            self._launch()
+        return self.driver
+
+    def release(self, driver=None):
+        """Take back the driver after a company (it may be a replacement) and reset it."""
+        if driver is not None and driver is not self.driver:
+            # The old browser is usually the hung one; quit it anyway so no Chrome is left behind
+            if self.driver is not None:
+                self._quit(self.driver)
+            self._adopt(driver)
+        if not self.is_healthy(self.driver):
+            self.discard()
+            return
+        try:
+            self.reset()
+        except Exception as e:
+            print(f"[Pool {self.name}] Reset failed ({e}), discarding browser")
+            self.discard()
+
+    def reset(self):
+        driver = self.driver
+        # Close every tab but the first
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        driver.get('about:blank')
+
+        # Cookies and per-origin storage go; the HTTP cache in the profile stays
+        driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+        for origin in self._origins:
+            try:
+                driver.execute_cdp_cmd('Storage.clearDataForOrigin', {
+                    'origin': origin,
+                    'storageTypes': 'local_storage,session_storage,indexeddb,websql,service_workers,cache_storage',
+                })
+            except Exception:
+                pass
+        self._origins.clear()
+
+    @staticmethod
+    def _quit(driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def discard(self):
+        if self.driver is not None:
+            self._quit(self.driver)
+        self.driver = None
+        self._origins.clear()
+
+    def close(self):
+        self.discard()
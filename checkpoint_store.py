@@ -0,0 +1,250 @@
+# Append-only SQLite checkpoint store for scraper_bot2v1 workers
+#
+# Each worker appends to its own worker_outputs/<run id>/worker_{id}.sqlite (WAL
+# mode). Duplicate rows are dropped by the unique indexes on insert, so a
+# checkpoint costs only the new rows instead of a full workbook rewrite. Excel
+# is produced once, by the merge step at the end of the run. The pages and
+# terms tables log what each visit cost and found, for yield_report. The leads
+# table holds each fact (url, email, contact, address, company name) of a
+# (term, domain) once, as the crawl finds it; contact rows are assembled from
+# those facts when the term is finished (lead_rows); each contact row records
+# the term that owns it, so a term finished again (retried or resumed) replaces
+# its rows instead of adding a second, differently laid out set.
+
+import sqlite3
+from datetime import datetime
+
+from domains import base_domain
+
+CONTACT_COLUMNS = ['Search Term', 'Company Name', 'Website', 'Emails', 'Contacts', 'Address']
+SKIPPED_COLUMNS = ['URL', 'Reason']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS contacts (
+    id INTEGER PRIMARY KEY,
+    search_term TEXT NOT NULL DEFAULT '',
+    company_name TEXT NOT NULL DEFAULT '',
+    website TEXT NOT NULL DEFAULT '',
+    domain TEXT NOT NULL DEFAULT '',
+    email TEXT NOT NULL DEFAULT '',
+    contact TEXT NOT NULL DEFAULT '',
+    address TEXT NOT NULL DEFAULT '',
+    owner_term TEXT NOT NULL DEFAULT '',
+    worker_id INTEGER,
+    saved_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS skipped (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL DEFAULT '',
+    reason TEXT NOT NULL DEFAULT '',
+    worker_id INTEGER,
+    saved_at TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS skipped_dedupe ON skipped (url, reason);
+
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY,
+    search_term TEXT NOT NULL DEFAULT '',
+    query TEXT NOT NULL,
+    url TEXT NOT NULL,
+    domain TEXT NOT NULL DEFAULT '',
+    page_type TEXT NOT NULL DEFAULT '',
+    source TEXT NOT NULL DEFAULT '',
+    elapsed REAL,
+    emails INTEGER NOT NULL DEFAULT 0,
+    contacts INTEGER NOT NULL DEFAULT 0,
+    address INTEGER NOT NULL DEFAULT 0,
+    worker_id INTEGER,
+    saved_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS leads (
+    id INTEGER PRIMARY KEY,
+    search_term TEXT NOT NULL,
+    domain TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    value TEXT NOT NULL,
+    url TEXT NOT NULL DEFAULT '',
+    worker_id INTEGER,
+    saved_at TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS leads_dedupe ON leads (search_term, domain, kind, value);
+
+CREATE TABLE IF NOT EXISTS terms (
+    id INTEGER PRIMARY KEY,
+    search_term TEXT NOT NULL,
+    query TEXT NOT NULL,
+    elapsed REAL,
+    worker_id INTEGER,
+    saved_at TEXT
+);
+"""
+
+
+LEAD_KINDS = ('company_name', 'url', 'email', 'contact', 'address')
+
+
+def _s(value) -> str:
+    return '' if value is None else str(value)
+
+
+def lead(domain, kind, value, url='') -> dict:
+    """One newly found fact about domain; kind is one of LEAD_KINDS."""
+    return {'domain': domain, 'kind': kind, 'value': value, 'url': url}
+
+
+def lead_rows(search_term, facts) -> list[dict]:
+    """Contact rows for one term from {domain: {kind: values}}.
+
+    Each domain's sorted urls, emails, contacts and addresses are laid side by
+    side, one row per index; the search term and company name go on its first row.
+    """
+    rows = []
+    for domain, kinds in facts.items():
+        urls, emails, contacts, addresses = (sorted(kinds.get(k, ())) for k in ('url', 'email', 'contact', 'address'))
+        names = sorted(kinds.get('company_name', ()))
+        for i in range(max(len(urls), len(emails), len(contacts), len(addresses))):
+            rows.append({
+                'Search Term': search_term if i == 0 else '',
+                'Company Name': names[0] if i == 0 and names and urls and urls[0] else '',
+                'Website': urls[i] if i < len(urls) else '',
+                'Emails': emails[i] if i < len(emails) else '',
+                'Contacts': contacts[i] if i < len(contacts) else '',
+                'Address': addresses[i] if i < len(addresses) else '',
+            })
+    return rows
+
+
+class CheckpointStore:
+    def __init__(self, path: str, worker_id=None):
+        self.path = path
+        self.worker_id = worker_id
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        # Stores from before contacts.owner_term existed (a resumed run)
+        if 'owner_term' not in {row[1] for row in self.conn.execute('PRAGMA table_info(contacts)')}:
+            with self.conn:
+                self.conn.execute("ALTER TABLE contacts ADD COLUMN owner_term TEXT NOT NULL DEFAULT ''")
+        with self.conn:
+            self.conn.execute('DROP INDEX IF EXISTS contacts_dedupe')
+            self.conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS contacts_term_dedupe '
+                              'ON contacts (owner_term, search_term, domain, website, email, contact, address)')
+        # Stores from before pages.search_term existed (a resumed run)
+        if 'search_term' not in {row[1] for row in self.conn.execute('PRAGMA table_info(pages)')}:
+            with self.conn:
+                self.conn.execute("ALTER TABLE pages ADD COLUMN search_term TEXT NOT NULL DEFAULT ''")
+
+    def _insert_contacts(self, rows, owner_term=''):
+        now = datetime.now().isoformat(timespec='seconds')
+        params = [
+            (
+                _s(r.get('Search Term')), _s(r.get('Company Name')), _s(r.get('Website')),
+                base_domain(_s(r.get('Website'))), _s(r.get('Emails')), _s(r.get('Contacts')),
+                _s(r.get('Address')), owner_term, self.worker_id, now,
+            )
+            for r in rows
+        ]
+        self.conn.executemany(
+            'INSERT OR IGNORE INTO contacts '
+            '(search_term, company_name, website, domain, email, contact, address, owner_term, worker_id, saved_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            params,
+        )
+
+    def add_contacts(self, rows) -> int:
+        """Insert rows shaped like CONTACT_COLUMNS; returns how many were new."""
+        if not rows:
+            return 0
+        with self.conn:
+            before = self.conn.total_changes
+            self._insert_contacts(rows)
+            return self.conn.total_changes - before
+
+    def replace_contacts(self, search_term, rows) -> int:
+        """Make rows the only contact rows of search_term (one transaction); returns how many were stored."""
+        with self.conn:
+            self.conn.execute('DELETE FROM contacts WHERE owner_term = ?', (_s(search_term),))
+            before = self.conn.total_changes
+            self._insert_contacts(rows, _s(search_term))
+            return self.conn.total_changes - before
+
+    def add_skipped(self, rows) -> int:
+        now = datetime.now().isoformat(timespec='seconds')
+        params = [(_s(r.get('URL')), _s(r.get('Reason')), self.worker_id, now) for r in rows]
+        if not params:
+            return 0
+        with self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO skipped (url, reason, worker_id, saved_at) VALUES (?, ?, ?, ?)',
+                params,
+            )
+            return self.conn.total_changes - before
+
+    def add_leads(self, search_term, leads) -> int:
+        """Insert lead() records for search_term; returns how many were new."""
+        now = datetime.now().isoformat(timespec='seconds')
+        params = [(_s(search_term), _s(l['domain']), l['kind'], _s(l['value']), _s(l.get('url')), self.worker_id, now)
+                  for l in leads]
+        if not params:
+            return 0
+        with self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO leads (search_term, domain, kind, value, url, worker_id, saved_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                params,
+            )
+            return self.conn.total_changes - before
+
+    def lead_facts(self, search_term) -> dict:
+        """{domain: {kind: values}} of every lead stored for search_term, for lead_rows()."""
+        facts = {}
+        cur = self.conn.execute('SELECT domain, kind, value FROM leads WHERE search_term = ? ORDER BY id', (_s(search_term),))
+        for domain, kind, value in cur:
+            facts.setdefault(domain, {}).setdefault(kind, set()).add(value)
+        return facts
+
+    def add_page(self, search_term, query, url, page_type, source, elapsed, emails, contacts, address):
+        """One visited page with the number of new leads it contributed (for yield_report)."""
+        now = datetime.now().isoformat(timespec='seconds')
+        with self.conn:
+            self.conn.execute(
+                'INSERT INTO pages (search_term, query, url, domain, page_type, source, elapsed, emails, contacts, address, '
+                'worker_id, saved_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (_s(search_term), _s(query), _s(url), base_domain(_s(url)), page_type, _s(source), elapsed,
+                 int(emails), int(contacts), int(bool(address)), self.worker_id, now),
+            )
+
+    def add_term(self, search_term, query, elapsed):
+        now = datetime.now().isoformat(timespec='seconds')
+        with self.conn:
+            self.conn.execute(
+                'INSERT INTO terms (search_term, query, elapsed, worker_id, saved_at) VALUES (?, ?, ?, ?, ?)',
+                (_s(search_term), _s(query), elapsed, self.worker_id, now),
+            )
+
+    def contacts(self) -> list[dict]:
+        """All contact rows in insertion order, keyed like CONTACT_COLUMNS."""
+        cur = self.conn.execute(
+            'SELECT search_term, company_name, website, email, contact, address FROM contacts ORDER BY id'
+        )
+        return [dict(zip(CONTACT_COLUMNS, row)) for row in cur]
+
+    def skipped(self) -> list[dict]:
+        cur = self.conn.execute('SELECT url, reason FROM skipped ORDER BY id')
+        return [dict(zip(SKIPPED_COLUMNS, row)) for row in cur]
+
+    def counts(self):
+        contacts = self.conn.execute('SELECT COUNT(*) FROM contacts').fetchone()[0]
+        skipped = self.conn.execute('SELECT COUNT(*) FROM skipped').fetchone()[0]
+        return contacts, skipped
+
+    def close(self):
+        try:
+            self.conn.close()
+        except Exception:
+            pass
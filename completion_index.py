@@ -0,0 +1,124 @@
+# Persistent per-term completion index so interrupted runs can resume
+#
+# One row per (job, normalized term) with status, last update time and attempt
+# count, stored in SQLite (WAL) so several worker processes can update it.
+
+import json
+import re
+import sqlite3
+from datetime import datetime, timedelta
+
+DEFAULT_INDEX_PATH = 'completion_index.sqlite'
+
+STATUS_RUNNING = 'running'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS terms (
+    job TEXT NOT NULL,
+    term_key TEXT NOT NULL,
+    term TEXT NOT NULL,
+    status TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT NOT NULL DEFAULT '',
+    result TEXT,
+    PRIMARY KEY (job, term_key)
+);
+"""
+
+
+def normalize_term(term) -> str:
+    return re.sub(r'\s+', ' ', str(term)).strip().casefold()
+
+
+def parse_since(value: str) -> datetime:
+    """'7d', '12h', '30m' (relative to now) or an ISO date/datetime."""
+    value = value.strip()
+    m = re.fullmatch(r'(\d+(?:\.\d+)?)\s*([dhm])', value, re.I)
+    if m:
+        unit = {'d': 'days', 'h': 'hours', 'm': 'minutes'}[m.group(2).lower()]
+        return datetime.now() - timedelta(**{unit: float(m.group(1))})
+    return datetime.fromisoformat(value)
+
+
+class CompletionIndex:
+    def __init__(self, path=DEFAULT_INDEX_PATH, job=''):
+        self.path = path
+        self.job = job
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(SCHEMA)
+
+    def _set(self, term, status, error='', result=None, attempt=False):
+        now = datetime.now().isoformat(timespec='seconds')
+        result_json = json.dumps(result, default=str) if result is not None else None
+        with self.conn:
+            self.conn.execute(
+                'INSERT INTO terms (job, term_key, term, status, updated_at, attempts, error, result) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT (job, term_key) DO UPDATE SET '
+                'term = excluded.term, status = excluded.status, updated_at = excluded.updated_at, '
+                'attempts = attempts + ?, error = excluded.error, '
+                'result = COALESCE(excluded.result, result)',
+                (self.job, normalize_term(term), str(term), status, now, int(attempt), error, result_json, int(attempt)),
+            )
+
+    def mark_started(self, term):
+        self._set(term, STATUS_RUNNING, attempt=True)
+
+    def mark_done(self, term, result=None):
+        self._set(term, STATUS_DONE, result=result)
+
+    def mark_failed(self, term, error=''):
+        self._set(term, STATUS_FAILED, error=str(error)[:500])
+
+    def mark(self, term, status, result=None):
+        self._set(term, status, result=result)
+
+    @staticmethod
+    def _record(row):
+        term, status, updated_at, attempts, error, result = row
+        return {
+            'term': term, 'status': status, 'updated_at': datetime.fromisoformat(updated_at),
+            'attempts': attempts, 'error': error, 'result': json.loads(result) if result else None,
+        }
+
+    def get(self, term):
+        row = self.conn.execute(
+            'SELECT term, status, updated_at, attempts, error, result FROM terms WHERE job = ? AND term_key = ?',
+            (self.job, normalize_term(term)),
+        ).fetchone()
+        return self._record(row) if row is not None else None
+
+    def records(self, status=None) -> list[dict]:
+        sql = 'SELECT term, status, updated_at, attempts, error, result FROM terms WHERE job = ?'
+        params = [self.job]
+        if status is not None:
+            sql += ' AND status = ?'
+            params.append(status)
+        return [self._record(row) for row in self.conn.execute(sql + ' ORDER BY updated_at', params)]
+
+    def filter_pending(self, terms, fresh_after=None, finished=(STATUS_DONE,)):
+        """Yield the terms that still need work.
+
+        A term is skipped when its status is in `finished` and, if fresh_after
+        is given, it was finished at or after that time.
+        """
+        for term in terms:
+            rec = self.get(term)
+            if rec is None or rec['status'] not in finished:
+                yield term
+            elif fresh_after is not None and rec['updated_at'] < fresh_after:
+                yield term
+
+    def summary(self) -> dict:
+        cur = self.conn.execute('SELECT status, COUNT(*) FROM terms WHERE job = ? GROUP BY status', (self.job,))
+        return dict(cur.fetchall())
+
+    def close(self):
+        try:
+            self.conn.close()
+        except Exception:
+            pass
@@ -0,0 +1,156 @@
+# Domain normalization and blacklist matching shared by both scripts
+#
+# Hostnames are normalized once and cached; registrable domains follow the
+# public-suffix rules in the bundled public_suffix_list.dat (no network access).
+# DomainMatcher stores domains as a reversed-label trie, so a lookup costs one
+# step per label of the hostname no matter how many domains it holds.
+
+import ipaddress
+import os
+from functools import lru_cache
+from urllib.parse import urlparse
+
+PUBLIC_SUFFIX_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'public_suffix_list.dat')
+CACHE_SIZE = 65536
+
+
+@lru_cache(maxsize=1)
+def _suffix_rules():
+    exact, wildcard, exception = set(), set(), set()
+    try:
+        with open(PUBLIC_SUFFIX_FILE, encoding='utf-8') as f:
+            for line in f:
+                rule = line.strip().split(' ', 1)[0]
+                if not rule or rule.startswith('//'):
+                    continue
+                rule = rule.encode('idna').decode('ascii') if not rule.isascii() else rule
+                if rule.startswith('!'):
+                    exception.add(rule[1:])
+                elif rule.startswith('*.'):
+                    wildcard.add(rule[2:])
+                else:
+                    exact.add(rule)
+    except (OSError, UnicodeError) as e:
+        print(f"[WARN] Could not load public suffix list: {e}")
+    return exact, wildcard, exception
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def is_ip(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        return False
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def hostname(url: str) -> str:
+    """Lowercased hostname of a URL or bare host, without port or trailing dot."""
+    try:
+        if not url:
+            return ''
+        url = url.strip()
+        if '://' not in url:
+            if is_ip(url.strip('[]')):
+                return url.strip('[]').lower()  # bare IPv6 would not parse as a netloc
+            url = 'https://' + url
+        return (urlparse(url).hostname or '').rstrip('.')
+    except Exception:
+        return ''
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def base_domain(url: str) -> str:
+    """Hostname with a single leading 'www.' removed (only at the start)."""
+    host = hostname(url)
+    return host[4:] if host.startswith('www.') else host
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def public_suffix(url: str) -> str:
+    """Public suffix of the URL's host; '' for IP addresses, which have none."""
+    host = hostname(url)
+    if not host or is_ip(host):
+        return ''
+    exact, wildcard, exception = _suffix_rules()
+    labels = host.split('.')
+    for i in range(len(labels)):
+        candidate = '.'.join(labels[i:])
+        if candidate in exception:
+            return '.'.join(labels[i + 1:])
+        if i > 0 and candidate in wildcard:
+            return '.'.join(labels[i - 1:])
+        if candidate in exact:
+            return candidate
+    # Default rule '*': the last label is the suffix
+    return labels[-1]
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def registrable_domain(url: str) -> str:
+    """Public suffix plus one label, e.g. shop.acme.com.sg -> acme.com.sg; IP hosts unchanged."""
+    host = hostname(url)
+    suffix = public_suffix(host)
+    if not host or not suffix or host == suffix:
+        return host
+    rest = host[:-len(suffix) - 1]
+    return rest.rsplit('.', 1)[-1] + '.' + suffix
+
+
+def _normalize_entry(entry: str) -> str:
+    entry = str(entry).strip().lower()
+    if '/' in entry or ':' in entry:
+        entry = hostname(entry)
+    entry = entry.strip('.')
+    if is_ip(entry):
+        return entry
+    # 'www.acme.com' means acme.com, but 'www.sg' must not become the whole .sg TLD
+    return entry[4:] if entry.startswith('www.') and '.' in entry[4:] else entry
+
+
+class DomainMatcher:
+    """Set of domains matched against hostnames on label boundaries.
+
+    'facebook.com' matches facebook.com, www.facebook.com and m.facebook.com,
+    but not notfacebook.com.
+    """
+
+    _END = object()
+
+    def __init__(self, domains=()):
+        self._root = {}
+        self._count = 0
+        for d in domains:
+            self.add(d)
+
+    def add(self, domain: str):
+        entry = _normalize_entry(domain)
+        if not entry:
+            return
+        node = self._root
+        for label in reversed(entry.split('.')):
+            node = node.setdefault(label, {})
+        if self._END not in node:
+            node[self._END] = entry
+            self._count += 1
+
+    def match(self, url: str) -> str:
+        """Return the matching blacklist entry for a URL/host/email domain, or ''."""
+        if url and '@' in url and '://' not in url:
+            url = url.rsplit('@', 1)[-1]  # email address
+        host = hostname(url)
+        node = self._root
+        for label in reversed(host.split('.')):
+            node = node.get(label)
+            if node is None:
+                return ''
+            if self._END in node:
+                return node[self._END]
+        return ''
+
+    def __contains__(self, url: str) -> bool:
+        return bool(self.match(url))
+
+    def __len__(self):
+        return self._count
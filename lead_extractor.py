@@ -0,0 +1,152 @@
+# Single-pass lead extraction: emails, SG phone numbers and address lines
+#
+# Works on the page snapshot taken by scraper_bot2v1.take_page_snapshot (or any
+# dict with the same keys), so it needs no browser and can be benchmarked offline.
+
+import re
+
+# ========== CONFIGURATION ==========
+MAX_TEXT_CHARS = 500_000       # innerText beyond this is ignored
+MAX_DOCUMENT_CHARS = 8_000_000  # raw HTML beyond this is never looked at
+MAX_HTML_CHARS = 2_000_000      # HTML beyond this (after dropping scripts) is ignored
+
+# One scan over the visible text picks up every kind of lead. The lookahead lets
+# the regex engine skip quickly to characters that can start a match, and emails
+# are matched from the '@' with the local part recovered by LOCAL_PART below,
+# which avoids rescanning every word as a possible local part.
+TEXT_PATTERN = re.compile(
+    r"(?=[@+\dS])(?:"
+    r"(?P<email>@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})"
+    r"|(?P<phone>(?:\+65\s?)?[689]\d{3}[-\s]?\d{4})"
+    r"|(?P<postal>\b\d{6}\b)"
+    r"|(?P<singapore>Singapore))"
+)
+EMAIL_DOMAIN = re.compile(r"@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+LOCAL_PART = re.compile(r"[a-zA-Z0-9._%+-]+\Z")
+MAX_LOCAL_PART = 64
+VALID_EMAIL = re.compile(r"^[\w\.-]+@[\w\.-]+\.[a-zA-Z]{2,}$")
+STATIC_FILE = re.compile(r"\.(jpg|jpeg|png|gif|svg|webp|css|js|woff|ico)(\?|$)", re.IGNORECASE)
+
+# Inline script/style bodies are dropped before the HTML scan (they can be
+# megabytes of bundled JS); JSON-LD blocks are kept since they often carry the email
+SKIPPED_TAGS = ('script', 'style')
+# Searched case-insensitively in the original string: lowercasing a copy can
+# change its length (e.g. 'İ'), so offsets found there don't fit the original
+SKIPPED_OPEN = re.compile(r"<(%s)" % '|'.join(SKIPPED_TAGS), re.IGNORECASE)
+SKIPPED_CLOSE = {tag: re.compile(r"</" + tag, re.IGNORECASE) for tag in SKIPPED_TAGS}
+
+
+def _valid_email(e: str) -> bool:
+    if STATIC_FILE.search(e):
+        return False
+    if "%" in e or ".." in e:
+        return False
+    return bool(VALID_EMAIL.match(e))
+
+
+def _email_at(doc: str, m) -> str:
+    # Expand an '@domain' match backwards over the local part; one character
+    # more than the limit is looked at so an overlong local part is dropped
+    # rather than cut to a different address
+    at = m.start()
+    local = LOCAL_PART.search(doc, max(0, at - MAX_LOCAL_PART - 1), at)
+    if not local or at - local.start() > MAX_LOCAL_PART:
+        return ''
+    return doc[local.start():m.end()]
+
+
+def find_emails(doc: str, limit: int) -> set:
+    found = set()
+    for m in EMAIL_DOMAIN.finditer(doc, 0, limit):
+        email = _email_at(doc, m)
+        if email:
+            found.add(email)
+    return found
+
+
+def _line_at(text: str, pos: int) -> str:
+    start = text.rfind('\n', 0, pos) + 1
+    end = text.find('\n', pos)
+    return text[start:end if end != -1 else len(text)].strip()
+
+
+def strip_scripts(html: str) -> str:
+    # Compiled literal-prefix searches plus str.find; a lazy DOTALL regex over
+    # the whole body is several times slower on multi-MB bundles
+    parts = []
+    pos = 0
+    while True:
+        m = SKIPPED_OPEN.search(html, pos)
+        if not m:
+            break
+        start, tag = m.start(), m.group(1).lower()
+        open_end = html.find('>', start)
+        if open_end == -1:
+            break
+        close_m = SKIPPED_CLOSE[tag].search(html, open_end)
+        close = close_m.start() if close_m else -1
+        end = len(html) if close == -1 else html.find('>', close) + 1 or len(html)
+        parts.append(html[pos:start])
+        if 'application/ld+json' in html[start:open_end].lower():
+            parts.append(html[open_end + 1:close if close != -1 else len(html)])
+        parts.append(' ')
+        pos = end
+    parts.append(html[pos:])
+    return ''.join(parts)
+
+
+def scan_text(text: str):
+    """One pass over visible text; returns (emails, phones, address line)."""
+    emails, phones = set(), set()
+    postal_line = singapore_line = ''
+    for m in TEXT_PATTERN.finditer(text, 0, MAX_TEXT_CHARS):
+        kind = m.lastgroup
+        if kind == 'email':
+            email = _email_at(text, m)
+            if email:
+                emails.add(email)
+        elif kind == 'phone':
+            phones.add(m.group())
+        elif kind == 'postal':
+            if not postal_line:
+                postal_line = _line_at(text, m.start())
+        elif not singapore_line:
+            singapore_line = _line_at(text, m.start())
+    return emails, phones, postal_line or singapore_line
+
+
+def extract_leads(snapshot, email_blacklist=None):
+    """Return {'emails': [...], 'contacts': [...], 'address': str} for a page snapshot.
+
+    email_blacklist is a domains.DomainMatcher; emails on matching domains are dropped.
+    """
+    if not snapshot:
+        return {'emails': [], 'contacts': [], 'address': ''}
+
+    text_emails, text_phones, text_address = scan_text(snapshot.get('text') or '')
+
+    candidates = set(text_emails)
+    html = snapshot.get('html') or ''
+    if html:
+        html = strip_scripts(html[:MAX_DOCUMENT_CHARS])
+        candidates.update(find_emails(html, MAX_HTML_CHARS))
+
+    emails = set()
+    for href in snapshot.get('mailto') or []:
+        email = href.split(':', 1)[-1].split('?')[0].strip()
+        if VALID_EMAIL.match(email):
+            emails.add(email)
+    emails.update(e for e in candidates if _valid_email(e))
+
+    if email_blacklist is not None:
+        emails = {e for e in emails if e not in email_blacklist}
+    emails = sorted(emails)
+
+    # tel: links win over numbers found in the text
+    contacts = {href.split(':', 1)[-1].strip() for href in snapshot.get('tel') or [] if ':' in href}
+    if not contacts:
+        contacts = text_phones
+
+    address = (snapshot.get('address') or '').strip() or text_address
+
+    return {'emails': emails, 'contacts': sorted(contacts), 'address': address}
@@ -0,0 +1,67 @@
+# Lean Chrome profile: headless, no images/fonts/media/trackers, eager page loads
+#
+# Neither the lead extraction nor the rank check looks at images, web fonts,
+# video or analytics beacons, so they are blocked at the network layer with CDP
+# Network.setBlockedURLs. Eager page loads hand control back at
+# DOMContentLoaded; page_waits then waits for the content that matters.
+#
+# A browser a person may have to solve an image CAPTCHA in (akc_rank_checker's
+# Google driver) keeps its images: pass images=True to both functions. No
+# Google, gstatic or recaptcha host is ever blocked.
+
+# ========== CONFIGURATION ==========
+WINDOW_SIZE = '1366,900'
+
+IMAGE_EXTENSIONS = ('png', 'jpg', 'jpeg', 'gif', 'webp', 'avif', 'bmp', 'ico', 'svg')
+BLOCKED_EXTENSIONS = IMAGE_EXTENSIONS + (
+    # fonts
+    'woff', 'woff2', 'ttf', 'otf', 'eot',
+    # audio / video
+    'mp4', 'webm', 'mov', 'avi', 'm4v', 'mp3', 'm4a', 'ogg', 'wav',
+)
+BLOCKED_HOSTS = (
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net', 'googlesyndication.com',
+    'connect.facebook.net', 'hotjar.com', 'clarity.ms', 'segment.io', 'mixpanel.com',
+    'analytics.tiktok.com', 'snap.licdn.com', 'static.ads-twitter.com', 'cdn.heapanalytics.com',
+    'youtube.com/embed', 'player.vimeo.com',
+)
+
+
+def url_patterns(extensions, hosts=BLOCKED_HOSTS):
+    # Network.setBlockedURLs patterns: '*' is the only wildcard
+    return (
+        [f'*.{ext}' for ext in extensions]
+        + [f'*.{ext}?*' for ext in extensions]
+        + [f'*{host}*' for host in hosts]
+    )
+
+
+BLOCKED_URL_PATTERNS = url_patterns(BLOCKED_EXTENSIONS)
+BLOCKED_URL_PATTERNS_WITH_IMAGES = url_patterns([ext for ext in BLOCKED_EXTENSIONS if ext not in IMAGE_EXTENSIONS])
+
+
+def apply_lean_options(options, headless=True, images=False):
+    """Add lean-profile flags to a (undetected_)chromedriver ChromeOptions."""
+    if headless:
+        options.add_argument('--headless=new')
+    options.add_argument(f'--window-size={WINDOW_SIZE}')
+    if not images:
+        options.add_argument('--blink-settings=imagesEnabled=false')
+    options.add_argument('--mute-audio')
+    options.add_argument('--autoplay-policy=user-gesture-required')
+    options.add_argument('--disable-extensions')
+    options.add_argument('--disable-background-networking')
+    options.page_load_strategy = 'eager'
+    return options
+
+
+def block_requests(driver, images=False):
+    """Block matching requests in the driver's current tab; returns False if CDP isn't available."""
+    patterns = BLOCKED_URL_PATTERNS_WITH_IMAGES if images else BLOCKED_URL_PATTERNS
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(patterns)})
+        return True
+    except Exception as e:
+        print(f"[WARN] Could not enable request blocking: {e}")
+        return False
@@ -0,0 +1,205 @@
+# Out-of-core merge of scraper_bot2v1 worker checkpoints
+#
+# Every run keeps its worker stores in worker_outputs/<run id>/, so the merge
+# only sees the current run (a --resume run continues the latest one) instead
+# of whatever worker files earlier runs left behind. Rows are copied into one
+# on-disk SQLite table whose primary key is a 16-byte hash of the row, so
+# INSERT OR IGNORE deduplicates without holding the dataset in memory. The
+# Excel and Parquet outputs are then streamed from that table in batches.
+# Terms a worker died in the middle of have no contact rows yet; theirs are
+# assembled here from the lead facts the crawl had already stored.
+
+import glob
+import hashlib
+import os
+import sqlite3
+import uuid
+from datetime import datetime
+
+import openpyxl
+
+from checkpoint_store import CONTACT_COLUMNS, SKIPPED_COLUMNS, lead_rows
+from domains import base_domain
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# ========== CONFIGURATION ==========
+OUTPUT_ROOT = 'worker_outputs'
+EXPORT_BATCH_ROWS = 10_000
+EXCEL_MAX_ROWS = 1_048_575  # one header row + this many rows fit in a worksheet
+MERGE_CACHE_KIB = 65_536    # SQLite page cache for the merge; the rest stays on disk
+
+MERGE_SCHEMA = """
+CREATE TABLE contacts (
+    key BLOB PRIMARY KEY,
+    search_term TEXT, company_name TEXT, website TEXT, domain TEXT,
+    email TEXT, contact TEXT, address TEXT
+);
+CREATE TABLE skipped (
+    key BLOB PRIMARY KEY,
+    url TEXT, reason TEXT
+);
+CREATE TABLE pages (
+    search_term TEXT, query TEXT, url TEXT, domain TEXT, page_type TEXT, source TEXT,
+    elapsed REAL, emails INTEGER, contacts INTEGER, address INTEGER, worker_id INTEGER
+);
+CREATE TABLE terms (
+    search_term TEXT, query TEXT, elapsed REAL, worker_id INTEGER
+);
+"""
+PAGE_FIELDS = 'search_term, query, url, domain, page_type, source, elapsed, emails, contacts, address, worker_id'
+TERM_FIELDS = 'search_term, query, elapsed, worker_id'
+CONTACT_FIELDS = 'search_term, company_name, website, email, contact, address'
+
+
+def new_run_id() -> str:
+    return f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def latest_run_id(root=OUTPUT_ROOT):
+    runs = sorted(d for d in os.listdir(root) if os.path.isdir(os.path.join(root, d))) if os.path.isdir(root) else []
+    return runs[-1] if runs else None
+
+
+def run_dir(run_id, root=OUTPUT_ROOT) -> str:
+    path = os.path.join(root, run_id)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def worker_store_path(directory, worker_id) -> str:
+    return os.path.join(directory, f"worker_{worker_id}.sqlite")
+
+
+def row_key(*fields) -> bytes:
+    return hashlib.blake2b('\x1f'.join('' if f is None else str(f) for f in fields).encode('utf-8'), digest_size=16).digest()
+
+
+def _unfinished_rows(conn):
+    """Contact rows for terms of the attached store w that have leads but never finished."""
+    cur = conn.execute(
+        'SELECT search_term, domain, kind, value FROM w.leads '
+        'WHERE search_term NOT IN (SELECT search_term FROM w.terms) ORDER BY search_term, id'
+    )
+    facts, current = {}, None
+    for term, domain, kind, value in cur:
+        if term != current and facts:
+            yield from lead_rows(current, facts)
+            facts = {}
+        current = term
+        facts.setdefault(domain, {}).setdefault(kind, set()).add(value)
+    if facts:
+        yield from lead_rows(current, facts)
+
+
+def merge_run(directory) -> str:
+    """Deduplicate every worker store in directory into directory/merged.sqlite; returns its path."""
+    path = os.path.join(directory, 'merged.sqlite')
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode=OFF')  # scratch file, rebuilt on every merge
+    conn.execute('PRAGMA synchronous=OFF')
+    conn.execute(f'PRAGMA cache_size=-{MERGE_CACHE_KIB}')
+    conn.execute('PRAGMA temp_store=FILE')
+    conn.create_function('row_key', -1, row_key, deterministic=True)
+    conn.executescript(MERGE_SCHEMA)
+    for store in sorted(glob.glob(os.path.join(directory, 'worker_*.sqlite'))):
+        try:
+            conn.execute('ATTACH DATABASE ? AS w', (store,))
+        except sqlite3.Error as e:
+            print(f"[WARN] Could not read {store}: {e}")
+            continue
+        try:
+            with conn:
+                conn.execute(
+                    f'INSERT OR IGNORE INTO contacts (key, {CONTACT_FIELDS}, domain) '
+                    f'SELECT row_key({CONTACT_FIELDS}), {CONTACT_FIELDS}, domain FROM w.contacts ORDER BY id'
+                )
+                conn.execute(
+                    'INSERT OR IGNORE INTO skipped (key, url, reason) '
+                    'SELECT row_key(url, reason), url, reason FROM w.skipped ORDER BY id'
+                )
+                # Visit logs are per worker already; stores from before they existed simply lack the tables
+                tables = {name for (name,) in conn.execute("SELECT name FROM w.sqlite_master WHERE type = 'table'")}
+                if 'pages' in tables:
+                    columns = {row[1] for row in conn.execute('PRAGMA w.table_info(pages)')}
+                    fields = PAGE_FIELDS if 'search_term' in columns else PAGE_FIELDS.replace('search_term', "''", 1)
+                    conn.execute(f'INSERT INTO pages ({PAGE_FIELDS}) SELECT {fields} FROM w.pages ORDER BY id')
+                if 'terms' in tables:
+                    conn.execute(f'INSERT INTO terms ({TERM_FIELDS}) SELECT {TERM_FIELDS} FROM w.terms ORDER BY id')
+                if 'leads' in tables and 'terms' in tables:
+                    rows = [(r['Search Term'], r['Company Name'], r['Website'], r['Emails'], r['Contacts'], r['Address'])
+                            for r in _unfinished_rows(conn)]
+                    if rows:
+                        print(f"[INFO] {store}: recovered {len(rows)} rows of unfinished terms from their leads")
+                    conn.executemany(
+                        f'INSERT OR IGNORE INTO contacts (key, {CONTACT_FIELDS}, domain) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                        [(row_key(*r), *r, base_domain(r[2])) for r in rows],
+                    )
+        except sqlite3.Error as e:
+            print(f"[WARN] Could not merge {store}: {e}")
+        finally:
+            conn.execute('DETACH DATABASE w')
+    conn.close()
+    return path
+
+
+def _batches(conn, sql):
+    cur = conn.execute(sql)
+    while True:
+        rows = cur.fetchmany(EXPORT_BATCH_ROWS)
+        if not rows:
+            return
+        yield rows
+
+
+def export_excel(conn, path) -> bool:
+    """Stream the merged rows into a write-only workbook; False if there is nothing to write."""
+    sheets = [
+        ('Contacts', CONTACT_COLUMNS, 'contacts', CONTACT_FIELDS),
+        ('Skipped URL', SKIPPED_COLUMNS, 'skipped', 'url, reason'),
+    ]
+    wb = openpyxl.Workbook(write_only=True)
+    written = False
+    for title, columns, table, fields in sheets:
+        total = conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+        if not total:
+            continue
+        ws = wb.create_sheet(title)
+        ws.append(columns)
+        left = EXCEL_MAX_ROWS
+        for rows in _batches(conn, f'SELECT {fields} FROM {table} ORDER BY rowid'):
+            for row in rows[:left]:
+                ws.append(list(row))
+            left -= min(len(rows), left)
+            if not left:
+                break
+        if total > EXCEL_MAX_ROWS:
+            print(f"[WARN] {title}: only the first {EXCEL_MAX_ROWS} of {total} rows fit in Excel; see the Parquet output")
+        written = True
+    if written:
+        wb.save(path)
+    return written
+
+
+def export_parquet(conn, path) -> bool:
+    """Write the merged contacts to Parquet in row groups; False if pyarrow is missing or there are no rows."""
+    if pq is None:
+        return False
+    schema = pa.schema([(name, pa.string()) for name in CONTACT_COLUMNS])
+    writer = None
+    try:
+        for rows in _batches(conn, f'SELECT {CONTACT_FIELDS} FROM contacts ORDER BY rowid'):
+            if writer is None:
+                writer = pq.ParquetWriter(path, schema)
+            columns = list(zip(*rows))
+            writer.write_table(pa.table([pa.array(c, pa.string()) for c in columns], schema=schema))
+    finally:
+        if writer is not None:
+            writer.close()
+    return writer is not None
@@ -0,0 +1,249 @@
+# Content-addressed on-disk page cache with TTL and conditional revalidation
+#
+# Snapshots are stored zlib-compressed under blobs/<hash[:2]>/<hash>, where hash
+# is the SHA-256 of the page HTML, so identical pages share one blob. index.sqlite
+# maps the normalized URL to its blob, fetch time, ETag / Last-Modified and the
+# leads extracted from it. When a refetch produces the same hash the stored
+# leads are reused and extraction is skipped. Least recently used entries are
+# evicted once the blobs exceed max_bytes; their total is kept in cache_size by
+# triggers, so checking it after every save costs one row read.
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import zlib
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# ========== CONFIGURATION ==========
+DEFAULT_CACHE_DIR = 'page_cache'
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+TRACKING_PARAMS = ('utm_', 'fbclid', 'gclid', 'mc_cid', 'mc_eid')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url_key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    source TEXT,
+    leads TEXT
+);
+CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed_at);
+CREATE INDEX IF NOT EXISTS pages_hash ON pages (content_hash);
+CREATE TABLE IF NOT EXISTS blobs (
+    content_hash TEXT PRIMARY KEY,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS cache_size (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    bytes INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS blobs_added AFTER INSERT ON blobs
+BEGIN
+    UPDATE cache_size SET bytes = bytes + NEW.size WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS blobs_removed AFTER DELETE ON blobs
+BEGIN
+    UPDATE cache_size SET bytes = bytes - OLD.size WHERE id = 0;
+END;
+"""
+
+
+def normalize_url(url: str) -> str:
+    """Cache key: lowercase scheme/host, no default port, fragment or tracking params."""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    port = parts.port
+    if port and not ((scheme == 'http' and port == 80) or (scheme == 'https' and port == 443)):
+        host = f"{host}:{port}"
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith(TRACKING_PARAMS)
+    ))
+    path = parts.path or '/'
+    if len(path) > 1 and path.endswith('/'):
+        path = path[:-1]
+    return urlunsplit((scheme, host, path, query, ''))
+
+
+def content_hash(html: str) -> str:
+    return hashlib.sha256(html.encode('utf-8', errors='replace')).hexdigest()
+
+
+class PageCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, ttl_seconds=DEFAULT_TTL_SECONDS, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.join(cache_dir, 'blobs'), exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(cache_dir, 'index.sqlite'), timeout=30)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        # First open (or a cache from before cache_size existed): count what is there
+        with self.conn:
+            self.conn.execute('INSERT OR IGNORE INTO cache_size (id, bytes) '
+                              'SELECT 0, COALESCE(SUM(size), 0) FROM blobs')
+        self.hits = self.revalidated = self.misses = 0
+
+    def _blob_path(self, h: str) -> str:
+        return os.path.join(self.cache_dir, 'blobs', h[:2], h)
+
+    def _read_blob(self, h: str):
+        try:
+            with open(self._blob_path(h), 'rb') as f:
+                return json.loads(zlib.decompress(f.read()))
+        except (OSError, ValueError, zlib.error):
+            return None
+
+    def _write_blob(self, h: str, snapshot) -> int:
+        path = self._blob_path(h)
+        if os.path.exists(path):
+            return os.path.getsize(path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = zlib.compress(json.dumps(snapshot).encode('utf-8'), 6)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)  # atomic, so concurrent workers never see half a blob
+        return len(data)
+
+    def lookup(self, url: str):
+        """Return the index entry for url (dict) or None."""
+        row = self.conn.execute(
+            'SELECT url, content_hash, fetched_at, etag, last_modified, source, leads FROM pages WHERE url_key = ?',
+            (normalize_url(url),),
+        ).fetchone()
+        if row is None:
+            return None
+        url, h, fetched_at, etag, last_modified, source, leads = row
+        return {
+            'url': url, 'content_hash': h, 'fetched_at': fetched_at, 'etag': etag,
+            'last_modified': last_modified, 'source': source,
+            'leads': json.loads(leads) if leads else None,
+        }
+
+    def is_fresh(self, entry) -> bool:
+        return entry is not None and time.time() - entry['fetched_at'] < self.ttl_seconds
+
+    @staticmethod
+    def conditional_headers(entry) -> dict:
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def load(self, url: str, entry=None, revalidated=False):
+        """Cached snapshot for url (with stored 'leads' if any), or None."""
+        entry = entry or self.lookup(url)
+        if entry is None:
+            return None
+        snapshot = self._read_blob(entry['content_hash'])
+        if snapshot is None:
+            return None
+        now = time.time()
+        with self.conn:
+            if revalidated:
+                self.conn.execute('UPDATE pages SET fetched_at = ?, accessed_at = ? WHERE url_key = ?',
+                                  (now, now, normalize_url(url)))
+            else:
+                self.conn.execute('UPDATE pages SET accessed_at = ? WHERE url_key = ?', (now, normalize_url(url)))
+        if revalidated:
+            self.revalidated += 1
+        else:
+            self.hits += 1
+        snapshot['source'] = 'cache'
+        if entry['leads'] is not None:
+            snapshot['leads'] = entry['leads']
+        return snapshot
+
+    def get_fresh(self, url: str):
+        """Snapshot for url if cached within the TTL, else None."""
+        entry = self.lookup(url)
+        if not self.is_fresh(entry):
+            return None
+        return self.load(url, entry)
+
+    def save(self, url: str, snapshot, etag=None, last_modified=None):
+        """Store a freshly fetched snapshot; attaches the old leads when the content is unchanged."""
+        self.misses += 1
+        body = {k: v for k, v in snapshot.items() if k != 'leads'}
+        h = content_hash(body.get('html') or '')
+        old = self.lookup(url)
+        leads = old['leads'] if old and old['content_hash'] == h else None
+        size = self._write_blob(h, body)
+        now = time.time()
+        with self.conn:
+            # A hash always has the same blob; IGNORE (not REPLACE) keeps the size triggers exact
+            self.conn.execute('INSERT OR IGNORE INTO blobs (content_hash, size) VALUES (?, ?)', (h, size))
+            self.conn.execute(
+                'INSERT OR REPLACE INTO pages '
+                '(url_key, url, content_hash, fetched_at, accessed_at, etag, last_modified, source, leads) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (normalize_url(url), url, h, now, now, etag, last_modified, snapshot.get('source'),
+                 json.dumps(leads) if leads is not None else None),
+            )
+            # The page's previous content may now be referenced by nothing
+            orphans = self._drop_orphans([old['content_hash']] if old and old['content_hash'] != h else [])
+        self._remove_blobs(orphans)
+        if leads is not None:
+            snapshot['leads'] = leads
+        self.evict()
+        return snapshot
+
+    def store_leads(self, url: str, leads):
+        with self.conn:
+            self.conn.execute('UPDATE pages SET leads = ? WHERE url_key = ?', (json.dumps(leads), normalize_url(url)))
+
+    def total_bytes(self) -> int:
+        row = self.conn.execute('SELECT bytes FROM cache_size WHERE id = 0').fetchone()
+        return row[0] if row else 0
+
+    def evict(self, batch=100):
+        """Drop least recently used pages until the blobs fit in max_bytes."""
+        while self.total_bytes() > self.max_bytes:
+            with self.conn:
+                rows = self.conn.execute(
+                    'SELECT url_key, content_hash FROM pages ORDER BY accessed_at LIMIT ?', (batch,)).fetchall()
+                if not rows:
+                    return
+                self.conn.executemany('DELETE FROM pages WHERE url_key = ?', [(k,) for k, _ in rows])
+                orphans = self._drop_orphans({h for _, h in rows})
+            self._remove_blobs(orphans)
+
+    def _drop_orphans(self, hashes) -> list:
+        # Within a transaction: forget the blobs no page refers to any more (the
+        # pages_hash index keeps this to one lookup per hash)
+        orphans = [h for h in hashes if self.conn.execute(
+            'SELECT 1 FROM pages WHERE content_hash = ? LIMIT 1', (h,)).fetchone() is None]
+        self.conn.executemany('DELETE FROM blobs WHERE content_hash = ?', [(h,) for h in orphans])
+        return orphans
+
+    def _remove_blobs(self, hashes):
+        for h in hashes:
+            try:
+                os.remove(self._blob_path(h))
+            except OSError:
+                pass
+
+    def stats(self) -> str:
+        return f"cache hits={self.hits} revalidated={self.revalidated} misses={self.misses} size={self.total_bytes() / 1e6:.1f}MB"
+
+    def close(self):
+        try:
+            self.conn.close()
+        except Exception:
+            pass
@@ -0,0 +1,228 @@
+# HTTP-first page fetcher for company sites
+#
+# Most company homepages and contact pages are static HTML, so a pooled
+# requests.Session fetch (tens of ms) can replace a Chrome navigation (seconds).
+# fetch_snapshot() returns the same snapshot dict as
+# scraper_bot2v1.take_page_snapshot, or None when the page needs a real browser
+# (JS-rendered shell, bot wall, non-HTML, network error). With a PageCache,
+# stale entries are revalidated with If-None-Match / If-Modified-Since.
+
+import codecs
+import re
+from urllib.parse import urljoin
+
+import lxml.html
+import requests
+from requests.adapters import HTTPAdapter
+
+# ========== CONFIGURATION ==========
+HTTP_TIMEOUT = (5, 15)        # (connect, read) seconds
+MAX_RESPONSE_BYTES = 5_000_000
+MIN_BODY_TEXT_CHARS = 200     # less visible text than this looks like a JS shell
+SHELL_TEXT_CHARS = 2000       # SPA markers only count on pages with less text than this
+POOL_SIZE = 20
+CHARSET_SNIFF_BYTES = 2048    # a <meta charset> is looked for this far into the body
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+try:
+    import brotli  # noqa: F401  (lets urllib3 decode br responses)
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+# Markers of single-page-app shells and "enable JavaScript" pages
+SPA_SHELL_PATTERNS = re.compile(
+    r'<div[^>]+id=["\'](?:root|app|__next|__nuxt|svelte)["\'][^>]*>\s*</div>'
+    r'|<app-root[^>]*>\s*</app-root>'
+    r'|(?:enable|requires?) javascript'
+    r'|window\.__INITIAL_STATE__'
+    r'|cf-browser-verification|challenge-platform',
+    re.IGNORECASE,
+)
+# <meta charset="..."> and <meta http-equiv="Content-Type" content="text/html; charset=...">
+META_CHARSET = re.compile(rb'<meta[^>]*?charset\s*=\s*["\']?\s*([a-zA-Z0-9_.:-]+)', re.IGNORECASE)
+# Labels browsers decode as a superset (WHATWG Encoding), keyed by codecs name
+BROWSER_ENCODINGS = {
+    'gb2312': 'gbk', 'shift_jis': 'cp932', 'euc_kr': 'cp949', 'big5': 'big5hkscs',
+    'iso8859-1': 'cp1252', 'ascii': 'cp1252',
+}
+BOMS = ((codecs.BOM_UTF8, 'utf-8-sig'), (codecs.BOM_UTF16_LE, 'utf-16'), (codecs.BOM_UTF16_BE, 'utf-16'))
+BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'br', 'dd', 'div', 'dl', 'dt', 'footer',
+    'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'li', 'main', 'nav',
+    'ol', 'p', 'pre', 'section', 'table', 'td', 'th', 'tr', 'ul',
+}
+DROP_TAGS = ('script', 'style', 'noscript', 'template', 'svg')
+
+_session = None
+
+
+def get_session() -> requests.Session:
+    global _session
+    if _session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=0)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers.update({
+            'User-Agent': USER_AGENT,
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.9',
+            'Accept-Encoding': ACCEPT_ENCODING,
+        })
+        _session = session
+    return _session
+
+
+def _codec(label):
+    try:
+        name = codecs.lookup(label).name
+    except LookupError:
+        return None
+    return BROWSER_ENCODINGS.get(name, name)
+
+
+def _bom_encoding(body: bytes):
+    for bom, encoding in BOMS:
+        if body.startswith(bom):
+            return encoding
+    return None
+
+
+def sniff_charset(body: bytes):
+    """Encoding named by a <meta> charset near the top of body, or None."""
+    m = META_CHARSET.search(body, 0, CHARSET_SNIFF_BYTES)
+    if not m:
+        return None
+    encoding = _codec(m.group(1).decode('ascii'))
+    # A page that can declare itself in <meta> is ASCII-compatible, whatever it says
+    return 'utf-8' if encoding in ('utf-16', 'utf-16-le', 'utf-16-be') else encoding
+
+
+def decode_body(body: bytes, charset=None) -> str:
+    """Decode a response body like a browser: BOM, then the declared charset, then <meta>, then UTF-8."""
+    encoding = _bom_encoding(body) or (charset and _codec(charset)) or sniff_charset(body) or 'utf-8'
+    return body.decode(encoding, errors='replace')
+
+
+def html_to_text(root) -> str:
+    """Rough innerText: visible text with a line break after block elements.
+
+    Comments, processing instructions and DROP_TAGS hide only their own
+    content; the text that follows them (their tail) is still visible.
+    """
+    parts = []
+    stack = [(root, False)]
+    while stack:
+        el, closing = stack.pop()
+        tail = el.tail if el is not root else None
+        if closing:
+            if el.tag in BLOCK_TAGS:
+                parts.append('\n')
+        elif not isinstance(el.tag, str) or el.tag in DROP_TAGS:
+            pass
+        else:
+            if el.text:
+                parts.append(el.text)
+            stack.append((el, True))
+            stack.extend((child, False) for child in reversed(el))
+            continue
+        if tail:
+            parts.append(tail)
+    text = ''.join(parts)
+    return '\n'.join(line.strip() for line in text.splitlines() if line.strip())
+
+
+def snapshot_from_html(html: str, base_url: str = ''):
+    """Build a page snapshot (text, html, mailto, tel, address, links) from raw HTML."""
+    try:
+        tree = lxml.html.fromstring(html)
+    except Exception:
+        return None
+    mailto, tel, links = [], [], []
+    for a in tree.iter('a'):
+        href = (a.get('href') or '').strip()
+        if not href:
+            continue
+        lower = href.lower()
+        if lower.startswith('mailto:'):
+            mailto.append(href)
+        elif lower.startswith('tel:'):
+            tel.append(href)
+        else:
+            links.append(urljoin(base_url, href) if base_url else href)
+    address = ''
+    for el in tree.iter('address'):
+        address = html_to_text(el)
+        break
+    body = tree.find('body')
+    text = html_to_text(body if body is not None else tree)
+    return {
+        'text': text,
+        'html': html,
+        'mailto': mailto,
+        'tel': tel,
+        'address': address,
+        'links': links,
+    }
+
+
+def looks_js_rendered(snapshot) -> bool:
+    text_len = len(snapshot['text'])
+    if text_len < MIN_BODY_TEXT_CHARS:
+        return True
+    # "Please enable JavaScript" notices are common on full static pages too
+    return text_len < SHELL_TEXT_CHARS and bool(SPA_SHELL_PATTERNS.search(snapshot['html'][:200_000]))
+
+
+def fetch_snapshot(url: str, verbose=False, cache=None):
+    """Fetch url over plain HTTP; return a snapshot, or None to fall back to the browser.
+
+    With a PageCache, a 304 answer to the conditional request returns the cached
+    snapshot, and a 200 answer is stored in the cache.
+    """
+    entry = cache.lookup(url) if cache is not None else None
+    headers = cache.conditional_headers(entry) if entry is not None else None
+    try:
+        with get_session().get(url, headers=headers, timeout=HTTP_TIMEOUT, stream=True, allow_redirects=True) as resp:
+            if resp.status_code == 304 and entry is not None:
+                snapshot = cache.load(url, entry, revalidated=True)
+                if snapshot is not None:
+                    if verbose: print(f"[DEBUG] {url} not modified, using cached copy")
+                    return snapshot
+                return None
+            if resp.status_code != 200:
+                if verbose: print(f"[DEBUG] HTTP {resp.status_code} for {url}, using browser")
+                return None
+            content_type = resp.headers.get('Content-Type', '')
+            if 'html' not in content_type.lower():
+                if verbose: print(f"[DEBUG] Non-HTML response ({content_type}) for {url}, using browser")
+                return None
+            chunks, size = [], 0
+            for chunk in resp.iter_content(64 * 1024):
+                chunks.append(chunk)
+                size += len(chunk)
+                if size > MAX_RESPONSE_BYTES:
+                    break
+            # requests assumes ISO-8859-1 when no charset is declared; let decode_body sniff <meta> instead
+            html = decode_body(b''.join(chunks), resp.encoding if 'charset=' in content_type.lower() else None)
+            final_url = resp.url
+            etag = resp.headers.get('ETag')
+            last_modified = resp.headers.get('Last-Modified')
+    except requests.RequestException as e:
+        if verbose: print(f"[DEBUG] HTTP fetch failed for {url}: {e}, using browser")
+        return None
+    except Exception as e:
+        # Anything unexpected (odd headers, broken compression...) just means the browser gets this page
+        print(f"[WARN] HTTP fetch of {url} failed unexpectedly: {e!r}, using browser")
+        return None
+
+    snapshot = snapshot_from_html(html, final_url)
+    if snapshot is None or looks_js_rendered(snapshot):
+        if verbose: print(f"[DEBUG] {url} looks JS-rendered, using browser")
+        return None
+    snapshot['source'] = 'http'
+    snapshot['final_url'] = final_url
+    if cache is not None:
+        cache.save(url, snapshot, etag, last_modified)
+    return snapshot
@@ -0,0 +1,124 @@
+# Condition-based page readiness and explicit pacing
+#
+# Readiness waits poll one combined JS check per tick (document ready, a CSS
+# selector present, visible body text, no new resource timing entries for
+# idle_ms) and return as soon as it holds or the timeout passes. Pages that
+# never go quiet (polling, analytics beacons) only get IDLE_GRACE_SECONDS past
+# idle_ms before the idle check is dropped. Errors from a dead browser session
+# are not retried here; they propagate to the caller. Deliberate human-like
+# delays live in a separate PacingPolicy so they are configured in one place.
+# Every wait and pause is added to WAIT_STATS for the end-of-run report.
+
+import json
+import random
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from selenium.common.exceptions import JavascriptException, StaleElementReferenceException, TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+from phase_timings import TIMINGS
+
+# ========== CONFIGURATION ==========
+POLL_SECONDS = 0.1
+DEFAULT_IDLE_MS = 500
+IDLE_GRACE_SECONDS = 3  # after idle_ms + this, the other conditions alone are enough
+# Transient while a page is being replaced; anything else (e.g. a dead session) propagates
+IGNORED_EXCEPTIONS = (StaleElementReferenceException, JavascriptException)
+
+READY_JS = "document.readyState === 'complete'"
+INTERACTIVE_JS = "document.readyState !== 'loading'"  # enough with eager page loads
+SELECTOR_JS = "document.querySelector({selector}) !== null"
+BODY_TEXT_JS = "!!document.body && document.body.innerText.trim().length >= {min_chars}"
+# Resource timing only lists finished requests, so "idle" means none finished for idle_ms
+NETWORK_IDLE_JS = (
+    "(function () {{"
+    " var last = 0, entries = performance.getEntriesByType('resource');"
+    " for (var i = 0; i < entries.length; i++) last = Math.max(last, entries[i].responseEnd);"
+    " return performance.now() - last >= {idle_ms};"
+    " }})()"
+)
+
+
+class WaitStats:
+    """Seconds spent waiting, per kind ('ready', 'pacing:between_searches', ...)."""
+
+    def __init__(self):
+        self.seconds = defaultdict(float)
+        self.counts = defaultdict(int)
+        self.timeouts = defaultdict(int)
+
+    def add(self, kind, seconds, timed_out=False):
+        self.seconds[kind] += seconds
+        self.counts[kind] += 1
+        if timed_out:
+            self.timeouts[kind] += 1
+
+    def total(self) -> float:
+        return sum(self.seconds.values())
+
+    def report(self) -> str:
+        if not self.counts:
+            return 'no waits recorded'
+        lines = [f"total waiting {self.total():.1f}s"]
+        for kind in sorted(self.seconds, key=self.seconds.get, reverse=True):
+            n = self.counts[kind]
+            line = f"  {kind:<28} {self.seconds[kind]:8.1f}s over {n} waits (avg {self.seconds[kind] / n:.2f}s)"
+            if self.timeouts[kind]:
+                line += f", {self.timeouts[kind]} timed out"
+            lines.append(line)
+        return '\n'.join(lines)
+
+
+WAIT_STATS = WaitStats()
+
+
+def readiness_script(selector=None, min_text_chars=0, idle_ms=None, interactive=False) -> str:
+    checks = [INTERACTIVE_JS if interactive else READY_JS]
+    if selector:
+        checks.append(SELECTOR_JS.format(selector=json.dumps(selector)))
+    if min_text_chars:
+        checks.append(BODY_TEXT_JS.format(min_chars=int(min_text_chars)))
+    if idle_ms:
+        checks.append(NETWORK_IDLE_JS.format(idle_ms=int(idle_ms)))
+    return 'return ' + ' && '.join(f'({c})' for c in checks) + ';'
+
+
+def wait_until(driver, timeout, selector=None, min_text_chars=0, idle_ms=None, interactive=False, kind='ready') -> bool:
+    """Poll until every given condition holds; False if timeout (seconds) ran out first.
+
+    The network-idle condition is given up after idle_ms + IDLE_GRACE_SECONDS.
+    """
+    script = readiness_script(selector, min_text_chars, idle_ms, interactive)
+    without_idle = readiness_script(selector, min_text_chars, None, interactive)
+    start = time.monotonic()
+    idle_deadline = start + (idle_ms or 0) / 1000 + IDLE_GRACE_SECONDS
+
+    def ready(d):
+        return d.execute_script(script if time.monotonic() < idle_deadline else without_idle)
+
+    ok = True
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=POLL_SECONDS, ignored_exceptions=IGNORED_EXCEPTIONS).until(ready)
+    except TimeoutException:
+        ok = False
+    elapsed = time.monotonic() - start
+    WAIT_STATS.add(kind, elapsed, timed_out=not ok)
+    TIMINGS.record('wait', elapsed)
+    return ok
+
+
+@dataclass
+class PacingPolicy:
+    """Named (min, max) second ranges for deliberate pauses; unknown names don't pause."""
+    delays: dict = field(default_factory=dict)
+    enabled: bool = True
+
+    def pause(self, name) -> float:
+        low, high = self.delays.get(name, (0, 0))
+        seconds = random.uniform(low, high) if self.enabled else 0
+        if seconds > 0:
+            time.sleep(seconds)
+            WAIT_STATS.add(f"pacing:{name}", seconds)
+        return seconds
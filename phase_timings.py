@@ -0,0 +1,148 @@
+# Per-phase timing histograms and opt-in profiler dumps
+#
+# Code wraps named phases (driver_startup, serp_load, serp_parse, ...) in
+# `with phase('name'):`. Durations go into log-spaced buckets (5% wide), so
+# memory stays fixed however long the run is while p50/p95/p99 stay within a
+# bucket of the true value. Each process keeps its own TIMINGS; reports are
+# plain JSON and can be merged across workers with merge_reports().
+
+import cProfile
+import json
+import math
+import os
+import re
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+
+# ========== CONFIGURATION ==========
+BUCKET_MIN_SECONDS = 1e-4
+BUCKET_GROWTH = 1.05
+PERCENTILES = (50, 95, 99)
+PROFILE_DIR = 'profiles'
+TRACEMALLOC_TOP = 30
+
+
+def _bucket(seconds) -> int:
+    if seconds <= BUCKET_MIN_SECONDS:
+        return 0
+    return int(math.log(seconds / BUCKET_MIN_SECONDS, BUCKET_GROWTH)) + 1
+
+
+def _bucket_upper(index) -> float:
+    return BUCKET_MIN_SECONDS * BUCKET_GROWTH ** index
+
+
+class PhaseTimings:
+    def __init__(self):
+        self.buckets = defaultdict(lambda: defaultdict(int))
+        self.totals = defaultdict(float)
+        self.maxima = defaultdict(float)
+
+    def record(self, name, seconds):
+        self.buckets[name][_bucket(seconds)] += 1
+        self.totals[name] += seconds
+        self.maxima[name] = max(self.maxima[name], seconds)
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def to_dict(self) -> dict:
+        """Raw histograms, mergeable with merge_reports()."""
+        return {
+            name: {
+                'buckets': {str(i): n for i, n in sorted(self.buckets[name].items())},
+                'total': self.totals[name],
+                'max': self.maxima[name],
+            }
+            for name in self.buckets
+        }
+
+
+def summarize(raw) -> dict:
+    """Per phase: count, total, mean, p50/p95/p99 and max, in seconds."""
+    summary = {}
+    for name, hist in raw.items():
+        buckets = sorted((int(i), n) for i, n in hist['buckets'].items())
+        count = sum(n for _, n in buckets)
+        if not count:
+            continue
+        stats = {'count': count, 'total': round(hist['total'], 4), 'mean': round(hist['total'] / count, 4)}
+        for p in PERCENTILES:
+            rank = math.ceil(count * p / 100)
+            seen = 0
+            for index, n in buckets:
+                seen += n
+                if seen >= rank:
+                    stats[f'p{p}'] = round(min(_bucket_upper(index), hist['max']), 4)
+                    break
+        stats['max'] = round(hist['max'], 4)
+        summary[name] = stats
+    return dict(sorted(summary.items(), key=lambda item: -item[1]['total']))
+
+
+def merge_reports(raws) -> dict:
+    merged = {}
+    for raw in raws:
+        for name, hist in raw.items():
+            into = merged.setdefault(name, {'buckets': {}, 'total': 0.0, 'max': 0.0})
+            for i, n in hist['buckets'].items():
+                into['buckets'][i] = into['buckets'].get(i, 0) + n
+            into['total'] += hist['total']
+            into['max'] = max(into['max'], hist['max'])
+    return merged
+
+
+def write_report(path, raw_by_source: dict):
+    """Write {'overall': summary, 'by_source': {source: summary}, 'raw': {...}} as JSON."""
+    report = {
+        'generated_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'overall': summarize(merge_reports(raw_by_source.values())),
+        'by_source': {source: summarize(raw) for source, raw in raw_by_source.items()},
+        'raw': raw_by_source,
+    }
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp, path)
+    return report
+
+
+def format_summary(summary) -> str:
+    lines = [f"{'phase':<18} {'count':>7} {'total s':>9} {'p50':>8} {'p95':>8} {'p99':>8}"]
+    for name, s in summary.items():
+        lines.append(f"{name:<18} {s['count']:>7} {s['total']:>9.1f} {s['p50']:>8.3f} {s['p95']:>8.3f} {s['p99']:>8.3f}")
+    return '\n'.join(lines)
+
+
+@contextmanager
+def profiled(label, directory=PROFILE_DIR):
+    """cProfile + tracemalloc around one unit of work; dumps <label>.prof and <label>.mem.txt."""
+    os.makedirs(directory, exist_ok=True)
+    stem = os.path.join(directory, re.sub(r'[^\w.-]+', '_', label).strip('_')[:60] or 'profile')
+    tracemalloc.start()
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        profiler.dump_stats(f"{stem}.prof")
+        with open(f"{stem}.mem.txt", 'w', encoding='utf-8') as f:
+            f.write(f"current {current / 1e6:.1f} MB, peak {peak / 1e6:.1f} MB\n\n")
+            for stat in snapshot.statistics('lineno')[:TRACEMALLOC_TOP]:
+                f.write(f"{stat}\n")
+        print(f"[INFO] Profile for '{label}' written to {stem}.prof and {stem}.mem.txt")
+
+
+TIMINGS = PhaseTimings()
+phase = TIMINGS.phase
@@ -0,0 +1,90 @@
+# Retry policy for scraper_bot2v1: error classes, attempt budgets and backoff
+#
+# Errors are sorted into retryable (timeouts, dropped connections, a browser
+# that crashed or hung), captcha (Google's unusual-traffic page) and fatal
+# (anything else, i.e. a bug that another attempt would only repeat). Each
+# operation has a fixed number of attempts with exponential backoff and
+# jitter: a site is retried in place while the browser is still healthy, and a
+# term whose attempt failed waits in the worker's RetryScheduler while the
+# worker goes on with the rest of the queue.
+
+import heapq
+import random
+import socket
+import time
+
+from selenium.common.exceptions import WebDriverException
+from urllib3.exceptions import HTTPError as Urllib3Error
+
+# ========== CONFIGURATION ==========
+SITE_ATTEMPTS = 2    # tries per site within one attempt at a term
+TERM_ATTEMPTS = 3    # attempts per term before it is marked failed
+BACKOFF_BASE = {'site': 2.0, 'term': 30.0}    # seconds before the first retry, doubled per attempt
+BACKOFF_MAX = {'site': 10.0, 'term': 600.0}
+
+RETRYABLE = 'retryable'
+CAPTCHA = 'captcha'
+FATAL = 'fatal'
+
+# TimeoutException, InvalidSessionIdException etc. are WebDriverExceptions; a
+# dead chromedriver surfaces as urllib3 or connection errors. Other OSErrors
+# (PermissionError, FileNotFoundError from profiles or checkpoints) are local
+# and would only fail again.
+RETRYABLE_ERRORS = (WebDriverException, Urllib3Error, ConnectionError, socket.timeout)
+
+
+class CaptchaDetected(Exception):
+    """Google answered the search with its unusual-traffic page."""
+
+
+def classify(exc) -> str:
+    if isinstance(exc, CaptchaDetected):
+        return CAPTCHA
+    if isinstance(exc, RETRYABLE_ERRORS):
+        return RETRYABLE
+    return FATAL
+
+
+def backoff(attempt, operation) -> float:
+    """Seconds to wait before retry number `attempt` (1-based) of 'site' or 'term'."""
+    delay = min(BACKOFF_MAX[operation], BACKOFF_BASE[operation] * 2 ** (attempt - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+class RetryScheduler:
+    """A worker's terms waiting for another attempt, soonest first."""
+
+    def __init__(self, max_attempts=TERM_ATTEMPTS):
+        self.max_attempts = max_attempts
+        self.attempts = {}
+        self._heap = []
+        self._seq = 0
+
+    def __len__(self):
+        return len(self._heap)
+
+    def failed(self, term, kind):
+        """Count a failed attempt; returns the delay term was rescheduled with, or None if it is out of attempts."""
+        n = self.attempts[term] = self.attempts.get(term, 0) + 1
+        if kind == FATAL or n >= self.max_attempts:
+            self.attempts.pop(term)
+            return None
+        delay = backoff(n, 'term')
+        heapq.heappush(self._heap, (time.monotonic() + delay, self._seq, term))
+        self._seq += 1
+        return delay
+
+    def succeeded(self, term):
+        self.attempts.pop(term, None)
+
+    def pop_due(self):
+        """The next term whose delay has passed, or None."""
+        if self._heap and self._heap[0][0] <= time.monotonic():
+            return heapq.heappop(self._heap)[2]
+        return None
+
+    def wait_time(self):
+        """Seconds until the next term is due (0 if one is due now); None if nothing is waiting."""
+        if not self._heap:
+            return None
+        return max(0.0, self._heap[0][0] - time.monotonic())
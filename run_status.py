@@ -0,0 +1,129 @@
+# Live run status for scraper_bot2v1: shared counters, /status endpoint, status file
+#
+# Each worker bumps its own slots in one shared array (no locks, no IPC round
+# trips: a worker is the only writer of its slots). The main process turns the
+# array into a JSON snapshot with per-worker rates, idle time and an ETA, serves
+# it at http://127.0.0.1:<port>/status and rewrites a status file periodically.
+
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing import Array
+
+FIELDS = ('terms_done', 'terms_failed', 'terms_retried', 'pages', 'leads', 'errors', 'sites_skipped', 'last_activity')
+STALL_SECONDS = 300  # a busy worker with no activity for this long is reported as stalled
+
+
+class RunStatus:
+    def __init__(self, num_workers, terms_total):
+        self.num_workers = num_workers
+        self.terms_total = terms_total
+        self.started_at = time.time()
+        self._values = Array('d', num_workers * len(FIELDS), lock=False)
+
+    def _slot(self, worker_id, field):
+        return (worker_id - 1) * len(FIELDS) + FIELDS.index(field)
+
+    def incr(self, worker_id, field, n=1):
+        """Called in the worker process; worker ids start at 1."""
+        self._values[self._slot(worker_id, field)] += n
+        self._values[self._slot(worker_id, 'last_activity')] = time.time()
+
+    def worker_counts(self, worker_id) -> dict:
+        base = (worker_id - 1) * len(FIELDS)
+        return {field: self._values[base + i] for i, field in enumerate(FIELDS)}
+
+    def snapshot(self) -> dict:
+        now = time.time()
+        minutes = max(now - self.started_at, 1e-9) / 60
+        workers = []
+        totals = dict.fromkeys(FIELDS[:-1], 0)
+        for worker_id in range(1, self.num_workers + 1):
+            counts = self.worker_counts(worker_id)
+            last = counts.pop('last_activity')
+            for field in totals:
+                totals[field] += int(counts[field])
+            idle = now - last if last else now - self.started_at
+            workers.append({
+                'worker_id': worker_id,
+                **{field: int(value) for field, value in counts.items()},
+                'pages_per_min': round(counts['pages'] / minutes, 2),
+                'leads_per_min': round(counts['leads'] / minutes, 2),
+                'idle_seconds': round(idle, 1),
+                'stalled': idle > STALL_SECONDS,
+            })
+        finished = totals['terms_done'] + totals['terms_failed']
+        pending = max(self.terms_total - finished, 0)
+        terms_per_min = finished / minutes
+        eta = pending / terms_per_min * 60 if terms_per_min > 0 else None
+        return {
+            'updated_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'elapsed_seconds': round(now - self.started_at, 1),
+            'terms_total': self.terms_total,
+            'terms_pending': pending,
+            **totals,
+            'terms_per_min': round(terms_per_min, 2),
+            'pages_per_min': round(totals['pages'] / minutes, 2),
+            'leads_per_min': round(totals['leads'] / minutes, 2),
+            'eta_seconds': round(eta) if eta is not None else None,
+            'workers': workers,
+        }
+
+    def summary_line(self) -> str:
+        snap = self.snapshot()
+        eta = f"{snap['eta_seconds'] / 60:.0f}m" if snap['eta_seconds'] is not None else '?'
+        stalled = [w['worker_id'] for w in snap['workers'] if w['stalled']]
+        line = (f"[Status] {snap['terms_done']}/{snap['terms_total']} terms, {snap['terms_failed']} failed, "
+                f"{snap['terms_retried']} retried, "
+                f"{snap['pages']} pages ({snap['pages_per_min']}/min), {snap['leads']} leads "
+                f"({snap['leads_per_min']}/min), {snap['errors']} errors, ETA {eta}")
+        if stalled:
+            line += f", stalled workers: {stalled}"
+        return line
+
+    def write_file(self, path):
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp, path)
+
+    def serve(self, port, host='127.0.0.1'):
+        """Serve GET /status in a daemon thread; returns the server (or None if the port is taken)."""
+        status = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip('/') != '/status':
+                    self.send_error(404)
+                    return
+                body = json.dumps(status.snapshot(), indent=2).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # keep the run log readable
+
+        try:
+            server = ThreadingHTTPServer((host, port), Handler)
+        except OSError as e:
+            print(f"[WARN] Status endpoint disabled, could not bind {host}:{port}: {e}")
+            return None
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"[INFO] Live status at http://{host}:{port}/status")
+        return server
+
+
+def report_status(status, path, interval, stop_event):
+    """Rewrite the status file and print a summary line every interval seconds until stop_event."""
+    while not stop_event.wait(interval):
+        try:
+            status.write_file(path)
+            print(status.summary_line(), flush=True)
+        except Exception as e:
+            print(f"[Status] Error: {e}")
+    status.write_file(path)
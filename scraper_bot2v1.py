@@ -1,34 +1,80 @@
 # FDW Email scraper using Selenium (Visible Browser, Reliable Navigation & CAPTCHA Handling)
 
 import undetected_chromedriver as uc
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.common.exceptions import TimeoutException, WebDriverException
-from multiprocessing import Process
+from multiprocessing import Process, Queue
 import undetected_chromedriver as uc
-import pandas as pd
 import time
 import random
 import re
+import json
 import sys
 import glob
 import os
 import signal
 import sys
-from urllib.parse import urlparse
+import argparse
+import threading
+import sqlite3
+from queue import Empty
+from urllib.parse import urlparse, urlencode
 from datetime import datetime, timedelta
 from multiprocessing import Event
+
+import lead_extractor
+import merge_outputs
+import yield_report
+import page_fetcher
+from browser_pool import BrowserPool
+from completion_index import CompletionIndex, normalize_term, parse_since
+from checkpoint_store import CheckpointStore, lead, lead_rows
+from retry_policy import (CAPTCHA, FATAL, RETRYABLE, SITE_ATTEMPTS, CaptchaDetected, RetryScheduler,
+                          backoff, classify)
+from domains import DomainMatcher, base_domain
+from serp_parser import parse_serp
+from subpage_crawler import crawl_subpages
+from term_source import TermSource
+from page_cache import PageCache
+from page_waits import PacingPolicy, WAIT_STATS, wait_until
+import lean_browser
+from visited_store import VisitedStore
+from run_status import RunStatus, report_status
+from phase_timings import TIMINGS, phase, profiled, write_report, format_summary
+
 terminate_event = Event()
 
 # ========== CONFIGURATION ==========
-INPUT_EXCEL = 'Book1.xlsx'
+INPUT_EXCEL = 'Book1.xlsx'  # first column: company names (.xlsx, .csv or .parquet)
 OUTPUT_EXCEL = 'rename_Contacts_Emails.xlsx'
+OUTPUT_PARQUET = 'rename_Contacts_Emails.parquet'  # all merged contacts, beyond Excel's row limit too; None to skip
+YIELD_REPORT = 'yield_report.json'  # leads and cost per term, domain, worker and page type (+ .html next to it)
+SEARCH_BASE_URL = os.environ.get('SEARCH_BASE_URL', 'https://www.google.com/search')  # point at a local fixture server to benchmark
 DELAY_RANGE = (5, 10)
 LONG_BREAK_SEARCH_RANGE = (15, 20)
 LONG_BREAK_DURATION_RANGE = (60, 240)
 RECAPTCHA_SLEEP_RANGE = (600, 1200)  # backoff when CAPTCHA detected
 PAGE_READY_TIMEOUT = 10
 PAGE_LOAD_TIMEOUT = 20
+NETWORK_IDLE_MS = 500  # page counts as settled once no request has finished for this long
+SERP_RESULTS_SELECTOR = 'div.g, div.yuRUbf, cite'
+# Deliberate human-like pauses on Google, in seconds; page readiness is waited for separately
+PACING = PacingPolicy({
+    'after_serp': (1.0, 2.5),
+})
+HTTP_FIRST = True  # try a plain HTTP fetch before navigating Chrome to company pages
+NUM_WORKERS = 3  # default browser worker processes; override with --workers
+INDEX_JOB = 'scraper'  # key for this script's rows in the completion index
+LEAN_BROWSER = True  # block images/fonts/media/trackers and use eager page loads (see lean_browser.py)
+HEADLESS = False  # the same Chrome runs the Google searches, which challenge headless Chrome far more often
+VISITED_PATH = 'visited_urls.sqlite'  # sites/URLs claimed by workers this run
+STATUS_PORT = 8787  # live JSON at http://127.0.0.1:8787/status; 0 disables; override with --status-port
+STATUS_FILE = 'run_status.json'  # same JSON, rewritten every STATUS_INTERVAL seconds
+STATUS_INTERVAL = 30
+TIMINGS_REPORT = 'timings_report.json'  # per-phase p50/p95/p99 for the whole run, per worker and overall
+BROWSER_PROFILE_DIR = 'chrome_profiles'  # persistent per-worker Chrome profiles (keeps the HTTP cache warm)
+PAGE_CACHE_DIR = 'page_cache'  # shared on-disk cache of company pages; None disables it
+PAGE_CACHE_TTL = 7 * 24 * 3600  # seconds before a cached page is revalidated
+PAGE_CACHE_MAX_BYTES = 2 * 1024 ** 3  # least recently used pages are evicted past this
 
 # Domains to skip
 SEARCH_RESULT_BLACKLIST = [
@@ -38,110 +84,137 @@ SEARCH_RESULT_BLACKLIST = [
 ]
 EMAIL_BLACKLIST_DOMAINS = SEARCH_RESULT_BLACKLIST.copy()
 
+# News/social/listing sites that never carry the company's own contacts
+CONTENT_BLACKLIST = [
+    'vulcanpost.com', 'timeout.com', 'mustsharenews.com', 'thehoneycombers.com',
+    'sethlui.com', 'todayonline.com', 'mothership.sg', 'straitstimes.com',
+    'tripadvisor.com', 'facebook.com', 'tiktok.com', 'wikipedia.org', 'fairprice.com.sg'
+]
+
+# Suffix-trie matchers over the lists above; rebuilt by load_blacklists()
+SEARCH_BLACKLIST_MATCHER = DomainMatcher(SEARCH_RESULT_BLACKLIST + CONTENT_BLACKLIST)
+EMAIL_BLACKLIST_MATCHER = DomainMatcher(EMAIL_BLACKLIST_DOMAINS)
+
 import openpyxl
 
-def save_checkpoint(local_results, local_skipped, worker_id):
-    filename = f"worker_output_{worker_id}.xlsx"
-    if not local_results and not local_skipped:
+_checkpoint_stores = {}
+_page_cache = None
+_output_dir = '.'  # this run's worker_outputs/<run id>/, set in worker_run
+_run_status = None  # (RunStatus, worker_id) inside a worker process
+
+def record(field, n=1):
+    """Bump this worker's live status counter (see run_status.FIELDS)."""
+    if _run_status is not None:
+        status, worker_id = _run_status
+        status.incr(worker_id, field, n)
+
+def get_page_cache():
+    global _page_cache
+    if _page_cache is None and PAGE_CACHE_DIR:
+        _page_cache = PageCache(PAGE_CACHE_DIR, PAGE_CACHE_TTL, PAGE_CACHE_MAX_BYTES)
+    return _page_cache
+
+def get_checkpoint_store(worker_id):
+    store = _checkpoint_stores.get(worker_id)
+    if store is None:
+        store = CheckpointStore(merge_outputs.worker_store_path(_output_dir, worker_id), worker_id)
+        _checkpoint_stores[worker_id] = store
+    return store
+
+def save_checkpoint(local_results, local_skipped, worker_id, search_term=None):
+    """Store new rows; with search_term, local_results replace every row saved for that term before."""
+    if not local_results and not local_skipped and search_term is None:
         return  # Nothing new to save
 
     try:
-        # Read existing contacts
-        if os.path.exists(filename):
-            try:
-                contacts_df = pd.read_excel(filename, sheet_name="Contacts")
-            except:
-                contacts_df = pd.DataFrame()
-            try:
-                skipped_df = pd.read_excel(filename, sheet_name="Skipped URL")
-            except:
-                skipped_df = pd.DataFrame()
-        else:
-            contacts_df = pd.DataFrame()
-            skipped_df = pd.DataFrame()
+        # Duplicates are dropped by the store's unique indexes on insert
+        skipped = local_skipped[:]
+        with phase('checkpoint_save'):
+            store = get_checkpoint_store(worker_id)
+            if search_term is None:
+                new_contacts = store.add_contacts(local_results)
+            else:
+                new_contacts = store.replace_contacts(search_term, local_results)
+            new_skipped = store.add_skipped(skipped)
+        del local_skipped[:len(skipped)]  # stored; later entries go with the next save
+        print(f"[Worker {worker_id}] Saved {new_contacts} new results, {new_skipped} new skipped entries to {store.path}")
 
-        # Combine and deduplicate
-        all_contacts = pd.concat([contacts_df, pd.DataFrame(local_results)], ignore_index=True).drop_duplicates()
-        all_skipped = pd.concat([skipped_df, pd.DataFrame(local_skipped)], ignore_index=True).drop_duplicates()
+    except Exception as e:
+        print(f"[Worker {worker_id}] Failed to save: {e}")
 
-        with pd.ExcelWriter(filename, engine='openpyxl', mode='w') as writer:
-            if not all_contacts.empty:
-                all_contacts.to_excel(writer, sheet_name="Contacts", index=False)
-            if not all_skipped.empty:
-                all_skipped.to_excel(writer, sheet_name="Skipped URL", index=False)
+def log_page(worker_id, search_term, query, url, page_type, source, elapsed, new_emails, new_contacts, address):
+    """Record what one page visit cost and found (see yield_report.py)."""
+    if worker_id is None:
+        return
+    try:
+        get_checkpoint_store(worker_id).add_page(search_term, query, url, page_type, source, elapsed,
+                                                 new_emails, new_contacts, address)
+    except Exception as e:
+        print(f"[Worker {worker_id}] Failed to log page: {e}")
 
-        print(f"[Worker {worker_id}] Saved results to {filename}")
-        print(f"[Worker {worker_id}] Saving {len(all_contacts)} results, {len(all_skipped)} skipped entries")
+def search_query(name):
+    return re.sub(r"Pte\.? Ltd\.?|Limited", "", name, flags=re.I).strip()
 
-    except Exception as e:
-        print(f"[Worker {worker_id}] Failed to save: {e}")
+def process_company(name, local_skipped, worker_id, visited, pool):
+
+    """Process a single company and return its results.
 
-def process_company(name, local_skipped, worker_id, visited_websites_set):
-
-    """Process a single company and return its results"""
-    all_rows = []
-
-    def save_callback(domain_data):
-        # Capture rows for return
-        for domain, data in domain_data.items():
-            urls = list(sorted(data['urls']))
-            emails = list(sorted(data['emails']))
-            contacts = list(sorted(data['contacts']))
-            addresses = list(sorted(data['addresses']))
-            max_len = max(len(urls), len(emails), len(contacts), len(addresses))
-            for i in range(max_len):
-                row = {
-                    'Search Term': name if i == 0 else '',
-                    'Company Name': (
-                        data.get('company_name', extract_company_name_from_url(urls[i]))
-                        if i == 0 and i < len(urls) and urls[i]
-                        else ''
-                    ),
-                    'Website': urls[i] if i < len(urls) else '',
-                    'Emails': emails[i] if i < len(emails) else '',
-                    'Contacts': contacts[i] if i < len(contacts) else '',
-                    'Address': addresses[i] if i < len(addresses) else ''
-                }
-                all_rows.append(row)
-
-        # Save with new rows
-        save_checkpoint(all_rows, local_skipped, worker_id)
-
-    # Set up driver for this company
-    driver = setup_driver()
+    Errors are raised for worker_run to classify: retryable ones (and CAPTCHAs)
+    go to the worker's retry scheduler, fatal ones mark the term failed. Whatever
+    this attempt found is already stored as leads and counts towards the rows of
+    the attempt that finishes the term (see finish_company).
+    """
+    def save_callback(leads):
+        # Only facts the crawl has not reported before arrive here; persist just those
+        try:
+            with phase('checkpoint_save'):
+                get_checkpoint_store(worker_id).add_leads(name, leads)
+        except Exception as e:
+            print(f"[Worker {worker_id}] Failed to save leads: {e}")
+
+    # Reuse the worker's browser; the pool replaces it if it has died
+    driver = pool.acquire()
+    start = time.time()
+    base = search_query(name)
 
     try:
         print(f"{timestamp()} Processing: {name}")
-        base = re.sub(r"Pte\.? Ltd\.?|Limited", "", name, flags=re.I).strip()
         driver, visited, domain_data = google_search_and_navigate(
             driver, f"{base}", local_skipped,
-            save_callback=save_callback, visited_sites=visited_websites_set, worker_id=worker_id
+            save_callback=save_callback, visited=visited, worker_id=worker_id, search_term=name
         )
 
-    except Exception as e:
-        print(f"[ERROR] Error processing company {name}: {e}")
-
     finally:
-        try:
-            driver.quit()
-        except:
-            pass
+        # Clears cookies/storage/tabs for the next company (or replaces a broken driver)
+        pool.release(driver)
 
+    return finish_company(name, local_skipped, worker_id, time.time() - start)
+
+def finish_company(name, local_skipped, worker_id, elapsed):
+    """Assemble name's contact rows once, from every lead stored for it, and log the term."""
+    store = get_checkpoint_store(worker_id)
+    all_rows = lead_rows(name, store.lead_facts(name))
+    save_checkpoint(all_rows, local_skipped, worker_id, search_term=name)
+    try:
+        store.add_term(name, search_query(name), elapsed)
+    except Exception as e:
+        print(f"[Worker {worker_id}] Failed to log term: {e}")
     print(f"[DEBUG] Returning {len(all_rows)} rows for '{name}'")
     return all_rows
 
 
-# Load additional blacklist sheets if present
-def load_blacklists():
-    global SEARCH_RESULT_BLACKLIST, EMAIL_BLACKLIST_DOMAINS
+# Load additional blacklist sheets if present (from the already open input workbook)
+def load_blacklists(source):
+    global SEARCH_RESULT_BLACKLIST, EMAIL_BLACKLIST_DOMAINS, SEARCH_BLACKLIST_MATCHER, EMAIL_BLACKLIST_MATCHER
     try:
-        sheets = pd.read_excel(INPUT_EXCEL, sheet_name=['SearchBlacklist','EmailBlacklist'])
-        sb = sheets.get('SearchBlacklist', pd.DataFrame())
-        eb = sheets.get('EmailBlacklist', pd.DataFrame())
-        if not sb.empty:
-            SEARCH_RESULT_BLACKLIST = sb.iloc[:, 0].dropna().astype(str).tolist()
-        if not eb.empty:
-            EMAIL_BLACKLIST_DOMAINS = eb.iloc[:, 0].dropna().astype(str).tolist()
+        sb = source.sheet_column('SearchBlacklist')
+        eb = source.sheet_column('EmailBlacklist')
+        if sb:
+            SEARCH_RESULT_BLACKLIST = sb
+        if eb:
+            EMAIL_BLACKLIST_DOMAINS = eb
+        SEARCH_BLACKLIST_MATCHER = DomainMatcher(SEARCH_RESULT_BLACKLIST + CONTENT_BLACKLIST)
+        EMAIL_BLACKLIST_MATCHER = DomainMatcher(EMAIL_BLACKLIST_DOMAINS)
         print(f"[INFO] Loaded {len(SEARCH_RESULT_BLACKLIST)} search blacklist entries and {len(EMAIL_BLACKLIST_DOMAINS)} email blacklist entries from Excel")
     except Exception as e:
         print(f"[WARN] Blacklist load failed: {e}")
@@ -160,42 +233,44 @@ def countdown_timer(seconds):
         seconds -= 1
     print(f"\rWait complete at {timestamp()}")
 
-def monitor_visited_sites(visited_sites, interval=5):
-    from urllib.parse import urlparse
-    seen_domains = set()
-    while not terminate_event.is_set():
-        try:
-            current_domains = {
-                urlparse(url).netloc.lower().replace("www.", "")
-                for url in visited_sites if url
-            }
-            new_domains = current_domains - seen_domains
-            if new_domains:
-                print(f"\n[Monitor] 🧭 Total Unique Domains Visited: {len(current_domains)}", flush=True)
-                seen_domains = current_domains
-            time.sleep(interval)
-        except Exception as e:
-            print(f"\n[Monitor] Error: {e}")
-            continue
+def report_progress(progress_queue, status):
+    # status.terms_total keeps growing while the input is still being streamed
+    done = 0
+    start = time.time()
+    while True:
+        item = progress_queue.get()
+        if item is None:
+            break
+        done += 1
+        rate = done / max(time.time() - start, 1e-9) * 60
+        print(f"[Main] ✔ {done}/{status.terms_total} done — '{item['name']}' by worker {item['worker_id']} "
+              f"({item['rows']} rows, {item['elapsed']:.1f}s) — {rate:.1f} names/min", flush=True)
 
 # Browser setup
-def setup_driver():
+def setup_driver(user_data_dir=None):
     options = uc.ChromeOptions()
+    if user_data_dir:
+        options.add_argument(f'--user-data-dir={os.path.abspath(user_data_dir)}')
     options.add_argument('--no-sandbox')
     options.add_argument('--disable-dev-shm-usage')
     options.add_argument('--disable-gpu')
+    if LEAN_BROWSER:
+        lean_browser.apply_lean_options(options, headless=HEADLESS)
     uc.Chrome.__del__ = lambda self: None  # prevent shutdown errors
-    driver = uc.Chrome(options=options)  # auto-detect latest Chrome
-    driver.maximize_window()
+    with phase('driver_startup'):
+        driver = uc.Chrome(options=options)  # auto-detect latest Chrome
+        if LEAN_BROWSER:
+            lean_browser.block_requests(driver)
+        else:
+            driver.maximize_window()
     return driver
 
 # Navigation safety
-def wait_ready(driver, timeout=PAGE_READY_TIMEOUT):
-    try:
-        WebDriverWait(driver, timeout).until(lambda d: d.execute_script('return document.readyState') == 'complete')
-    except TimeoutException:
-        print(f"[WARN] {timestamp()} page load timed out")
-    time.sleep(random.uniform(0.5, 1.5))
+def wait_ready(driver, timeout=PAGE_READY_TIMEOUT, selector=None, kind='page_ready'):
+    """Wait until the page is loaded, shows text (or selector) and the network is idle."""
+    if not wait_until(driver, timeout, selector=selector, min_text_chars=0 if selector else 1,
+                      idle_ms=NETWORK_IDLE_MS, interactive=LEAN_BROWSER, kind=kind):
+        print(f"[WARN] {timestamp()} page not ready after {timeout}s")
 
 def safe_get(driver, url, local_skipped):
     try:
@@ -214,9 +289,11 @@ def safe_get(driver, url, local_skipped):
     return driver
 
 # CAPTCHA detection
-def detect_google_captcha(driver):
+def detect_google_captcha(driver, html=None):
     try:
-        return 'our systems have detected unusual traffic' in driver.page_source.lower()
+        if html is None:
+            html = driver.page_source
+        return 'our systems have detected unusual traffic' in html.lower()
     except:
         return False
 
@@ -230,343 +307,374 @@ def extract_company_name_from_url(url):
     except:
         return ''
 
-# Extraction: emails, contacts, address
-def extract_emails(driver, current_url=None, local_skipped=None):
-    emails = set()
+# Page snapshot: everything the extractors need, in one browser round trip
+PAGE_SNAPSHOT_SCRIPT = """
+const hrefs = (sel) => Array.from(document.querySelectorAll(sel), a => a.href || a.getAttribute('href') || '');
+const address = document.querySelector('address');
+return {
+    text: document.body ? document.body.innerText : '',
+    html: document.documentElement ? document.documentElement.outerHTML : '',
+    mailto: hrefs("a[href*='mailto:']"),
+    tel: hrefs("a[href*='tel:']"),
+    address: address ? address.innerText : '',
+    links: hrefs('a[href]')
+};
+"""
+
+def take_page_snapshot(driver, current_url=None, local_skipped=None):
     try:
-        # Extract from mailto
-        for a in driver.find_elements(By.XPATH, "//a[contains(@href,'mailto:')]"):
-            href = a.get_attribute('href')
-            if href:
-                email = href.split(':', 1)[1].split('?')[0].strip()
-                if re.match(r"^[\w\.-]+@[\w\.-]+\.[a-zA-Z]{2,}$", email):
-                    emails.add(email)
-
-        # Extract from text and HTML
-        try:
-            text = driver.execute_script('return document.body.innerText')
-            html = driver.page_source
-        except Exception as e:
-            if "timeout" in str(e).lower():
-                print(f"[WARN] {timestamp()} Page render timeout for {current_url}")
-                if current_url and local_skipped is not None:
-                    local_skipped.append({"URL": current_url, "Reason": "Page render timeout"})
-                return []
-            raise  # Re-raise if it's not a timeout error
-
-        candidates = set(re.findall(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}", text + html))
-
-        for e in candidates:
-            # Skip static files and encoded links
-            if re.search(r"\.(jpg|jpeg|png|gif|svg|webp|css|js|woff|ico)(\?|$)", e, re.IGNORECASE):
-                continue
-            if "%" in e or ".." in e:
-                continue
-            if not re.match(r"^[\w\.-]+@[\w\.-]+\.[a-zA-Z]{2,}$", e):
-                continue
-            emails.add(e)
-
-        # Final filter: remove blacklisted domains
-        filtered = {
-            e for e in emails
-            if not any(bad in e.split('@')[-1].lower() for bad in EMAIL_BLACKLIST_DOMAINS)
-        }
-
-        return sorted(filtered)
-
+        snapshot = driver.execute_script(PAGE_SNAPSHOT_SCRIPT) or {}
     except Exception as e:
-        print(f"[WARN] email extraction error: {e}")
+        if "timeout" in str(e).lower():
+            print(f"[WARN] {timestamp()} Page render timeout for {current_url}")
+            reason = "Page render timeout"
+        else:
+            print(f"[WARN] {timestamp()} page snapshot error: {e}")
+            reason = f"Page snapshot error: {e}"
         if current_url and local_skipped is not None:
-            local_skipped.append({"URL": current_url, "Reason": f"Email extraction error: {e}"})
-        return []
-
-def extract_contacts(driver):
-    contacts = set()
+            local_skipped.append({"URL": current_url, "Reason": reason})
+        return None
+    return {
+        'text': snapshot.get('text') or '',
+        'html': snapshot.get('html') or '',
+        'mailto': [h for h in snapshot.get('mailto') or [] if h],
+        'tel': [h for h in snapshot.get('tel') or [] if h],
+        'address': snapshot.get('address') or '',
+        'links': [h for h in snapshot.get('links') or [] if h],
+        'source': 'browser',
+    }
+
+def fetch_page(driver, url, local_skipped, http=True):
+    """Snapshot url from the page cache, over plain HTTP if possible, otherwise through the browser."""
+    cache = get_page_cache()
+    if cache is not None:
+        snapshot = cache.get_fresh(url)
+        if snapshot is not None:
+            return driver, snapshot
+    if http and HTTP_FIRST:
+        with phase('http_fetch'):
+            snapshot = page_fetcher.fetch_snapshot(url, cache=cache)
+        if snapshot is not None:
+            return driver, snapshot
+    with phase('site_navigation'):
+        driver = safe_get(driver, url, local_skipped)
+    wait_ready(driver)
+    with phase('page_snapshot'):
+        snapshot = take_page_snapshot(driver, url, local_skipped)
+    if snapshot is not None and cache is not None:
+        cache.save(url, snapshot)
+    return driver, snapshot
+
+# Extraction: emails, contacts, address in one pass over the page snapshot
+def extract_leads(snapshot, current_url=None, local_skipped=None):
+    if snapshot and snapshot.get('leads') is not None:
+        # Page unchanged since it was cached; the blacklist may have changed since
+        leads = snapshot['leads']
+        emails = [e for e in leads['emails'] if e not in EMAIL_BLACKLIST_MATCHER]
+        return emails, leads['contacts'], leads['address']
     try:
-        for a in driver.find_elements(By.XPATH, "//a[contains(@href,'tel:')]"):
-            href = a.get_attribute('href')
-            if href: contacts.add(href.split(':',1)[1].strip())
-        if not contacts:
-            text = driver.execute_script('return document.body.innerText')
-            contacts.update(re.findall(r"(?:\+65\s?)?[689]\d{3}[-\s]?\d{4}", text))
-    except:
-        pass
-    return list(contacts)
-
-def extract_address(driver):
-    try:
-        elems = driver.find_elements(By.TAG_NAME,'address')
-        if elems: return elems[0].text.strip()
-    except:
-        pass
-    try:
-        text = driver.execute_script('return document.body.innerText')
-        for line in text.splitlines():
-            if re.search(r"\b\d{6}\b", line): return line.strip()
-        for line in text.splitlines():
-            if 'Singapore' in line: return line.strip()
-    except:
-        pass
-    return ''
+        with phase('extraction'):
+            leads = lead_extractor.extract_leads(snapshot, EMAIL_BLACKLIST_MATCHER)
+    except Exception as e:
+        print(f"[WARN] lead extraction error: {e}")
+        if current_url and local_skipped is not None:
+            local_skipped.append({"URL": current_url, "Reason": f"Lead extraction error: {e}"})
+        return [], [], ''
+    cache = get_page_cache()
+    if snapshot and current_url and cache is not None:
+        cache.store_leads(current_url, leads)
+    return leads['emails'], leads['contacts'], leads['address']
 
 def extract_company_name_from_google_result(driver, target_url):
     base_target = get_base_domain(target_url)
-    
-    # 1. Try right-hand Google knowledge panel (sidebar)
     try:
-        ca5rn_blocks = driver.find_elements(By.CSS_SELECTOR, 'div.CA5RN')
-        for block in ca5rn_blocks:
-            try:
-                cite = block.find_element(By.CSS_SELECTOR, 'cite').text.strip()
-                if get_base_domain(cite) == base_target:
-                    name_elem = block.find_element(By.CSS_SELECTOR, 'span.VuuXrf')
-                    if name_elem:
-                        return name_elem.text.strip()
-            except:
-                continue
-    except Exception as e:
-        print(f"[WARN] Sidebar CA5RN check failed for {target_url}: {e}")
-
-    # 2. Fallback: Main search result match
-    try:
-        boxes = driver.find_elements(By.CSS_SELECTOR, 'div.yuRUbf')
-        for box in boxes:
-            try:
-                a_tag = box.find_element(By.CSS_SELECTOR, 'a')
-                href = a_tag.get_attribute('href')
-                if href and get_base_domain(href) == base_target:
-                    try:
-                        name_elem = box.find_element(By.XPATH, ".//ancestor::div[contains(@class, 'tF2Cxc')]//span[contains(@class, 'VuuXrf')]")
-                        if name_elem:
-                            return name_elem.text.strip()
-                    except:
-                        pass
-            except:
-                continue
+        for result in parse_serp(driver.page_source):
+            if result.company_name and get_base_domain(result.url) == base_target:
+                return result.company_name
     except Exception as e:
-        print(f"[WARN] Main results check failed for {target_url}: {e}")
-
+        print(f"[WARN] Results page check failed for {target_url}: {e}")
     return ''
 
 def get_base_domain(url):
-    try:
-        return urlparse(url).netloc.lower().replace("www.", "")
-    except:
-        return ""
-
-# Core navigation with retry
-def google_search_and_navigate(driver, query, local_skipped, save_callback=None, visited_sites=None, worker_id=None):
-    try:
-        raw_urls = []
-        visited_domains = set()
-        visit_counter = 0
-        domain_data = {}
-
-        page = 0
-        # max_empty_pages = 2
-        # empty_page_count = 0
-
-        for page in range(1):
-            start = page * 10
-            google_url = f"https://www.google.com/search?q={query}&start={start}"
-            print(f"{timestamp()} [Worker {worker_id}] loading Google page {page + 1}: {google_url}")
+    return base_domain(url)
+
+def merge_leads(data, domain, url, emails=(), contacts=(), addr='', company_name=''):
+    """Fold one page's findings into data (a domain_data entry); returns lead() records for the new ones only."""
+    fresh = []
+    for kind, key, values in (('company_name', 'names', [company_name] if company_name else []),
+                              ('url', 'urls', [url]), ('email', 'emails', emails),
+                              ('contact', 'contacts', contacts), ('address', 'addresses', [addr] if addr else [])):
+        for value in values:
+            if value not in data[key]:
+                data[key].add(value)
+                fresh.append(lead(domain, kind, value, url))
+    return fresh
+
+# Core navigation; retries are bounded (retry_policy)
+def google_search_and_navigate(driver, query, local_skipped, save_callback=None, visited=None, worker_id=None,
+                               search_term=None):
+    """Search query and crawl its top results with driver.
+
+    Raises CaptchaDetected, or the error that broke the browser, for the caller
+    to retry the whole term later; a site that keeps failing while the browser
+    is fine is retried SITE_ATTEMPTS times and then skipped. Pages are logged
+    under search_term (the input name query was made from), default query.
+    """
+    search_term = search_term or query
+    raw_urls = []
+    visited_domains = set()
+    visit_counter = 0
+    domain_data = {}
+
+    page = 0
+    # max_empty_pages = 2
+    # empty_page_count = 0
+
+    for page in range(1):
+        start = page * 10
+        google_url = f"{SEARCH_BASE_URL}?{urlencode({'q': query, 'start': start})}"
+        print(f"{timestamp()} [Worker {worker_id}] loading Google page {page + 1}: {google_url}")
+        with phase('serp_load'):
             driver = safe_get(driver, google_url, local_skipped)
-            wait_ready(driver)
-
-            # 🆕 Extract company names from Google result blocks before navigation
-            company_names_by_domain = {}
+        wait_ready(driver, selector=SERP_RESULTS_SELECTOR, kind='serp_results')
 
+        # 🆕 Parse the results page once, offline, before navigation
+        with phase('serp_parse'):
             try:
-                result_blocks = driver.find_elements(By.CSS_SELECTOR, 'div.CA5RN')
-                for block in result_blocks:
-                    try:
-                        cite_elem = block.find_element(By.CSS_SELECTOR, 'cite')
-                        name_elem = block.find_element(By.CSS_SELECTOR, 'span.VuuXrf')
-                        if cite_elem and name_elem:
-                            href = cite_elem.text.strip().split('›')[0].strip()  # get left side of the ›
-                            domain = get_base_domain(href)
-                            name = name_elem.text.strip()
-                            if domain and name:
-                                company_names_by_domain[domain] = name
-                                print(f"[DEBUG] 🏷️ Preloaded company name '{name}' for {domain}")
-                    except:
-                        continue
+                serp_html = driver.page_source
             except Exception as e:
-                print(f"[WARN] Couldn't parse CA5RN blocks: {e}")
-
-            if detect_google_captcha(driver):
-                sl = random.randint(*RECAPTCHA_SLEEP_RANGE)
-                print(f"[INFO] {timestamp()} captcha detected, sleeping {sl}s")
-                countdown_timer(sl)
-                try:
-                    driver.quit()
-                except:
-                    pass
-                return google_search_and_navigate(setup_driver(), query, local_skipped, save_callback)
-
-            try:
-                driver.execute_script("document.querySelectorAll('.sfbg, .S3Uucc, [aria-modal]').forEach(el => el.remove());")
-            except Exception as e:
-                print(f"[WARN] {timestamp()} failed to remove overlays: {e}")
-
-            elems = driver.find_elements(By.CSS_SELECTOR, 'div.yuRUbf a')
-            page_urls = [e.get_attribute('href') for e in elems if e.is_displayed()][:3]  # Only take first 3
-            
-            # if not page_urls:
-            #     empty_page_count += 1
-            #     if empty_page_count >= max_empty_pages:
-            #         print(f"[INFO] No more results after page {page + 1}. Exiting loop.")
-            #         break
-            # else:
-            #     empty_page_count = 0
-            raw_urls.extend(page_urls)
-
-            page += 1
-            time.sleep(random.uniform(1.0, 2.5))
-
-        content_blacklist = [
-            'vulcanpost.com', 'timeout.com', 'mustsharenews.com', 'thehoneycombers.com',
-            'sethlui.com', 'todayonline.com', 'mothership.sg', 'straitstimes.com',
-            'tripadvisor.com', 'facebook.com', 'tiktok.com', 'wikipedia.org', 'fairprice.com.sg'
-        ]
-        company_keywords = query.lower().split()
-
-        valid_urls = [
-            u for u in raw_urls
-            if u and not any(b in u for b in SEARCH_RESULT_BLACKLIST + content_blacklist)
-        ]
-
-        def score_domain(u):
-            domain = get_base_domain(u)
-            return 0 if any(k in domain for k in company_keywords) else 1
-
-        valid_urls.sort(key=score_domain)
-
-        for url in valid_urls:
-            domain = get_base_domain(url)
-            if visited_sites is not None:
-                visited_sites.append(url)
-
-            if domain not in domain_data:
-                domain_data[domain] = {
-                    'urls': set(),
-                    'emails': set(),
-                    'contacts': set(),
-                    'addresses': set()
-                }
-
-            print(f"{timestamp()} navigating to {url}")
-            start_time = time.time()
-            driver = safe_get(driver, url, local_skipped)
-            wait_ready(driver)
-            elapsed = time.time() - start_time
-
-            visit_counter += 1
-            print(f"[VISITED #{visit_counter}] {url}")
-
-            domain_data[domain]['urls'].add(url)
-
-            # 🆕 Extract company name from Google result (only if not already set)
-            if 'company_name' not in domain_data[domain] and domain in company_names_by_domain:
+                print(f"[WARN] {timestamp()} couldn't read results page: {e}")
+                serp_html = ''
+            serp_results = parse_serp(serp_html)
+
+        company_names_by_domain = {}
+        for result in serp_results:
+            if result.display_domain and result.company_name:
+                company_names_by_domain.setdefault(result.display_domain, result.company_name)
+                print(f"[DEBUG] 🏷️ Preloaded company name '{result.company_name}' for {result.display_domain}")
+
+        if detect_google_captcha(driver, serp_html or None):
+            raise CaptchaDetected(query)
+
+        page_urls = [r.url for r in serp_results][:3]  # Only take first 3
+
+        # if not page_urls:
+        #     empty_page_count += 1
+        #     if empty_page_count >= max_empty_pages:
+        #         print(f"[INFO] No more results after page {page + 1}. Exiting loop.")
+        #         break
+        # else:
+        #     empty_page_count = 0
+        raw_urls.extend(page_urls)
+
+        page += 1
+        PACING.pause('after_serp')
+
+    company_keywords = query.lower().split()
+
+    valid_urls = [
+        u for u in raw_urls
+        if u and u not in SEARCH_BLACKLIST_MATCHER
+    ]
+
+    def score_domain(u):
+        domain = get_base_domain(u)
+        return 0 if any(k in domain for k in company_keywords) else 1
+
+    valid_urls.sort(key=score_domain)
+
+    def crawl_site(driver, url, domain):
+        nonlocal visit_counter
+        if domain not in domain_data:
+            domain_data[domain] = {
+                'names': set(),
+                'urls': set(),
+                'emails': set(),
+                'contacts': set(),
+                'addresses': set(),
+                'served_by': {}  # url -> 'http' or 'browser'
+            }
+            # 🆕 Company name from the Google result, else from the domain itself
+            if domain in company_names_by_domain:
                 domain_data[domain]['company_name'] = company_names_by_domain[domain]
                 print(f"[DEBUG] 🏷️ Retrieved from CA5RN preload: {domain_data[domain]['company_name']} for {domain}")
 
-            emails = extract_emails(driver, url, local_skipped)
-            contacts = extract_contacts(driver)
-            addr = extract_address(driver)
+        print(f"{timestamp()} navigating to {url}")
+        start_time = time.time()
+        driver, snapshot = fetch_page(driver, url, local_skipped)
+        elapsed = time.time() - start_time
 
-            print(f"[INFO] Emails: {emails}")
-            print(f"[INFO] Contacts: {contacts}")
-            print(f"[INFO] Address: {addr}")
-            total_leads = len(emails) + len(contacts)
-            if total_leads > 0:
-                print(f"[TIME PER LEAD ⏱️ ] {elapsed / total_leads:.2f}s (for {total_leads} leads)")
-            else:
-                print(f"[TIME PER LEAD ⏱️ ] No leads found in {elapsed:.2f}s")
+        visit_counter += 1
+        served_by = snapshot['source'] if snapshot else 'failed'
+        print(f"[VISITED #{visit_counter}] {url} (via {served_by})")
+        record('pages' if snapshot else 'errors')
 
-            domain_data[domain]['emails'].update(emails)
-            domain_data[domain]['contacts'].update(contacts)
-            if addr:
-                domain_data[domain]['addresses'].add(addr)
+        domain_data[domain]['served_by'][url] = served_by
 
-            visited_domains.add(domain)
+        emails, contacts, addr = extract_leads(snapshot, url, local_skipped)
 
-            if save_callback:
-                save_callback(domain_data)
+        print(f"[INFO] Emails: {emails}")
+        print(f"[INFO] Contacts: {contacts}")
+        print(f"[INFO] Address: {addr}")
+        total_leads = len(emails) + len(contacts)
+        if total_leads > 0:
+            print(f"[TIME PER LEAD ⏱️ ] {elapsed / total_leads:.2f}s (for {total_leads} leads)")
+        else:
+            print(f"[TIME PER LEAD ⏱️ ] No leads found in {elapsed:.2f}s")
 
-            # Follow subpages
-            try:
-                sublinks = driver.find_elements(By.XPATH,
-                    "//a[contains(translate(@href, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'contact') or "
-                    "contains(translate(@href, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'locate')]")
-                sub_urls = []
-                for link in sublinks:
-                    sub_url = link.get_attribute('href')
-                    if sub_url and sub_url.startswith("http") and get_base_domain(sub_url) == domain:
-                        sub_urls.append(sub_url)
-
-                seen = set()
-                for sub_url in sub_urls:
-                    if visited_sites is not None:
-                        visited_sites.append(sub_url)
-                    if sub_url not in seen:
-                        seen.add(sub_url)
-                        print(f"{timestamp()} navigating to {sub_url}")
-                        sub_start = time.time()
-                        driver = safe_get(driver, sub_url, local_skipped)
-                        wait_ready(driver)
-                        sub_elapsed = time.time() - sub_start
-
-                        visit_counter += 1
-                        print(f"[VISITED #{visit_counter}] {sub_url}")
-
-                        domain_data[domain]['urls'].add(sub_url)
-                        emails = extract_emails(driver, sub_url, local_skipped)
-                        contacts = extract_contacts(driver)
-                        addr = extract_address(driver)
-
-                        print(f"[INFO] (subpage) Emails: {emails}")
-                        print(f"[INFO] (subpage) Contacts: {contacts}")
-                        print(f"[INFO] (subpage) Address: {addr}")
-                        print(f"[TIME TAKEN ⏱️ ] {sub_elapsed:.2f}s")
-
-                        domain_data[domain]['emails'].update(emails)
-                        domain_data[domain]['contacts'].update(contacts)
-                        if addr:
-                            domain_data[domain]['addresses'].add(addr)
-
-                        if save_callback:
-                            save_callback(domain_data)
+        company_name = domain_data[domain].get('company_name') or extract_company_name_from_url(url)
+        fresh = merge_leads(domain_data[domain], domain, url, emails, contacts, addr, company_name)
+        new_emails = sum(l['kind'] == 'email' for l in fresh)
+        new_contacts = sum(l['kind'] == 'contact' for l in fresh)
+        record('leads', new_emails + new_contacts)
+        log_page(worker_id, search_term, query, url, 'homepage', served_by, elapsed, new_emails, new_contacts, addr)
 
-            except Exception as e:
-                print(f"[WARN] {timestamp()} error following subpages: {e}")
+        visited_domains.add(domain)
 
-        return driver, visited_domains, domain_data
+        if save_callback and fresh:
+            save_callback(fresh)
 
-    except TimeoutException:
-        print(f"[WARN] {timestamp()} navigation to {query} timed out, restarting browser and retrying")
+        # Follow subpages
+        unvisited = []  # claimed subpages the browser has yet to visit
         try:
-            driver.quit()
-        except:
-            pass
-        return google_search_and_navigate(setup_driver(), query, local_skipped, save_callback)
+            sub_urls = []
+            for sub_url in (snapshot or {}).get('links', []):
+                lower = sub_url.lower()
+                if ('contact' in lower or 'locate' in lower) and sub_url.startswith("http") and get_base_domain(sub_url) == domain:
+                    sub_urls.append(sub_url)
+
+            sub_urls = list(dict.fromkeys(sub_urls))
+            if visited is not None:
+                sub_urls = [u for u in sub_urls if visited.claim_url(u, query)]
+
+            def merge_subpage(sub_url, sub_snapshot, sub_elapsed):
+                nonlocal visit_counter
+                visit_counter += 1
+                served_by = sub_snapshot['source'] if sub_snapshot else 'failed'
+                print(f"[VISITED #{visit_counter}] {sub_url} (via {served_by})")
+                record('pages' if sub_snapshot else 'errors')
+
+                domain_data[domain]['served_by'][sub_url] = served_by
+                emails, contacts, addr = extract_leads(sub_snapshot, sub_url, local_skipped)
+
+                print(f"[INFO] (subpage) Emails: {emails}")
+                print(f"[INFO] (subpage) Contacts: {contacts}")
+                print(f"[INFO] (subpage) Address: {addr}")
+                print(f"[TIME TAKEN ⏱️ ] {sub_elapsed:.2f}s")
+
+                fresh = merge_leads(domain_data[domain], domain, sub_url, emails, contacts, addr)
+                new_emails = sum(l['kind'] == 'email' for l in fresh)
+                new_contacts = sum(l['kind'] == 'contact' for l in fresh)
+                record('leads', new_emails + new_contacts)
+                page_type = 'contact' if 'contact' in sub_url.lower() else 'locate'
+                log_page(worker_id, search_term, query, sub_url, page_type, served_by, sub_elapsed,
+                         new_emails, new_contacts, addr)
+
+                if save_callback and fresh:
+                    save_callback(fresh)
+
+            # Static subpages are fetched concurrently; the rest go through Chrome one by one
+            browser_urls = sub_urls
+            if HTTP_FIRST and sub_urls:
+                print(f"{timestamp()} fetching {len(sub_urls)} subpages concurrently")
+                with phase('subpage_crawl'):
+                    browser_urls = crawl_subpages(sub_urls, merge_subpage, cache=get_page_cache())
+
+            unvisited = list(browser_urls)
+            for sub_url in browser_urls:
+                print(f"{timestamp()} navigating to {sub_url}")
+                sub_start = time.time()
+                driver, sub_snapshot = fetch_page(driver, sub_url, local_skipped, http=False)
+                unvisited.remove(sub_url)
+                merge_subpage(sub_url, sub_snapshot, time.time() - sub_start)
 
-    except Exception as e:
-        print(f"[ERROR] {timestamp()} error navigating '{query}': {e}, restarting browser...")
-        try:
-            driver.quit()
-        except:
-            pass
-        return google_search_and_navigate(setup_driver(), query, local_skipped, save_callback)
+        except Exception as e:
+            if classify(e) == RETRYABLE and not BrowserPool.is_healthy(driver):
+                # The browser died: leave it to the site/term retry budgets, which may revisit these pages
+                if visited is not None:
+                    for sub_url in unvisited:
+                        visited.release_url(sub_url, query)
+                raise
+            print(f"[WARN] {timestamp()} error following subpages: {e}")
+        return driver
+
+    for url in valid_urls:
+        domain = get_base_domain(url)
+        # Claim the site for this company (and the URL for anyone) before navigating
+        if visited is not None and not (visited.claim_site(url, query) and visited.claim_url(url, query)):
+            print(f"[SKIP] {url} already visited this run")
+            record('sites_skipped')
+            continue
 
-def worker_run(sublist, worker_id, terminate_event, visited_websites_set):
+        for attempt in range(1, SITE_ATTEMPTS + 1):
+            try:
+                driver = crawl_site(driver, url, domain)
+                break
+            except Exception as e:
+                if classify(e) != RETRYABLE or not BrowserPool.is_healthy(driver):
+                    # The term is retried with a new browser (or given up); let that attempt have this site too
+                    if visited is not None:
+                        visited.release_url(url, query)
+                    raise
+                if attempt == SITE_ATTEMPTS:
+                    print(f"[WARN] {timestamp()} giving up on {url} after {attempt} attempts: {str(e).strip()}")
+                    local_skipped.append({"URL": url, "Reason": f"Failed {attempt} attempts: {str(e).strip()}"})
+                    record('errors')
+                    break
+                delay = backoff(attempt, 'site')
+                print(f"[WARN] {timestamp()} {url} failed ({str(e).strip()}), retry {attempt} in {delay:.1f}s")
+                time.sleep(delay)
+                WAIT_STATS.add('pacing:site_retry', delay)
+
+    return driver, visited_domains, domain_data
+
+def worker_run(task_queue, worker_id, terminate_event, progress_queue=None, status=None, profile_term=None, pacing=True, output_dir='.', headless=None):
+    """Pull company names from task_queue until a None sentinel (or terminate_event).
+
+    A term whose attempt fails with a retryable error waits in a RetryScheduler
+    with exponential backoff while the worker takes the next name from the queue.
+    """
+    global _run_status, _output_dir, HEADLESS
+    PACING.enabled = pacing
+    if headless is not None:
+        HEADLESS = headless
+    _output_dir = output_dir
+    if status is not None:
+        _run_status = (status, worker_id)
     start_time = time.time()
 
     local_skipped = []
-    local_results = []
+    pool = BrowserPool(setup_driver, os.path.join(BROWSER_PROFILE_DIR, f"worker_{worker_id}"), name=str(worker_id))
+    index = CompletionIndex(job=INDEX_JOB)
+    visited = VisitedStore(VISITED_PATH, worker_id)
+    retries = RetryScheduler()
+    queue_open = True
+
+    def next_term():
+        """A due retry first, then the queue; once the queue is drained, wait out pending retries."""
+        nonlocal queue_open
+        while not terminate_event.is_set():
+            name = retries.pop_due()
+            if name is not None:
+                return name
+            wait = retries.wait_time()
+            if not queue_open:
+                if wait is None:
+                    return None
+                time.sleep(min(wait, 5))  # short naps so terminate_event is noticed
+                continue
+            try:
+                name = task_queue.get() if wait is None else task_queue.get(timeout=wait)
+            except Empty:
+                continue
+            if name is None:
+                queue_open = False
+                continue
+            return name
+        return None
 
     def save_local_checkpoint():
-        save_checkpoint(local_results, local_skipped, worker_id)
+        save_checkpoint([], local_skipped, worker_id)  # contact rows are saved per company
 
     def signal_handler(sig, frame):
         print(f"[Worker {worker_id}] Caught signal {sig}, saving progress...")
@@ -579,40 +687,121 @@ def worker_run(sublist, worker_id, terminate_event, visited_websites_set):
     signal.signal(signal.SIGTERM, signal_handler)
 
     try:
-        total = len(sublist)
-        for index, name in enumerate(sublist, start=1):
-            if terminate_event.is_set():
-                break
-            print(f"[Worker {worker_id}] Progress: {index}/{total} — {name}")
-            if terminate_event.is_set():
+        task_number = 0
+        while True:
+            name = next_term()
+            if name is None:
                 break
-            company_results = process_company(name, local_skipped, worker_id, visited_websites_set)
-            print(f"[DEBUG] {timestamp()} {name}: got {len(company_results)} rows from process_company")
-            if company_results:
-                local_results.extend(company_results)
-                save_local_checkpoint()  # Save after each company
-                print(f"[Worker {worker_id}] Scraped {len(company_results)} rows from '{name}' and saved.")
+            task_number += 1
+            attempt = retries.attempts.get(name, 0) + 1
+            print(f"[Worker {worker_id}] Task {task_number}: {name}" + (f" (attempt {attempt})" if attempt > 1 else ''))
+            task_start = time.time()
+            index.mark_started(name)
+            try:
+                if profile_term and normalize_term(name) == normalize_term(profile_term):
+                    with profiled(name):
+                        company_results = process_company(name, local_skipped, worker_id, visited, pool)
+                else:
+                    company_results = process_company(name, local_skipped, worker_id, visited, pool)
+            except Exception as e:
+                kind = classify(e)
+                if kind == CAPTCHA:
+                    pool.discard()  # the next search starts from a fresh browser
+                    sl = random.randint(*RECAPTCHA_SLEEP_RANGE)
+                    print(f"[INFO] {timestamp()} captcha detected, sleeping {sl}s")
+                    countdown_timer(sl)
+                    WAIT_STATS.add('pacing:captcha_backoff', sl)
+                delay = retries.failed(name, kind)
+                if delay is not None:
+                    print(f"[WARN] [Worker {worker_id}] '{name}' failed ({kind}: {e}), retrying in {delay:.0f}s")
+                    record('terms_retried')
+                    continue
+                print(f"[ERROR] [Worker {worker_id}] Giving up on '{name}' after attempt {attempt} ({kind}: {e})")
+                index.mark_failed(name, e)
+                record('terms_failed')
+                # Keep the rows earlier attempts found, unless the fatal error may be in doing just that
+                company_results = finish_company(name, local_skipped, worker_id, time.time() - task_start) if kind != FATAL else []
+            else:
+                retries.succeeded(name)
+                print(f"[DEBUG] {timestamp()} {name}: got {len(company_results)} rows from process_company")
+                if company_results:
+                    print(f"[Worker {worker_id}] Scraped {len(company_results)} rows from '{name}' and saved.")
+                index.mark_done(name, result={'rows': len(company_results)})
+                record('terms_done')
+            if progress_queue is not None:
+                progress_queue.put({
+                    'worker_id': worker_id,
+                    'name': name,
+                    'rows': len(company_results),
+                    'elapsed': time.time() - task_start,
+                })
     except Exception as e:
         print(f"[Worker {worker_id}] crashed: {e}")
     finally:
         save_local_checkpoint()
+        pool.close()
+        index.close()
+        visited.close()
+        cache = get_page_cache()
+        if cache is not None:
+            print(f"[Worker {worker_id}] {cache.stats()}")
+            cache.close()
+        print(f"[Worker {worker_id}] Wait time: {WAIT_STATS.report()}")
+        write_report(f"timings_worker_{worker_id}.json", {f"worker_{worker_id}": TIMINGS.to_dict()})
 
 if __name__ == '__main__':
-    from multiprocessing import Manager
-    manager = Manager()
-    visited_websites_set = manager.list()
-
-    import threading
-    monitor_thread = threading.Thread(
-        target=monitor_visited_sites,
-        args=(visited_websites_set,),
+    VisitedStore.reset(VISITED_PATH)
+    for stale in glob.glob("timings_worker_*.json"):
+        os.remove(stale)
+
+    parser = argparse.ArgumentParser(description='Scrape company contacts for the names in INPUT_EXCEL')
+    parser.add_argument('--workers', type=int, default=NUM_WORKERS, help=f'number of browser workers (default {NUM_WORKERS})')
+    parser.add_argument('--resume', action='store_true', help='skip names already completed in a previous run')
+    parser.add_argument('--since', help="skip only names completed within this window, e.g. 7d, 12h or 2025-01-31 (implies --resume)")
+    parser.add_argument('--headless', action='store_true', help='run Chrome without a window (more Google CAPTCHAs; local testing only)')
+    parser.add_argument('--no-pacing', action='store_true', help='skip the deliberate pauses after Google requests (local testing only)')
+    parser.add_argument('--profile-term', help='write cProfile and tracemalloc dumps (to profiles/) while processing this name')
+    parser.add_argument('--status-port', type=int, default=STATUS_PORT, help=f'port for the live /status endpoint, 0 to disable (default {STATUS_PORT})')
+    args = parser.parse_args()
+    num_workers = max(1, args.workers)
+
+    # Worker stores live in worker_outputs/<run id>/; a resumed run keeps adding to the latest run
+    run_id = (args.resume or args.since) and merge_outputs.latest_run_id() or merge_outputs.new_run_id()
+    output_dir = merge_outputs.run_dir(run_id)
+    print(f"[INFO] Run {run_id}, worker outputs in {output_dir}")
+
+    # Names are streamed from the input while workers are already busy with the first ones
+    source = TermSource(INPUT_EXCEL)
+    load_blacklists(source)
+    names = source.terms()
+    index = None
+    if args.resume or args.since:
+        index = CompletionIndex(job=INDEX_JOB)
+        fresh_after = parse_since(args.since) if args.since else None
+        names = index.filter_pending(names, fresh_after)
+
+    # Workers pull names on demand, so a slow site only holds up one worker
+    task_queue = Queue()
+    task_queue.cancel_join_thread()  # don't block exit on names left behind after Ctrl-C
+
+    # Live counters: workers write shared memory, the main process serves and snapshots them
+    run_status = RunStatus(num_workers, 0)  # terms_total grows as names are queued
+    status_server = run_status.serve(args.status_port) if args.status_port else None
+    status_done = threading.Event()
+    status_thread = threading.Thread(
+        target=report_status,
+        args=(run_status, STATUS_FILE, STATUS_INTERVAL, status_done),
         daemon=True
     )
-    monitor_thread.start()
+    status_thread.start()
 
-    df = pd.read_excel(INPUT_EXCEL)
-    names = df.iloc[:, 0].dropna().astype(str).tolist()
-    chunks = [names[i::3] for i in range(3)]
+    progress_queue = Queue()
+    progress_thread = threading.Thread(
+        target=report_progress,
+        args=(progress_queue, run_status),
+        daemon=True
+    )
+    progress_thread.start()
     processes = []
 
     def main_signal_handler(sig, frame):
@@ -623,13 +812,31 @@ if __name__ == '__main__':
     signal.signal(signal.SIGTERM, main_signal_handler)
 
     try:
-        load_blacklists()
-
-        for i, chunk in enumerate(chunks):
-            p = Process(target=worker_run, args=(chunk, i + 1, terminate_event, visited_websites_set))
+        print(f"{timestamp()} Starting {num_workers} workers")
+        for i in range(num_workers):
+            p = Process(target=worker_run, args=(task_queue, i + 1, terminate_event, progress_queue, run_status, args.profile_term, not args.no_pacing, output_dir, args.headless or HEADLESS))
             p.start()
             processes.append(p)
 
+        queued = 0
+        try:
+            for name in names:
+                if terminate_event.is_set():
+                    break
+                task_queue.put(name)
+                queued += 1
+                run_status.terms_total = queued
+        finally:
+            source.close()
+            if index is not None:
+                index.close()
+            for _ in range(num_workers):
+                task_queue.put(None)  # one stop sentinel per worker
+        distinct = source.read - source.duplicates
+        print(f"[INFO] Queued {queued} names from {INPUT_EXCEL} ({source.duplicates} duplicates dropped)")
+        if index is not None:
+            print(f"[INFO] Resume: {distinct - queued} of {distinct} names already done, {queued} to process")
+
         for p in processes:
             p.join()
 
@@ -637,50 +844,46 @@ if __name__ == '__main__':
         print("\n[Main] KeyboardInterrupt caught — initiating graceful shutdown.")
         main_signal_handler(signal.SIGINT, None)
 
-    print(f"{timestamp()} All workers finished. Merging outputs...")
-
-    all_contacts = []
-    all_skipped = []
+    progress_queue.put(None)
+    progress_thread.join(timeout=5)
+    status_done.set()
+    status_thread.join(timeout=5)
+    print(run_status.summary_line())
+    if status_server is not None:
+        status_server.shutdown()
 
-    for file in glob.glob("worker_output_*.xlsx"):
+    raw_timings = {}
+    for file in sorted(glob.glob("timings_worker_*.json")):
         try:
-            xls = pd.ExcelFile(file)
-            if 'Contacts' in xls.sheet_names:
-                df = pd.read_excel(xls, 'Contacts')
-                if not df.empty:
-                    all_contacts.append(df)
-            if 'Skipped URL' in xls.sheet_names:
-                df = pd.read_excel(xls, 'Skipped URL')
-                if not df.empty:
-                    all_skipped.append(df)
+            with open(file, encoding='utf-8') as f:
+                raw_timings.update(json.load(f)['raw'])
         except Exception as e:
             print(f"[WARN] Could not read {file}: {e}")
+    if raw_timings:
+        report = write_report(TIMINGS_REPORT, raw_timings)
+        print(f"[Main] Phase timings (full report in {TIMINGS_REPORT}):\n{format_summary(report['overall'])}")
 
-    combined_contacts = pd.concat(all_contacts, ignore_index=True).drop_duplicates()
-
-    email_leads = combined_contacts['Emails'].dropna().astype(str).apply(lambda x: x.strip() != "").sum()
-    contact_leads = combined_contacts['Contacts'].dropna().astype(str).apply(lambda x: x.strip() != "").sum()
-    total_leads = email_leads + contact_leads
+    print(f"{timestamp()} All workers finished. Merging outputs...")
 
-    def extract_domain(url):
-        try:
-            return urlparse(url).netloc.lower().replace("www.", "")
-        except:
-            return None
+    # Only this run's worker stores are merged, deduplicated on disk
+    merged_path = merge_outputs.merge_run(output_dir)
+    report = yield_report.build_report(merged_path, TIMINGS_REPORT)
+    yield_report.write_report(report, YIELD_REPORT, os.path.splitext(YIELD_REPORT)[0] + '.html')
+    print(f"[SUMMARY] Yield report in {YIELD_REPORT}:\n{yield_report.format_summary(report)}")
+    totals = report['totals']
+    email_leads, contact_leads, unique_sites = totals['emails'], totals['contacts'], totals['unique_sites']
+    total_leads = totals['leads']
 
-    all_domains = combined_contacts['Website'].dropna().astype(str).map(extract_domain)
-    unique_sites = all_domains.dropna().nunique()
     avg_yield = email_leads / unique_sites if unique_sites > 0 else 0
     print(f"[SUMMARY] 📈 Avg. Yield: {avg_yield:.2f} per Unique Site (Emails: {email_leads} / Unique Sites: {unique_sites})")
 
     print(f"[SUMMARY] ✅ Total Leads Retrieved: {total_leads} (Emails: {email_leads}, Contacts: {contact_leads})")
 
-    if all_contacts or all_skipped:
-        with pd.ExcelWriter(OUTPUT_EXCEL, engine='openpyxl') as writer:
-            if not combined_contacts.empty:
-                combined_contacts.to_excel(writer, sheet_name="Contacts", index=False)
-            if all_skipped:
-                pd.concat(all_skipped, ignore_index=True).drop_duplicates().to_excel(writer, sheet_name="Skipped URL", index=False)
-        print(f"{timestamp()} Merge complete. Final results saved to {OUTPUT_EXCEL}")
+    merged = sqlite3.connect(merged_path)
+    if merge_outputs.export_excel(merged, OUTPUT_EXCEL):
+        print(f"{timestamp()} Merge complete. Final results saved to {OUTPUT_EXCEL} ({totals['rows']} rows, {totals['skipped']} skipped URLs)")
+        if OUTPUT_PARQUET and merge_outputs.export_parquet(merged, OUTPUT_PARQUET):
+            print(f"{timestamp()} Contacts also saved to {OUTPUT_PARQUET}")
     else:
         print(f"{timestamp()} No data files created by workers. Nothing to merge.")
+    merged.close()
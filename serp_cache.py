@@ -0,0 +1,65 @@
+# Local cache of parsed Google result pages for akc_rank_checker
+#
+# One row per (normalized query, start offset, interface language) holding the
+# ordered organic URLs parsed from that page and when it was fetched. Ranks and
+# top-3 domains are derived from these lists, so they can be recomputed after
+# TARGET_DOMAINS changes without loading Google again. A page marked `last`
+# (Google had no more results) completes the query; later pages are not needed.
+
+import json
+import sqlite3
+from datetime import datetime
+
+from completion_index import normalize_term
+
+DEFAULT_CACHE_PATH = 'serp_cache.sqlite'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS serp_pages (
+    query_key TEXT NOT NULL,
+    start INTEGER NOT NULL,
+    hl TEXT NOT NULL,
+    query TEXT NOT NULL,
+    fetched_at TEXT NOT NULL,
+    urls TEXT NOT NULL,
+    last INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (query_key, start, hl)
+);
+"""
+
+
+class SerpCache:
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(SCHEMA)
+        # Caches from before serp_pages.last existed
+        if 'last' not in {row[1] for row in self.conn.execute('PRAGMA table_info(serp_pages)')}:
+            with self.conn:
+                self.conn.execute('ALTER TABLE serp_pages ADD COLUMN last INTEGER NOT NULL DEFAULT 0')
+
+    def get(self, query, start, hl, fresh_after=None):
+        """(URL list, last) for one result page, or None if missing or fetched before fresh_after."""
+        row = self.conn.execute(
+            'SELECT fetched_at, urls, last FROM serp_pages WHERE query_key = ? AND start = ? AND hl = ?',
+            (normalize_term(query), start, hl),
+        ).fetchone()
+        if row is None or (fresh_after is not None and datetime.fromisoformat(row[0]) < fresh_after):
+            return None
+        return json.loads(row[1]), bool(row[2])
+
+    def put(self, query, start, hl, urls, last=False):
+        now = datetime.now().isoformat()
+        with self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO serp_pages (query_key, start, hl, query, fetched_at, urls, last) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (normalize_term(query), start, hl, str(query), now, json.dumps(urls), int(last)),
+            )
+
+    def close(self):
+        try:
+            self.conn.close()
+        except Exception:
+            pass
@@ -0,0 +1,188 @@
+# Offline Google results parser shared by akc_rank_checker and scraper_bot2v1
+#
+# Works on a page_source string (one WebDriver call per results page) instead of
+# live element queries, so it can also be run against saved pages.
+
+import re
+from dataclasses import dataclass
+from urllib.parse import urlparse, parse_qs, urljoin
+
+import lxml.html
+from lxml import etree
+
+from domains import base_domain as get_base_domain
+
+
+@dataclass
+class SerpResult:
+    position: int          # 1-based order of the organic block on the page
+    url: str               # landing URL (Google redirects unwrapped)
+    display_domain: str    # domain shown in the <cite> line
+    company_name: str = ''  # site name from span.VuuXrf / div.CA5RN, if any
+
+
+def _has_class(el, name: str) -> bool:
+    return name in (el.get('class') or '').split()
+
+
+def _class_xpath(name: str):
+    # Cheap substring match in XPath, exact class token checked in Python
+    xpath = etree.XPath(f"//div[contains(@class, '{name}')]")
+    return lambda tree: [el for el in xpath(tree) if _has_class(el, name)]
+
+
+# Result containers, most specific first; the first one that matches wins
+BLOCK_XPATHS = [
+    _class_xpath('yuRUbf'),
+    etree.XPath("//div[contains(@class, 'yuRUbf')]"),
+    _class_xpath('g'),
+    etree.XPath("//div[@data-sokoban-container]"),
+    _class_xpath('byrV5b'),
+]
+CA5RN_XPATH = _class_xpath('CA5RN')
+RESULT_CONTAINER_CLASSES = ('tF2Cxc', 'MjjYud')
+# page_source has no layout, so hidden blocks (collapsed "People also ask"
+# answers and the like) are recognised by their markup
+HIDDEN_STYLE = re.compile(r'display\s*:\s*none|visibility\s*:\s*hidden', re.IGNORECASE)
+
+
+def normalize_google_href(href: str) -> str:
+    # Convert Google redirect links like /url?q=https://target... to the target URL
+    try:
+        if not href:
+            return href
+        if href.startswith('/url?'):
+            href_abs = urljoin('https://www.google.com', href)
+            q = parse_qs(urlparse(href_abs).query).get('q', [])
+            if q:
+                return q[0]
+        elif 'google.' in href and '/url?' in href:
+            q = parse_qs(urlparse(href).query).get('q', [])
+            if q:
+                return q[0]
+        return href
+    except Exception:
+        return href
+
+
+def href_from_cite_text(cite_text: str):
+    # The cite text looks like "https://www.sg-akc.com › category › food-safety-courses"
+    if not cite_text:
+        return None
+    cite_text = cite_text.replace('\xa0', ' ').replace('&nbsp;', ' ').replace('&amp;', '&').strip()
+
+    # Base URL is everything before the first ›, < or space
+    if '›' in cite_text:
+        base_url = cite_text.split('›')[0].strip()
+    elif '<' in cite_text:
+        base_url = cite_text.split('<')[0].strip()
+    elif ' ' in cite_text and cite_text.startswith('http'):
+        base_url = cite_text.split()[0]
+    else:
+        base_url = cite_text.strip()
+
+    if base_url.startswith('http'):
+        return base_url
+    if '.' in base_url and ' ' not in base_url:
+        return f"https://{base_url}"
+    return None
+
+
+def _text(el) -> str:
+    return el.text_content().strip() if el is not None else ''
+
+
+def _first_cite(block):
+    for cite in block.iter('cite'):
+        if _text(cite):
+            return cite
+    return None
+
+
+def _site_name(el) -> str:
+    for span in el.iter('span'):
+        if _has_class(span, 'VuuXrf'):
+            return _text(span)
+    return ''
+
+
+def _is_hidden(block) -> bool:
+    for el in (block, *block.iterancestors()):
+        if el.get('hidden') is not None or el.get('aria-hidden') == 'true' or HIDDEN_STYLE.search(el.get('style') or ''):
+            return True
+    return False
+
+
+def _result_container(block):
+    for el in block.iterancestors('div'):
+        if any(_has_class(el, c) for c in RESULT_CONTAINER_CLASSES):
+            return el
+    return block
+
+
+def _parse_tree(html: str):
+    if not html or not html.strip():
+        return None
+    try:
+        return lxml.html.fromstring(html)
+    except Exception:
+        return None
+
+
+def _company_names(tree) -> dict:
+    names = {}
+    for block in CA5RN_XPATH(tree):
+        cite = _first_cite(block)
+        if cite is None:
+            continue
+        domain = get_base_domain(href_from_cite_text(_text(cite)) or '')
+        name = _site_name(block)
+        if domain and name:
+            names.setdefault(domain, name)
+    return names
+
+
+def parse_company_names(html: str) -> dict:
+    """Map display domain -> company name from the div.CA5RN site-name rows."""
+    tree = _parse_tree(html)
+    return _company_names(tree) if tree is not None else {}
+
+
+def parse_serp(html: str) -> list[SerpResult]:
+    """Parse a Google results page into organic results, in page order."""
+    tree = _parse_tree(html)
+    if tree is None:
+        return []
+
+    blocks = []
+    for xpath in BLOCK_XPATHS:
+        blocks = [block for block in xpath(tree) if not _is_hidden(block)]
+        if blocks:
+            break
+
+    names_by_domain = _company_names(tree)
+    results: list[SerpResult] = []
+    seen_urls = set()
+    for block in blocks:
+        cite = _first_cite(block)
+        cite_href = href_from_cite_text(_text(cite))
+
+        href = ''
+        for a in block.iter('a'):
+            if a.get('href'):
+                href = normalize_google_href(a.get('href'))
+                break
+        url = href if href.startswith('http') else (cite_href or '')
+        if not url or url in seen_urls:
+            # A repeated link (e.g. an expanded "People also ask" answer) is not another position
+            continue
+        seen_urls.add(url)
+
+        display_domain = get_base_domain(cite_href or url)
+
+        company_name = _site_name(block) or _site_name(_result_container(block))
+        if not company_name:
+            company_name = names_by_domain.get(display_domain, '')
+
+        results.append(SerpResult(len(results) + 1, url, display_domain, company_name))
+    return results
@@ -0,0 +1,212 @@
+# Streaming, batched uploader for the Google Sheets webhook
+#
+# Rows are journaled to SQLite the moment they are added, then a background
+# thread posts them in batches over a pooled session while the run goes on.
+# A batch keeps its idempotency key (sent as an Idempotency-Key header and a
+# ?batch= parameter, which Apps Script can read from e.parameter) across
+# retries and restarts. Failed posts are retried with exponential backoff and
+# jitter; whatever is still unsent when the run ends stays in the journal and
+# is replayed first on the next start.
+
+import gzip
+import json
+import queue
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from urllib.parse import urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from phase_timings import phase
+
+DEFAULT_JOURNAL_PATH = 'sheet_journal.sqlite'
+BATCH_SIZE = 50               # rows per POST
+FLUSH_INTERVAL = 30           # seconds a partial batch may wait before it is sent anyway
+MAX_ATTEMPTS = 6              # per batch and run; the batch stays journaled after that
+BACKOFF_BASE = 2.0            # seconds, doubled per attempt
+BACKOFF_MAX = 120
+HTTP_TIMEOUT = (5, 60)        # (connect, read) seconds
+RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS journal (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    row TEXT NOT NULL,
+    batch_key TEXT,
+    added_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS journal_batch ON journal (batch_key);
+"""
+
+
+def _connect(path):
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.executescript(SCHEMA)
+    return conn
+
+
+class SheetUploader:
+    def __init__(self, url, journal_path=DEFAULT_JOURNAL_PATH, batch_size=BATCH_SIZE,
+                 flush_interval=FLUSH_INTERVAL, compress=False):
+        self.url = url
+        self.journal_path = journal_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.compress = compress
+        self.conn = _connect(journal_path)  # caller's thread; the sender opens its own
+        self.stats = {'rows_sent': 0, 'batches_sent': 0, 'retries': 0, 'batches_failed': 0,
+                      'bytes_raw': 0, 'bytes_sent': 0}
+        self._confirmed = queue.SimpleQueue()
+        self._wake = threading.Event()
+        self._closing = threading.Event()
+        self._session = None
+        replay = self.pending_count()
+        if replay:
+            print(f"[INFO] Replaying {replay} unsent rows from {journal_path}")
+        self._thread = threading.Thread(target=self._run, name='sheet-uploader', daemon=True)
+        self._thread.start()
+
+    # ---- caller side ----
+
+    def add(self, row):
+        """Journal one row; it is uploaded in the background."""
+        now = datetime.now().isoformat(timespec='seconds')
+        with self.conn:
+            self.conn.execute('INSERT INTO journal (row, added_at) VALUES (?, ?)', (json.dumps(row, default=str), now))
+        self._wake.set()
+
+    def pending_rows(self) -> list[dict]:
+        return [json.loads(r) for (r,) in self.conn.execute('SELECT row FROM journal ORDER BY id')]
+
+    def pending_count(self) -> int:
+        return self.conn.execute('SELECT COUNT(*) FROM journal').fetchone()[0]
+
+    def confirmed(self) -> list[dict]:
+        """Rows the webhook has accepted since the last call."""
+        rows = []
+        while True:
+            try:
+                rows.append(self._confirmed.get_nowait())
+            except queue.Empty:
+                return rows
+
+    def close(self, timeout=None):
+        """Send everything still journaled (with retries), then stop. Returns rows left unsent."""
+        self._closing.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        left = self.pending_count()
+        self.conn.close()
+        if self._session is not None:
+            self._session.close()
+        return left
+
+    def summary(self) -> str:
+        s = self.stats
+        ratio = f", {s['bytes_sent'] / s['bytes_raw']:.0%} of raw size" if self.compress and s['bytes_raw'] else ''
+        return (f"{s['rows_sent']} rows in {s['batches_sent']} batches, {s['retries']} retries, "
+                f"{s['batches_failed']} batches left for next run{ratio}")
+
+    # ---- sender thread ----
+
+    def _get_session(self):
+        if self._session is None:
+            session = requests.Session()
+            session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=2, max_retries=0))
+            session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=2, max_retries=0))
+            session.headers.update({'Content-Type': 'application/json'})
+            if self.compress:
+                session.headers['Content-Encoding'] = 'gzip'
+            self._session = session
+        return self._session
+
+    def _next_batch(self, conn, gave_up):
+        """(key, [(id, row_json)]) of the oldest batch to send, or None if it should wait."""
+        placeholders = ','.join('?' * len(gave_up)) or "''"
+        row = conn.execute(
+            f'SELECT batch_key FROM journal WHERE batch_key IS NOT NULL AND batch_key NOT IN ({placeholders}) '
+            'ORDER BY id LIMIT 1', tuple(gave_up),
+        ).fetchone()
+        if row is not None:
+            key = row[0]  # formed before a failure or restart: same rows, same key
+        else:
+            pending = conn.execute(
+                'SELECT id, added_at FROM journal WHERE batch_key IS NULL ORDER BY id LIMIT ?', (self.batch_size,)
+            ).fetchall()
+            if not pending:
+                return None
+            oldest = datetime.fromisoformat(pending[0][1])
+            full = len(pending) >= self.batch_size
+            overdue = (datetime.now() - oldest).total_seconds() >= self.flush_interval
+            if not (full or overdue or self._closing.is_set()):
+                return None
+            key = uuid.uuid4().hex
+            with conn:
+                conn.executemany('UPDATE journal SET batch_key = ? WHERE id = ?', [(key, i) for i, _ in pending])
+        rows = conn.execute('SELECT id, row FROM journal WHERE batch_key = ? ORDER BY id', (key,)).fetchall()
+        return key, rows
+
+    def _post(self, key, rows) -> bool:
+        body = ('[' + ','.join(r for _, r in rows) + ']').encode('utf-8')
+        data = gzip.compress(body) if self.compress else body
+        url = f"{self.url}{'&' if '?' in self.url else '?'}{urlencode({'batch': key})}"
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            retry_after = None
+            try:
+                with phase('webhook_upload'):
+                    response = self._get_session().post(url, data=data, headers={'Idempotency-Key': key}, timeout=HTTP_TIMEOUT)
+                if response.status_code == 200:
+                    self.stats['bytes_raw'] += len(body)
+                    self.stats['bytes_sent'] += len(data)
+                    return True
+                error = f"HTTP {response.status_code}: {response.text[:200]}"
+                if response.status_code not in RETRY_STATUSES:
+                    print(f"[ERROR] Google Sheets rejected batch {key[:8]} ({error}); kept in {self.journal_path}")
+                    return False
+                retry_after = response.headers.get('Retry-After')
+            except requests.RequestException as e:
+                error = str(e)
+            if attempt == MAX_ATTEMPTS:
+                break
+            delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, min(int(retry_after), BACKOFF_MAX))
+            self.stats['retries'] += 1
+            print(f"[WARN] Sheets upload of {len(rows)} rows failed ({error}), retry {attempt} in {delay:.1f}s")
+            time.sleep(delay)
+        print(f"[ERROR] Giving up on batch {key[:8]} for this run; kept in {self.journal_path}")
+        return False
+
+    def _run(self):
+        conn = _connect(self.journal_path)
+        gave_up = set()  # batch keys that exhausted their attempts this run
+        try:
+            while True:
+                batch = self._next_batch(conn, gave_up)
+                if batch is None:
+                    if self._closing.is_set():
+                        break
+                    self._wake.wait(min(self.flush_interval, 5))
+                    self._wake.clear()
+                    continue
+                key, rows = batch
+                if self._post(key, rows):
+                    with conn:
+                        conn.execute('DELETE FROM journal WHERE batch_key = ?', (key,))
+                    self.stats['rows_sent'] += len(rows)
+                    self.stats['batches_sent'] += 1
+                    for _, row in rows:
+                        self._confirmed.put(json.loads(row))
+                else:
+                    gave_up.add(key)
+                    self.stats['batches_failed'] += 1
+        except Exception as e:
+            print(f"[ERROR] Sheets uploader stopped: {e}; unsent rows stay in {self.journal_path}")
+        finally:
+            conn.close()
@@ -0,0 +1,122 @@
+# Concurrent HTTP crawl of a company's contact/locate subpages
+#
+# Subpages found on a homepage are independent, so they are fetched together
+# with asyncio + aiohttp under a global cap and a per-domain cap. Each page is
+# handed to on_page() as soon as it arrives; pages that need a real browser
+# (see page_fetcher.looks_js_rendered) come back so the caller can visit them
+# with Selenium. Pages still fresh in the PageCache are served without a
+# request; stale ones are revalidated conditionally.
+
+import asyncio
+import time
+
+import aiohttp
+
+from domains import registrable_domain
+from page_fetcher import (
+    MAX_RESPONSE_BYTES, USER_AGENT, ACCEPT_ENCODING, decode_body, looks_js_rendered, snapshot_from_html,
+)
+
+# ========== CONFIGURATION ==========
+MAX_CONCURRENCY = 8        # subpage requests in flight overall
+MAX_PER_DOMAIN = 3         # ... and per registrable domain
+REQUEST_TIMEOUT = 15       # seconds per request, including the body
+
+HEADERS = {
+    'User-Agent': USER_AGENT,
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept-Encoding': ACCEPT_ENCODING,
+}
+
+
+async def _fetch(session, url, global_sem, domain_sems, cache=None):
+    domain_sem = domain_sems.setdefault(registrable_domain(url), asyncio.Semaphore(MAX_PER_DOMAIN))
+    entry = cache.lookup(url) if cache is not None else None
+    headers = cache.conditional_headers(entry) if entry is not None else None
+    async with global_sem, domain_sem:
+        start = time.time()
+        try:
+            async with session.get(url, headers=headers, allow_redirects=True) as resp:
+                if resp.status == 304 and entry is not None:
+                    return url, cache.load(url, entry, revalidated=True), time.time() - start
+                content_type = resp.headers.get('Content-Type', '').lower()
+                if resp.status != 200 or 'html' not in content_type:
+                    return url, None, time.time() - start
+                chunks, size = [], 0
+                async for chunk in resp.content.iter_chunked(64 * 1024):
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size > MAX_RESPONSE_BYTES:
+                        break
+                body = b''.join(chunks)
+                charset = resp.charset
+                final_url = str(resp.url)
+                etag = resp.headers.get('ETag')
+                last_modified = resp.headers.get('Last-Modified')
+        except (aiohttp.ClientError, asyncio.TimeoutError, UnicodeError):
+            return url, None, time.time() - start
+
+    snapshot = snapshot_from_html(decode_body(body, charset), final_url)
+    if snapshot is None or looks_js_rendered(snapshot):
+        return url, None, time.time() - start
+    snapshot['source'] = 'http'
+    snapshot['final_url'] = final_url
+    if cache is not None:
+        cache.save(url, snapshot, etag, last_modified)
+    return url, snapshot, time.time() - start
+
+
+async def _fetch_or_fallback(session, url, global_sem, domain_sems, cache=None):
+    # One bad page must not abort its siblings in as_completed; the browser gets it instead
+    start = time.time()
+    try:
+        return await _fetch(session, url, global_sem, domain_sems, cache)
+    except Exception as e:
+        print(f"[WARN] HTTP fetch of {url} failed unexpectedly: {e!r}, using browser")
+        return url, None, time.time() - start
+
+
+async def _crawl(urls, on_page, cache=None):
+    global_sem = asyncio.Semaphore(MAX_CONCURRENCY)
+    domain_sems = {}
+    needs_browser = []
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+    connector = aiohttp.TCPConnector(limit=MAX_CONCURRENCY, limit_per_host=MAX_PER_DOMAIN)
+    async with aiohttp.ClientSession(headers=HEADERS, timeout=timeout, connector=connector) as session:
+        tasks = [asyncio.ensure_future(_fetch_or_fallback(session, url, global_sem, domain_sems, cache)) for url in urls]
+        for next_done in asyncio.as_completed(tasks):
+            url, snapshot, elapsed = await next_done
+            if snapshot is None:
+                needs_browser.append(url)
+            else:
+                _deliver(on_page, url, snapshot, elapsed)
+    return needs_browser
+
+
+def _deliver(on_page, url, snapshot, elapsed):
+    try:
+        on_page(url, snapshot, elapsed)
+    except Exception as e:
+        print(f"[WARN] subpage handler failed for {url}: {e}")
+
+
+def crawl_subpages(urls, on_page, cache=None):
+    """Fetch urls concurrently, calling on_page(url, snapshot, elapsed) as each arrives.
+
+    Returns the urls that could not be served over HTTP, in their original order.
+    """
+    urls = list(dict.fromkeys(urls))
+    if cache is not None:
+        remaining = []
+        for url in urls:
+            snapshot = cache.get_fresh(url)
+            if snapshot is None:
+                remaining.append(url)
+            else:
+                _deliver(on_page, url, snapshot, 0.0)
+        urls = remaining
+    if not urls:
+        return []
+    needs_browser = set(asyncio.run(_crawl(urls, on_page, cache)))
+    return [u for u in urls if u in needs_browser]
@@ -0,0 +1,108 @@
+# Streaming input reader for search terms and blacklist sheets
+#
+# Opens the input once (openpyxl read-only for workbooks, csv for .csv,
+# pyarrow for .parquet) and yields the first column lazily, so callers can start
+# dispatching work while the rest of the file is still being read and a 100k-row
+# workbook never sits in a DataFrame. Terms are whitespace-normalized and
+# deduplicated on the fly by completion_index.normalize_term, the same key the
+# completion index uses. Blacklist sheets come from the same workbook handle.
+
+import csv
+import os
+import re
+
+import openpyxl
+
+from completion_index import normalize_term
+
+# ========== CONFIGURATION ==========
+PARQUET_BATCH_ROWS = 10_000
+CSV_ENCODING = 'utf-8-sig'  # tolerates the BOM Excel writes into CSV exports
+
+
+def clean_term(value) -> str:
+    """Cell value as a single-spaced string; '' for empty cells."""
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)  # numeric cells read back as 123.0
+    return re.sub(r'\s+', ' ', str(value)).strip()
+
+
+class TermSource:
+    """Lazy reader over the first column of an .xlsx/.xlsm, .csv or .parquet file.
+
+    The first row of workbooks and CSV files is a header, as with pd.read_excel.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.kind = os.path.splitext(path)[1].lower().lstrip('.')
+        self.duplicates = 0
+        self.read = 0
+        self._workbook = None
+        if self.kind in ('xlsx', 'xlsm'):
+            self._workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        elif self.kind not in ('csv', 'parquet'):
+            raise ValueError(f"Unsupported input file type: {path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _first_column(self):
+        if self._workbook is not None:
+            rows = self._workbook.worksheets[0].iter_rows(min_row=2, max_col=1, values_only=True)
+            return (row[0] if row else None for row in rows)
+        if self.kind == 'csv':
+            return self._csv_column()
+        return self._parquet_column()
+
+    def _csv_column(self):
+        with open(self.path, newline='', encoding=CSV_ENCODING) as f:
+            reader = csv.reader(f)
+            next(reader, None)  # header
+            for row in reader:
+                yield row[0] if row else None
+
+    def _parquet_column(self):
+        import pyarrow.parquet as pq
+        parquet = pq.ParquetFile(self.path)
+        column = parquet.schema_arrow.names[0]
+        for batch in parquet.iter_batches(batch_size=PARQUET_BATCH_ROWS, columns=[column]):
+            yield from batch.column(0).to_pylist()
+
+    def terms(self):
+        """Yield each distinct non-empty term once, in file order."""
+        seen = set()
+        for value in self._first_column():
+            term = clean_term(value)
+            if not term:
+                continue
+            self.read += 1
+            key = normalize_term(term)
+            if key in seen:
+                self.duplicates += 1
+                continue
+            seen.add(key)
+            yield term
+
+    def sheet_column(self, name) -> list:
+        """First-column values of the named sheet below its header; [] if absent (or not a workbook)."""
+        if self._workbook is None or name not in self._workbook.sheetnames:
+            return []
+        rows = self._workbook[name].iter_rows(min_row=2, max_col=1, values_only=True)
+        return [term for term in (clean_term(row[0] if row else None) for row in rows) if term]
+
+    def close(self):
+        if self._workbook is not None:
+            self._workbook.close()
+            self._workbook = None
+
+
+def read_terms(path) -> list:
+    """All distinct terms of path, for callers that need the whole list."""
+    with TermSource(path) as source:
+        return list(source.terms())
@@ -0,0 +1,41 @@
+from browser_pool import BrowserPool
+
+
+class FakeSwitch:
+    def window(self, handle):
+        pass
+
+
+class FakeDriver:
+    switch_to = FakeSwitch()
+
+    def __init__(self, healthy=True):
+        self.healthy = healthy
+        self.quit_called = False
+        self.window_handles = ['main']
+
+    def execute_script(self, script):
+        if not self.healthy:
+            raise TimeoutError('renderer hung')
+        return 1
+
+    def get(self, url):
+        pass
+
+    def execute_cdp_cmd(self, cmd, params):
+        pass
+
+    def quit(self):
+        self.quit_called = True
+        if not self.healthy:
+            raise ConnectionRefusedError()
+
+
+def test_replaced_unresponsive_driver_is_quit():
+    pool = BrowserPool(lambda user_data_dir: FakeDriver(), name='1')
+    hung = pool.acquire()
+    hung.healthy = False
+    replacement = FakeDriver()
+    pool.release(replacement)
+    assert hung.quit_called
+    assert pool.driver is replacement and not replacement.quit_called
@@ -0,0 +1,41 @@
+import sqlite3
+
+from checkpoint_store import CheckpointStore, lead_rows
+
+
+def test_finishing_a_term_again_replaces_its_rows(tmp_path):
+    store = CheckpointStore(str(tmp_path / 'worker_1.sqlite'), 1)
+    try:
+        first = {'acme.com': {'url': {'https://acme.com'}, 'email': {'b@acme.com'}}}
+        store.replace_contacts('Acme', lead_rows('Acme', first))
+        store.replace_contacts('Bolt', lead_rows('Bolt', {'bolt.com': {'url': {'https://bolt.com'}}}))
+        # A retry found more: the sorted side-by-side layout shifts
+        more = {'acme.com': {'url': {'https://acme.com', 'https://acme.com/contact'},
+                             'email': {'a@acme.com', 'b@acme.com'}}}
+        store.replace_contacts('Acme', lead_rows('Acme', more))
+        rows = [(r['Search Term'], r['Website'], r['Emails']) for r in store.contacts()]
+        assert rows == [('Bolt', 'https://bolt.com', ''),
+                        ('Acme', 'https://acme.com', 'a@acme.com'),
+                        ('', 'https://acme.com/contact', 'b@acme.com')]
+    finally:
+        store.close()
+
+
+def test_stores_without_owner_term_are_upgraded(tmp_path):
+    path = str(tmp_path / 'worker_1.sqlite')
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE contacts (id INTEGER PRIMARY KEY, search_term TEXT NOT NULL DEFAULT '',
+            company_name TEXT NOT NULL DEFAULT '', website TEXT NOT NULL DEFAULT '', domain TEXT NOT NULL DEFAULT '',
+            email TEXT NOT NULL DEFAULT '', contact TEXT NOT NULL DEFAULT '', address TEXT NOT NULL DEFAULT '',
+            worker_id INTEGER, saved_at TEXT);
+        CREATE UNIQUE INDEX contacts_dedupe ON contacts (search_term, domain, website, email, contact, address);
+        INSERT INTO contacts (search_term, website) VALUES ('Old', 'https://old.com');
+    """)
+    conn.close()
+    store = CheckpointStore(path, 1)
+    try:
+        store.replace_contacts('Acme', [{'Search Term': 'Acme', 'Website': 'https://acme.com'}])
+        assert [r['Search Term'] for r in store.contacts()] == ['Old', 'Acme']
+    finally:
+        store.close()
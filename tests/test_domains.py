@@ -0,0 +1,22 @@
+from domains import DomainMatcher, public_suffix, registrable_domain
+
+
+def test_www_is_kept_when_only_a_suffix_would_remain():
+    matcher = DomainMatcher(['www.sg'])
+    assert 'https://acme.com.sg' not in matcher
+    assert 'https://www.sg/page' in matcher
+
+
+def test_www_is_stripped_from_ordinary_entries():
+    matcher = DomainMatcher(['www.facebook.com'])
+    assert 'https://m.facebook.com/acme' in matcher
+    assert 'https://notfacebook.com' not in matcher
+
+
+def test_ip_hosts_are_left_unchanged():
+    assert public_suffix('http://192.168.0.1/contact') == ''
+    assert registrable_domain('http://192.168.0.1/contact') == '192.168.0.1'
+    assert registrable_domain('http://[2001:db8::1]:8080/') == '2001:db8::1'
+    matcher = DomainMatcher(['10.0.0.7'])
+    assert 'http://10.0.0.7/x' in matcher
+    assert 'http://10.0.0.8/x' not in matcher
@@ -0,0 +1,34 @@
+from lead_extractor import MAX_LOCAL_PART, extract_leads, find_emails, scan_text, strip_scripts
+
+
+def test_strip_scripts_keeps_offsets_when_lowercasing_changes_length():
+    html = '<p>İİİİ</p><script>var x=1</script><p>mail: sales@acme.com</p>'
+    assert strip_scripts(html) == '<p>İİİİ</p> <p>mail: sales@acme.com</p>'
+
+
+def test_strip_scripts_is_case_insensitive_and_keeps_json_ld():
+    html = ('<SCRIPT>a="x@y.com"</Script>before'
+            '<script type="application/LD+JSON">{"email": "info@acme.com.sg"}</script>'
+            '<style>p{}</STYLE>after')
+    assert strip_scripts(html) == ' before{"email": "info@acme.com.sg"}  after'
+
+
+def test_local_part_boundary():
+    local = 'a' * MAX_LOCAL_PART
+    assert find_emails(f'<p>{local}@acme.com</p>', 1000) == {f'{local}@acme.com'}
+    assert find_emails(f'<p>b{local}@acme.com</p>', 1000) == set()
+    emails, _, _ = scan_text(f'Mail {local}@acme.com or b{local}@acme.com')
+    assert emails == {f'{local}@acme.com'}
+
+
+def test_extract_leads_from_snapshot():
+    snapshot = {
+        'text': 'Call +65 6123 4567\n1 Raffles Place Singapore 048616',
+        'html': '<p>İ</p><script>x</script><a>sales@acme.com</a>',
+        'mailto': ['mailto:info@acme.com?subject=hi'],
+        'tel': [],
+    }
+    leads = extract_leads(snapshot)
+    assert leads['emails'] == ['info@acme.com', 'sales@acme.com']
+    assert leads['contacts'] == ['+65 6123 4567']
+    assert leads['address'] == '1 Raffles Place Singapore 048616'
@@ -0,0 +1,29 @@
+from selenium.webdriver import ChromeOptions
+
+import lean_browser
+
+
+class FakeDriver:
+    def __init__(self):
+        self.commands = {}
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.commands[cmd] = params
+
+
+def test_images_stay_on_for_captcha_browsers():
+    options = lean_browser.apply_lean_options(ChromeOptions(), headless=False, images=True)
+    assert '--blink-settings=imagesEnabled=false' not in options.arguments
+    assert '--blink-settings=imagesEnabled=false' in lean_browser.apply_lean_options(ChromeOptions()).arguments
+
+    driver = FakeDriver()
+    assert lean_browser.block_requests(driver, images=True)
+    patterns = driver.commands['Network.setBlockedURLs']['urls']
+    assert '*.png' not in patterns and '*.jpg?*' not in patterns
+    assert '*.woff2' in patterns
+
+
+def test_google_and_recaptcha_hosts_are_never_blocked():
+    for patterns in (lean_browser.BLOCKED_URL_PATTERNS, lean_browser.BLOCKED_URL_PATTERNS_WITH_IMAGES):
+        hosts = [p for p in patterns if not p.startswith('*.')]
+        assert not any(h in p for p in hosts for h in ('google.com', 'gstatic', 'recaptcha'))
@@ -0,0 +1,54 @@
+import os
+import sqlite3
+
+from page_cache import PageCache
+
+
+def snapshot(body):
+    return {'html': f'<html><body>{body}</body></html>', 'text': body, 'source': 'http'}
+
+
+def blob_sizes(cache):
+    return cache.conn.execute('SELECT COALESCE(SUM(size), 0) FROM blobs').fetchone()[0]
+
+
+def test_running_total_matches_blobs(tmp_path):
+    cache = PageCache(str(tmp_path / 'cache'))
+    cache.save('https://acme.sg/', snapshot('home'))
+    cache.save('https://acme.sg/contact', snapshot('contact'))
+    cache.save('https://acme.sg/about', snapshot('home'))  # shares the home page blob
+    assert cache.total_bytes() == blob_sizes(cache) > 0
+
+    # Changed content: the old blob is no longer referenced and goes
+    old_hash = cache.lookup('https://acme.sg/contact')['content_hash']
+    cache.save('https://acme.sg/contact', snapshot('contact, now with a phone number'))
+    assert not os.path.exists(cache._blob_path(old_hash))
+    assert cache.total_bytes() == blob_sizes(cache)
+    cache.close()
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = PageCache(str(tmp_path / 'cache'))
+    for i in range(5):
+        cache.save(f'https://acme.sg/p{i}', snapshot(f'page {i} ' * 50))
+    cache.max_bytes = cache.total_bytes() - 1
+    cache.load('https://acme.sg/p0')
+    cache.evict(batch=1)
+    assert cache.lookup('https://acme.sg/p1') is None
+    assert cache.lookup('https://acme.sg/p0') is not None
+    assert cache.total_bytes() == blob_sizes(cache) <= cache.max_bytes
+    cache.close()
+
+
+def test_total_counted_for_cache_from_before_the_counter(tmp_path):
+    cache = PageCache(str(tmp_path / 'cache'))
+    cache.save('https://acme.sg/', snapshot('home'))
+    size = cache.total_bytes()
+    cache.close()
+    conn = sqlite3.connect(str(tmp_path / 'cache' / 'index.sqlite'))
+    conn.executescript('DROP TABLE cache_size; DROP TRIGGER blobs_added; DROP TRIGGER blobs_removed;')
+    conn.close()
+
+    cache = PageCache(str(tmp_path / 'cache'))
+    assert cache.total_bytes() == size
+    cache.close()
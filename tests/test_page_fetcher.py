@@ -0,0 +1,29 @@
+import lead_extractor
+import page_fetcher
+from domains import DomainMatcher
+
+
+def test_text_after_comment_is_kept():
+    snapshot = page_fetcher.snapshot_from_html(
+        '<html><body><p><!-- wp:paragraph -->Call us<!-- /wp:paragraph -->Tel: 6123 4567</p></body></html>'
+    )
+    assert 'Tel: 6123 4567' in snapshot['text']
+    assert lead_extractor.extract_leads(snapshot, DomainMatcher([]))['contacts'] == ['6123 4567']
+
+
+def test_dropped_tags_hide_only_their_own_text():
+    snapshot = page_fetcher.snapshot_from_html(
+        '<html><body><div>a<script>var tel = "6999 9999";</script>b<style>p{}</style>c</div></body></html>'
+    )
+    assert snapshot['text'] == 'abc'
+
+
+def test_decode_body_sniffs_meta_charset():
+    gbk = '<html><head><meta charset="gb2312"></head><body>新加坡科技有限公司</body></html>'.encode('gbk')
+    assert '新加坡科技有限公司' in page_fetcher.decode_body(gbk)
+    big5 = '<meta content="text/html; charset=big5" http-equiv="Content-Type"><p>台北市信義路</p>'.encode('big5')
+    assert '台北市信義路' in page_fetcher.decode_body(big5)
+    # The Content-Type charset wins over <meta>, a BOM over both
+    assert page_fetcher.decode_body('<meta charset="shift_jis">é'.encode('utf-8'), 'utf-8').endswith('é')
+    assert page_fetcher.decode_body(b'\xef\xbb\xbf<meta charset="big5">\xc3\xa9', 'latin-1').endswith('é')
+    assert page_fetcher.decode_body('<p>café</p>'.encode('utf-8')) == '<p>café</p>'
@@ -0,0 +1,44 @@
+import time
+
+import pytest
+from selenium.common.exceptions import InvalidSessionIdException, StaleElementReferenceException
+
+import page_waits
+
+
+class FakeDriver:
+    def __init__(self, respond):
+        self.respond = respond
+        self.calls = 0
+
+    def execute_script(self, script):
+        self.calls += 1
+        return self.respond(script, self.calls)
+
+
+def test_dead_session_propagates_instead_of_waiting_out_the_timeout():
+    def respond(script, calls):
+        raise InvalidSessionIdException('session deleted')
+
+    start = time.monotonic()
+    with pytest.raises(InvalidSessionIdException):
+        page_waits.wait_until(FakeDriver(respond), timeout=10)
+    assert time.monotonic() - start < 1
+
+
+def test_stale_elements_are_polled_through():
+    def respond(script, calls):
+        if calls < 3:
+            raise StaleElementReferenceException('page replaced')
+        return True
+
+    assert page_waits.wait_until(FakeDriver(respond), timeout=5)
+
+
+def test_network_idle_is_given_up_after_the_grace_period(monkeypatch):
+    monkeypatch.setattr(page_waits, 'IDLE_GRACE_SECONDS', 0.3)
+    # A page that polls forever never looks idle, but is otherwise ready
+    driver = FakeDriver(lambda script, calls: 'performance.now()' not in script)
+    start = time.monotonic()
+    assert page_waits.wait_until(driver, timeout=10, idle_ms=200)
+    assert time.monotonic() - start < 2
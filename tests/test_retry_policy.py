@@ -0,0 +1,26 @@
+import socket
+
+from selenium.common.exceptions import InvalidSessionIdException, TimeoutException
+from urllib3.exceptions import MaxRetryError
+
+from retry_policy import CAPTCHA, FATAL, RETRYABLE, CaptchaDetected, RetryScheduler, classify
+
+
+def test_browser_and_connection_errors_are_retryable():
+    for exc in (TimeoutException('slow'), InvalidSessionIdException('gone'), MaxRetryError(None, '/session'),
+                ConnectionRefusedError(), socket.timeout()):
+        assert classify(exc) == RETRYABLE
+
+
+def test_local_errors_are_fatal():
+    for exc in (PermissionError('chrome_profiles'), FileNotFoundError('worker_1.sqlite'), KeyError('x')):
+        assert classify(exc) == FATAL
+    assert classify(CaptchaDetected('acme')) == CAPTCHA
+
+
+def test_scheduler_budget():
+    retries = RetryScheduler(max_attempts=2)
+    assert retries.failed('Acme', RETRYABLE) is not None
+    assert len(retries) == 1
+    assert retries.failed('Acme', RETRYABLE) is None
+    assert retries.failed('Bolt', FATAL) is None
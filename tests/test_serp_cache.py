@@ -0,0 +1,33 @@
+import sqlite3
+
+from akc_rank_checker import RESULTS_PER_PAGE, SEARCH_LANGUAGE, cached_search_results
+from serp_cache import SerpCache
+
+
+def test_pages_after_the_last_one_are_not_needed(tmp_path):
+    cache = SerpCache(str(tmp_path / 'serp.sqlite'))
+    cache.put('AKC food hygiene', 0, SEARCH_LANGUAGE, ['https://sg-akc.com/', 'https://example.sg/'])
+    assert cached_search_results(cache, 'AKC food hygiene', 3) is None
+
+    # Page 2 had results, all on domains already seen; page 3 had none
+    cache.put('AKC food hygiene', RESULTS_PER_PAGE, SEARCH_LANGUAGE, [])
+    cache.put('AKC food hygiene', 2 * RESULTS_PER_PAGE, SEARCH_LANGUAGE, [], last=True)
+    assert cached_search_results(cache, 'akc  FOOD hygiene', 5) == ['https://sg-akc.com/', 'https://example.sg/']
+
+    cache.put('Rare course', 0, SEARCH_LANGUAGE, ['https://sg-akc.com/rare'], last=True)
+    assert cached_search_results(cache, 'Rare course', 3) == ['https://sg-akc.com/rare']
+    cache.close()
+
+
+def test_old_cache_gains_last_column(tmp_path):
+    path = str(tmp_path / 'serp.sqlite')
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE serp_pages (query_key TEXT NOT NULL, start INTEGER NOT NULL, hl TEXT NOT NULL, '
+                 'query TEXT NOT NULL, fetched_at TEXT NOT NULL, urls TEXT NOT NULL, PRIMARY KEY (query_key, start, hl))')
+    conn.execute("INSERT INTO serp_pages VALUES ('acme', 0, 'en', 'Acme', '2026-01-01T00:00:00', '[\"https://acme.sg/\"]')")
+    conn.commit()
+    conn.close()
+
+    cache = SerpCache(path)
+    assert cache.get('Acme', 0, 'en') == (['https://acme.sg/'], False)
+    cache.close()
@@ -0,0 +1,28 @@
+import dataclasses
+import glob
+import json
+import os
+
+import pytest
+
+from serp_parser import parse_company_names, parse_serp
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'fixtures', 'serp')
+
+
+@pytest.mark.parametrize('path', sorted(glob.glob(os.path.join(FIXTURE_DIR, '*.html'))), ids=os.path.basename)
+def test_fixture_matches_expected(path):
+    with open(path, encoding='utf-8') as f:
+        html = f.read()
+    with open(path[:-len('.html')] + '.expected.json', encoding='utf-8') as f:
+        expected = json.load(f)
+    assert {
+        'results': [dataclasses.asdict(r) for r in parse_serp(html)],
+        'company_names': parse_company_names(html),
+    } == expected
+
+
+def test_hidden_and_repeated_blocks_take_no_position():
+    with open(os.path.join(FIXTURE_DIR, 'hidden_blocks.html'), encoding='utf-8') as f:
+        results = parse_serp(f.read())
+    assert [(r.position, r.display_domain) for r in results] == [(1, 'sg-akc.com'), (2, 'tcc.com.sg')]
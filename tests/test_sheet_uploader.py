@@ -0,0 +1,96 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+import sheet_uploader
+from sheet_uploader import SheetUploader
+
+
+class Webhook:
+    """Stand-in for the Apps Script web app; respond(posts_so_far, rows) -> (status, headers)."""
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.posts = []  # (Idempotency-Key, ?batch=, rows, status)
+        webhook = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                rows = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                batch = parse_qs(urlparse(self.path).query).get('batch', [''])[0]
+                status, headers = webhook.respond(len(webhook.posts), rows)
+                webhook.posts.append((self.headers.get('Idempotency-Key'), batch, rows, status))
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', '2')
+                self.end_headers()
+                self.wfile.write(b'ok')
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/exec"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def accepted_rows(self):
+        return [row for _, _, rows, status in self.posts if status == 200 for row in rows]
+
+
+@pytest.fixture
+def webhooks(monkeypatch):
+    monkeypatch.setattr(sheet_uploader, 'BACKOFF_BASE', 0.01)
+    started = []
+    yield lambda respond: started.append(Webhook(respond)) or started[-1]
+    for webhook in started:
+        webhook.server.shutdown()
+
+
+def test_retry_keeps_the_idempotency_key(tmp_path, webhooks):
+    webhook = webhooks(lambda n, rows: (503, {'Retry-After': '0'}) if n == 0 else (200, {}))
+    uploader = SheetUploader(webhook.url, journal_path=str(tmp_path / 'journal.sqlite'), batch_size=2)
+    uploader.add({'Term': 'Acme'})
+    uploader.add({'Term': 'Bolt'})
+    assert uploader.close(timeout=10) == 0
+
+    assert [status for *_, status in webhook.posts] == [503, 200]
+    (key1, batch1, rows1, _), (key2, batch2, rows2, _) = webhook.posts
+    assert key1 == key2 == batch1 == batch2
+    assert rows1 == rows2 == [{'Term': 'Acme'}, {'Term': 'Bolt'}]
+    assert uploader.stats['retries'] == 1
+
+
+def test_unsent_rows_are_replayed_with_the_same_key(tmp_path, webhooks, monkeypatch):
+    monkeypatch.setattr(sheet_uploader, 'MAX_ATTEMPTS', 2)
+    journal = str(tmp_path / 'journal.sqlite')
+    down = webhooks(lambda n, rows: (503, {}))
+    uploader = SheetUploader(down.url, journal_path=journal, batch_size=1)
+    uploader.add({'Term': 'Acme'})
+    assert uploader.close(timeout=10) == 1
+    assert len(down.posts) == 2
+
+    up = webhooks(lambda n, rows: (200, {}))
+    uploader = SheetUploader(up.url, journal_path=journal, batch_size=1)
+    assert uploader.close(timeout=10) == 0
+    assert up.accepted_rows() == [{'Term': 'Acme'}]
+    assert up.posts[0][0] == down.posts[0][0]
+
+
+def test_rejected_batch_stays_journaled_without_blocking_others(tmp_path, webhooks):
+    webhook = webhooks(lambda n, rows: (400, {}) if rows[0]['Term'] == 'Bad' else (200, {}))
+    uploader = SheetUploader(webhook.url, journal_path=str(tmp_path / 'journal.sqlite'), batch_size=1)
+    for term in ('Bad', 'Acme', 'Bolt'):
+        uploader.add({'Term': term})
+    assert uploader.close(timeout=10) == 1
+
+    assert webhook.accepted_rows() == [{'Term': 'Acme'}, {'Term': 'Bolt'}]
+    assert [rows for *_, rows, status in webhook.posts if status == 400] == [[{'Term': 'Bad'}]]  # not retried
+    assert uploader.stats['batches_failed'] == 1
+
+    journal = SheetUploader(webhook.url, journal_path=str(tmp_path / 'journal.sqlite'))
+    assert journal.pending_rows() == [{'Term': 'Bad'}]
+    journal.close(timeout=10)
@@ -0,0 +1,74 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import page_fetcher
+import subpage_crawler
+
+PAGE = ('<html><body><h1>Contact</h1><p>' + 'We are a static company page. ' * 20
+        + '</p><p>Tel: 6123 4567</p></body></html>').encode('utf-8')
+
+
+# Served without a charset in Content-Type, declared only in <meta>
+SJIS_PAGE = ('<html><head><meta http-equiv="Content-Type" content="text/html; charset=Shift_JIS"></head><body>'
+             + '<p>' + '静的な会社のページです。' * 20 + '</p><p>株式会社アクメ 東京都港区1-2-3</p></body></html>').encode('shift_jis')
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == '/sjis':
+            content_type, body = 'text/html', SJIS_PAGE
+        else:
+            charset = 'x-bogus' if self.path == '/bogus' else 'utf-8'
+            content_type, body = f'text/html; charset={charset}', PAGE
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def site():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_unknown_charset_falls_back_to_utf8(site):
+    pages = {}
+    needs_browser = subpage_crawler.crawl_subpages(
+        [f"{site}/bogus", f"{site}/contact"], lambda url, snapshot, elapsed: pages.setdefault(url, snapshot))
+    assert needs_browser == []
+    assert all('Tel: 6123 4567' in s['text'] for s in pages.values()) and len(pages) == 2
+    assert 'Tel: 6123 4567' in page_fetcher.fetch_snapshot(f"{site}/bogus")['text']
+
+
+def test_failing_page_goes_to_browser_without_losing_siblings(site, monkeypatch):
+    original = page_fetcher.snapshot_from_html
+
+    def flaky(html, base_url=''):
+        if base_url.endswith('/broken'):
+            raise RuntimeError('parser blew up')
+        return original(html, base_url)
+
+    monkeypatch.setattr(subpage_crawler, 'snapshot_from_html', flaky)
+    pages = {}
+    needs_browser = subpage_crawler.crawl_subpages(
+        [f"{site}/broken", f"{site}/contact"], lambda url, snapshot, elapsed: pages.setdefault(url, snapshot))
+    assert needs_browser == [f"{site}/broken"]
+    assert list(pages) == [f"{site}/contact"]
+
+
+def test_meta_charset_is_used_without_a_header_charset(site):
+    pages = {}
+    needs_browser = subpage_crawler.crawl_subpages(
+        [f"{site}/sjis"], lambda url, snapshot, elapsed: pages.setdefault(url, snapshot))
+    assert needs_browser == []
+    assert '株式会社アクメ 東京都港区1-2-3' in pages[f"{site}/sjis"]['text']
+    assert '株式会社アクメ 東京都港区1-2-3' in page_fetcher.fetch_snapshot(f"{site}/sjis")['text']
@@ -0,0 +1,25 @@
+from visited_store import VisitedStore
+
+
+def test_companies_on_a_shared_host_are_crawled_separately(tmp_path):
+    store = VisitedStore(str(tmp_path / 'visited.sqlite'))
+    try:
+        for owner, url in [('Acme', 'https://sites.google.com/view/acme'),
+                           ('Bolt', 'https://sites.google.com/view/bolt')]:
+            assert store.claim_site(url, owner) and store.claim_url(url, owner)
+        # The same page is still only crawled once per run
+        assert not store.claim_url('https://sites.google.com/view/acme', 'Bolt')
+    finally:
+        store.close()
+
+
+def test_site_claims_hold_for_ordinary_domains_and_ignore_ip_hosts(tmp_path):
+    store = VisitedStore(str(tmp_path / 'visited.sqlite'))
+    try:
+        assert store.claim_site('https://www.acme.com.sg/', 'Acme')
+        assert store.claim_site('https://shop.acme.com.sg/contact', 'Acme')
+        assert not store.claim_site('https://acme.com.sg/about', 'Acme Holdings')
+        assert store.claim_site('http://192.168.0.1/', 'Acme')
+        assert store.claim_site('http://10.0.0.1/', 'Bolt')
+    finally:
+        store.close()
@@ -0,0 +1,46 @@
+import threading
+from queue import Queue
+
+import scraper_bot2v1
+from completion_index import STATUS_DONE, STATUS_FAILED, CompletionIndex
+
+
+class FakePool:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def acquire(self):
+        return None
+
+    def release(self, driver):
+        pass
+
+    def discard(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_fatal_crawl_error_marks_term_failed(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(scraper_bot2v1, 'BrowserPool', FakePool)
+    monkeypatch.setattr(scraper_bot2v1, 'PAGE_CACHE_DIR', None)
+    monkeypatch.setattr(scraper_bot2v1, '_checkpoint_stores', {})
+
+    def navigate(driver, query, local_skipped, save_callback=None, visited=None, worker_id=None, search_term=None):
+        if search_term == 'Broken Pte Ltd':
+            raise KeyError('missing column')
+        return driver, set(), {}
+
+    monkeypatch.setattr(scraper_bot2v1, 'google_search_and_navigate', navigate)
+
+    tasks = Queue()
+    for name in ('Broken Pte Ltd', 'Acme Pte Ltd', None):
+        tasks.put(name)
+    scraper_bot2v1.worker_run(tasks, 1, threading.Event(), pacing=False, output_dir=str(tmp_path))
+
+    index = CompletionIndex(job=scraper_bot2v1.INDEX_JOB)
+    assert index.get('Broken Pte Ltd')['status'] == STATUS_FAILED
+    assert index.get('Acme Pte Ltd')['status'] == STATUS_DONE
+    index.close()
@@ -0,0 +1,99 @@
+# Cross-worker visited set for scraper_bot2v1
+#
+# Every worker process opens the same SQLite file (WAL). Claiming a site or URL
+# is a single INSERT OR IGNORE, so exactly one worker wins even when several
+# company names lead to the same site, and the set lives on disk instead of in
+# a Manager list that costs an IPC round trip per append.
+#
+# Site claims (one company per registrable domain) are skipped for IP hosts
+# and for hosts that serve many unrelated companies (SHARED_HOSTS), where only
+# the run-wide URL claims apply.
+
+import os
+import sqlite3
+from datetime import datetime
+
+from domains import DomainMatcher, hostname, is_ip, registrable_domain
+from page_cache import normalize_url
+
+DEFAULT_VISITED_PATH = 'visited_urls.sqlite'
+
+# Site builders and social sites that host many companies under one domain
+SHARED_HOSTS = DomainMatcher([
+    'sites.google.com', 'business.site', 'weebly.com', 'wixsite.com', 'wix.com', 'wordpress.com',
+    'blogspot.com', 'squarespace.com', 'myshopify.com', 'godaddysites.com', 'webnode.page',
+    'jimdosite.com', 'strikingly.com', 'yolasite.com', 'site123.me', 'carrd.co', 'notion.site',
+    'github.io', 'linkedin.com', 'instagram.com', 'facebook.com', 'twitter.com', 'x.com',
+    'youtube.com', 'tiktok.com', 'linktr.ee',
+])
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS visited (
+    key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    worker_id INTEGER,
+    claimed_at TEXT NOT NULL
+);
+"""
+
+
+class VisitedStore:
+    def __init__(self, path=DEFAULT_VISITED_PATH, worker_id=None):
+        self.path = path
+        self.worker_id = worker_id
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=OFF')  # rebuilt every run, durability doesn't matter
+        self.conn.executescript(SCHEMA)
+
+    @staticmethod
+    def reset(path=DEFAULT_VISITED_PATH):
+        """Start a run with an empty set."""
+        for suffix in ('', '-wal', '-shm'):
+            try:
+                os.remove(path + suffix)
+            except FileNotFoundError:
+                pass
+
+    def _insert(self, key, kind, owner) -> bool:
+        now = datetime.now().isoformat(timespec='seconds')
+        with self.conn:
+            cur = self.conn.execute(
+                'INSERT OR IGNORE INTO visited (key, kind, owner, worker_id, claimed_at) VALUES (?, ?, ?, ?, ?)',
+                (key, kind, owner, self.worker_id, now),
+            )
+        return cur.rowcount == 1
+
+    def claim_site(self, url, owner) -> bool:
+        """True if owner may crawl url's site: nobody else has claimed its registrable domain.
+
+        Always True for IP hosts and SHARED_HOSTS, whose pages belong to many companies.
+        """
+        host = hostname(url)
+        if not host or is_ip(host) or host in SHARED_HOSTS:
+            return True
+        domain = registrable_domain(host)
+        key = f"site:{domain}"
+        if self._insert(key, 'site', owner):
+            return True
+        row = self.conn.execute('SELECT owner FROM visited WHERE key = ?', (key,)).fetchone()
+        return row is not None and row[0] == owner
+
+    def claim_url(self, url, owner) -> bool:
+        """True only the first time anyone claims this (normalized) url."""
+        return self._insert(f"url:{normalize_url(url)}", 'url', owner)
+
+    def release_url(self, url, owner):
+        """Drop owner's claim on url so a later attempt at the same term can crawl it."""
+        with self.conn:
+            self.conn.execute('DELETE FROM visited WHERE key = ? AND owner = ?', (f"url:{normalize_url(url)}", owner))
+
+    def counts(self) -> dict:
+        return dict(self.conn.execute('SELECT kind, COUNT(*) FROM visited GROUP BY kind').fetchall())
+
+    def close(self):
+        try:
+            self.conn.close()
+        except Exception:
+            pass
@@ -0,0 +1,161 @@
+# Lead-yield report for a scraper_bot2v1 run
+#
+# Built from the merged run database (merge_outputs.merge_run): the per-page
+# visit log says which input term, worker, domain and page type (homepage, contact or
+# locate subpage) each new lead came from and what the visit cost, so yield and
+# time per lead can be grouped any way with plain pandas group-bys instead of
+# row-by-row Python. Writes a JSON report and a one-page HTML version.
+
+import html
+import json
+import os
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+
+# ========== CONFIGURATION ==========
+DOMAIN_ROWS = 50                 # domains listed (most expensive first)
+CONTACT_CHUNK_ROWS = 100_000     # merged contact rows read per chunk for the totals
+SECONDS_PER_LEAD_BINS = [0, 0.5, 1, 2, 5, 10, 30, 60, np.inf]
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+def _contact_totals(conn) -> dict:
+    emails = contacts = rows = 0
+    domains = set()
+    for chunk in pd.read_sql_query('SELECT email, contact, domain FROM contacts', conn, chunksize=CONTACT_CHUNK_ROWS):
+        rows += len(chunk)
+        emails += int(chunk['email'].fillna('').str.strip().ne('').sum())
+        contacts += int(chunk['contact'].fillna('').str.strip().ne('').sum())
+        domains.update(chunk['domain'].replace('', np.nan).dropna().unique())
+    return {'rows': rows, 'emails': emails, 'contacts': contacts, 'unique_sites': len(domains)}
+
+
+def _yield_table(pages, by) -> pd.DataFrame:
+    """Pages, leads and cost per group, most expensive first."""
+    table = pages.groupby(by, dropna=False).agg(
+        pages=('url', 'size'), emails=('emails', 'sum'), contacts=('contacts', 'sum'),
+        addresses=('address', 'sum'), seconds=('elapsed', 'sum'),
+    )
+    table['leads'] = table['emails'] + table['contacts']
+    table['leads_per_page'] = (table['leads'] / table['pages']).round(3)
+    table['seconds_per_lead'] = (table['seconds'] / table['leads'].where(table['leads'] > 0)).round(2)
+    table['seconds'] = table['seconds'].round(1)
+    return table.sort_values('seconds', ascending=False)
+
+
+def _records(table) -> list[dict]:
+    table = table.reset_index()
+    return json.loads(table.to_json(orient='records'))
+
+
+def _seconds_per_lead(pages) -> dict:
+    productive = pages[pages['leads'] > 0]
+    per_lead = (productive['elapsed'] / productive['leads']).to_numpy(dtype=float)
+    if not per_lead.size:
+        return {'pages_with_leads': 0}
+    counts, _ = np.histogram(per_lead, bins=SECONDS_PER_LEAD_BINS)
+    labels = [f"<{b:g}s" if np.isfinite(b) else f">={SECONDS_PER_LEAD_BINS[-2]:g}s" for b in SECONDS_PER_LEAD_BINS[1:]]
+    return {
+        'pages_with_leads': int(per_lead.size),
+        'mean': round(float(per_lead.mean()), 3),
+        **{f"p{int(q * 100)}": round(float(v), 3) for q, v in zip(QUANTILES, np.quantile(per_lead, QUANTILES))},
+        'histogram': dict(zip(labels, counts.tolist())),
+    }
+
+
+def build_report(merged_path, timings_path=None) -> dict:
+    conn = sqlite3.connect(merged_path)
+    try:
+        totals = _contact_totals(conn)
+        pages = pd.read_sql_query('SELECT * FROM pages', conn)
+        terms = pd.read_sql_query('SELECT * FROM terms', conn)
+    finally:
+        conn.close()
+
+    pages['elapsed'] = pages['elapsed'].fillna(0.0)
+    pages['leads'] = pages['emails'] + pages['contacts']
+    report = {
+        'generated_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'totals': {
+            **totals,
+            'leads': totals['emails'] + totals['contacts'],
+            'avg_emails_per_site': round(totals['emails'] / totals['unique_sites'], 3) if totals['unique_sites'] else 0,
+            'terms': int(terms['search_term'].nunique()),
+            'pages': int(len(pages)),
+            'crawl_seconds': round(float(pages['elapsed'].sum()), 1),
+        },
+    }
+
+    # Pages carry the input term itself: several terms can share one stripped query
+    by_term = _yield_table(pages, 'search_term')
+    per_term = terms.groupby('search_term', sort=False).agg(worker_id=('worker_id', 'last'),
+                                                           term_seconds=('elapsed', 'sum'))
+    per_term = per_term.join(by_term)
+    count_columns = ['pages', 'emails', 'contacts', 'addresses', 'leads']
+    per_term[count_columns] = per_term[count_columns].fillna(0).astype(int)
+    per_term['term_seconds'] = per_term['term_seconds'].round(1)
+    per_term = per_term.sort_values('leads', ascending=False)
+
+    report['per_term'] = _records(per_term)
+    report['zero_yield_terms'] = per_term.index[per_term['leads'] == 0].tolist()
+    report['per_domain'] = _records(_yield_table(pages, 'domain').head(DOMAIN_ROWS))
+    report['per_worker'] = _records(_yield_table(pages, 'worker_id'))
+    report['per_page_type'] = _records(_yield_table(pages, 'page_type'))
+    report['per_page_type_and_source'] = _records(_yield_table(pages, ['page_type', 'source']))
+    report['seconds_per_lead'] = _seconds_per_lead(pages)
+
+    if timings_path and os.path.exists(timings_path):
+        with open(timings_path, encoding='utf-8') as f:
+            report['phase_timings'] = json.load(f).get('overall', {})
+    return report
+
+
+def _html_table(rows) -> str:
+    return pd.DataFrame(rows).to_html(index=False, border=0, na_rep='') if rows else '<p>none</p>'
+
+
+def write_report(report, json_path, html_path=None):
+    tmp = f"{json_path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp, json_path)
+    if not html_path:
+        return
+    sections = [
+        ('Totals', [report['totals']]),
+        ('By page type', report['per_page_type']),
+        ('By page type and source', report['per_page_type_and_source']),
+        ('By worker', report['per_worker']),
+        ('Seconds per lead', [{k: v for k, v in report['seconds_per_lead'].items() if k != 'histogram'}]),
+        ('Seconds per lead histogram', [report['seconds_per_lead'].get('histogram', {})]),
+        (f'Most expensive domains (top {DOMAIN_ROWS})', report['per_domain']),
+        ('By search term', report['per_term']),
+    ]
+    if report.get('phase_timings'):
+        sections.append(('Phase timings', [{'phase': k, **v} for k, v in report['phase_timings'].items()]))
+    body = ''.join(f"<h2>{title}</h2>{_html_table(rows)}" for title, rows in sections)
+    zero = ''.join(f"<li>{html.escape(term)}</li>" for term in report['zero_yield_terms']) or '<li>none</li>'
+    page = (
+        '<!DOCTYPE html><html><head><meta charset="utf-8"><title>Lead yield report</title>'
+        '<style>body{font-family:sans-serif;margin:2em}table{border-collapse:collapse;font-size:13px}'
+        'td,th{padding:3px 8px;border-bottom:1px solid #ddd;text-align:right}th{background:#f4f4f4}</style></head>'
+        f"<body><h1>Lead yield report</h1><p>Generated {report['generated_at']}</p>{body}"
+        f"<h2>Terms with no leads ({len(report['zero_yield_terms'])})</h2><ul>{zero}</ul></body></html>"
+    )
+    tmp = f"{html_path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(page)
+    os.replace(tmp, html_path)
+
+
+def format_summary(report) -> str:
+    t = report['totals']
+    lines = [f"{t['terms']} terms, {t['pages']} pages, {t['leads']} leads in {t['crawl_seconds']:.0f}s of page visits; "
+             f"{len(report['zero_yield_terms'])} terms produced nothing"]
+    for row in report['per_page_type_and_source']:
+        spl = f"{row['seconds_per_lead']:.1f}s/lead" if row['seconds_per_lead'] is not None else 'no leads'
+        lines.append(f"  {row['page_type']:<9} via {row['source']:<8} {row['pages']:>6} pages {row['leads']:>6} leads  {spl}")
+    return '\n'.join(lines)